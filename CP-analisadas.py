@@ -1,27 +1,20 @@
-from fpdf import FPDF
-pdf = FPDF()  # Correto
+from cartas_resposta import gravar_pdf
 
-# Substituir travessões e outros caracteres especiais por equivalentes ASCII
-def clean_text(text):
-    return text.replace("–", "-").replace("“", "\"").replace("”", "\"").replace("’", "'")
+# O PDF é gerado pelo PyMuPDF com fontes Unicode embutidas: travessões, aspas curvas e acentos
+# saem como foram escritos, sem a troca por equivalentes ASCII que o FPDF exigia.
 
-# Recriar o PDF com textos corrigidos
-pdf.add_page()
-
-# Conteúdo do parecer com texto limpo
-pdf.set_font("Arial", size=12)  # Ajuste de fonte
-
-pdf.cell(200, 10, "I. Contribuições Acolhidas", ln=True, align="C")
-pdf.multi_cell(0, 10, clean_text(
-    "- Aprimoramento da redação para mais clareza e inclusão.\n"
-    "- Evitar interpretações restritivas do termo.\n"
-    "- Observância aos padrões legais e normativos.\n"
-    "- Reconhecimento da diversidade das comunidades rurais.\n"
-    "- Ênfase em efetividade, salubridade e sustentabilidade."
-))
+# Conteúdo do parecer
+html = (
+    '<h3 style="text-align: center">I. Contribuições Acolhidas</h3>'
+    "<p>– Aprimoramento da redação para mais clareza e inclusão.<br/>"
+    "– Evitar interpretações restritivas do termo.<br/>"
+    "– Observância aos padrões legais e normativos.<br/>"
+    "– Reconhecimento da diversidade das comunidades rurais.<br/>"
+    "– Ênfase em efetividade, salubridade e sustentabilidade.</p>"
+)
 
 # Continuação para as outras seções...
 
-# Salvar PDF corrigido
+# Salvar PDF
 pdf_path = "C:\\Users\\julia\\contribuiçõesanalisadas.pdf"
-pdf.output(pdf_path)
+gravar_pdf(html, pdf_path, css="body { font-family: sans-serif; font-size: 12pt; } p { line-height: 1.6; }")
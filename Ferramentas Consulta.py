@@ -3,9 +3,14 @@ from tkinter import filedialog, messagebox
 import pandas as pd
 import tabula
 import os
-import PyPDF2
 from transformers import pipeline
 
+from extracao_pdf import extrair_pasta, extrair_texto
+from mesclagem_planilhas import mesclar_abas
+
+# Backend de leitura dos PDFs: "pymupdf" (rápido) ou "pypdf2" (ver benchmark_extracao_pdf.py)
+BACKEND_PDF = "pymupdf"
+
 # ---------------------- Classificador de Tema ----------------------
 temas = [
     "DA PRESTAÇÃO DOS SERVIÇOS",
@@ -27,14 +32,8 @@ temas = [
     "OBS: CONTRIBUIÇÕES ADICIONAIS - USE ESTE ESPAÇO"
 ]
 
-classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
-
 def extrair_texto_pdf(caminho_pdf):
-    texto = ""
-    with open(caminho_pdf, "rb") as arquivo:
-        leitor = PyPDF2.PdfReader(arquivo)
-        for pagina in leitor.pages:
-            texto += pagina.extract_text() or ""
+    texto, _, _ = extrair_texto(caminho_pdf, BACKEND_PDF)
     return texto.strip()
 
 def classificar_pdf_gui():
@@ -43,22 +42,26 @@ def classificar_pdf_gui():
         return
     try:
         resultados = []
-        for nome_arquivo in os.listdir(pasta):
-            if nome_arquivo.lower().endswith(".pdf"):
-                caminho_pdf = os.path.join(pasta, nome_arquivo)
-                texto = extrair_texto_pdf(caminho_pdf)
-                if texto:
-                    indice, tema = classificar_tema(texto[:1000])
-                    resultados.append({
-                        "Arquivo": nome_arquivo,
-                        "Número do Tema": indice,
-                        "Tema Classificado": tema
-                    })
+        falhas = []
+        # Extração em paralelo; cada PDF é classificado assim que o seu texto fica pronto.
+        for nome_arquivo, texto, _, erros in extrair_pasta(pasta, backend=BACKEND_PDF):
+            if texto is None:
+                falhas.append(f"{nome_arquivo}: {erros[0]}")
+                continue
+            texto = texto.strip()
+            if texto:
+                indice, tema = classificar_tema(texto[:1000])
+                resultados.append({
+                    "Arquivo": nome_arquivo,
+                    "Número do Tema": indice,
+                    "Tema Classificado": tema
+                })
         if resultados:
-            df = pd.DataFrame(resultados)
+            df = pd.DataFrame(resultados).sort_values("Arquivo")
             saida = os.path.join(pasta, "resultados_classificacao.csv")
             df.to_csv(saida, index=False, encoding='utf-8-sig')
-            messagebox.showinfo("Sucesso", f"Classificação salva em:\n{saida}")
+            aviso = f"\n\n{len(falhas)} PDF(s) não puderam ser lidos:\n" + "\n".join(falhas[:10]) if falhas else ""
+            messagebox.showinfo("Sucesso", f"Classificação salva em:\n{saida}{aviso}")
         else:
             messagebox.showwarning("Aviso", "Nenhum conteúdo válido foi encontrado.")
     except Exception as e:
@@ -95,18 +98,10 @@ def mesclar_planilhas():
     if not caminho_excel:
         return
     try:
-        planilhas = pd.read_excel(caminho_excel, sheet_name=None)
         colunas = ["REDAÇÃO POSTA EM CONSULTA", "CONTRIBUIÇÕES SSB"]
-        todas = []
-        for nome, df in planilhas.items():
-            if all(c in df.columns for c in colunas):
-                df_filtrado = df[colunas].dropna(how='all')
-                df_filtrado["ABA DE ORIGEM"] = nome
-                todas.append(df_filtrado)
-        if todas:
-            final = pd.concat(todas, ignore_index=True)
-            novo_caminho = os.path.splitext(caminho_excel)[0] + "_mesclado.xlsx"
-            final.to_excel(novo_caminho, index=False)
+        # Só as abas com essas colunas no cabeçalho são lidas (em paralelo) e gravadas em fluxo.
+        novo_caminho, _ = mesclar_abas(caminho_excel, colunas)
+        if novo_caminho:
             messagebox.showinfo("Sucesso", f"Mesclagem salva em:\n{novo_caminho}")
         else:
             messagebox.showwarning("Aviso", "Colunas não encontradas.")
@@ -114,14 +109,19 @@ def mesclar_planilhas():
         messagebox.showerror("Erro", str(e))
 
 # ---------------------- Interface ----------------------
-janela = tk.Tk()
-janela.title("Ferramentas SSB - Decreto 7217")
-janela.geometry("420x300")
+# Só na execução direta: os processos de extração e de mesclagem importam este script no Windows
+# e não devem abrir outra janela nem carregar o modelo.
+if __name__ == "__main__":
+    classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+
+    janela = tk.Tk()
+    janela.title("Ferramentas SSB - Decreto 7217")
+    janela.geometry("420x300")
 
-tk.Label(janela, text="Ferramentas para análise de contribuições", font=("Arial", 13, "bold")).pack(pady=15)
+    tk.Label(janela, text="Ferramentas para análise de contribuições", font=("Arial", 13, "bold")).pack(pady=15)
 
-tk.Button(janela, text="📥 Converter PDF para Excel", width=40, command=extrair_pdf_para_excel).pack(pady=5)
-tk.Button(janela, text="📊 Mesclar abas do Excel", width=40, command=mesclar_planilhas).pack(pady=5)
-tk.Button(janela, text="🧠 Classificar PDFs por tema (Decreto 7217)", width=40, command=classificar_pdf_gui).pack(pady=5)
+    tk.Button(janela, text="📥 Converter PDF para Excel", width=40, command=extrair_pdf_para_excel).pack(pady=5)
+    tk.Button(janela, text="📊 Mesclar abas do Excel", width=40, command=mesclar_planilhas).pack(pady=5)
+    tk.Button(janela, text="🧠 Classificar PDFs por tema (Decreto 7217)", width=40, command=classificar_pdf_gui).pack(pady=5)
 
-janela.mainloop()
+    janela.mainloop()
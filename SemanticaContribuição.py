@@ -1,12 +1,9 @@
 import re
 import os
-import PyPDF2
-from openpyxl import Workbook
+from exportador_tabelas import exportar_linhas
+from extracao_pdf import extrair_pasta, extrair_texto
 from transformers import pipeline
 
-# Carregar classificador semântico (zero-shot)
-classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
-
 def extrair_temas_decreto(caminho_arquivo_decreto):
     temas_decreto = {}
     try:
@@ -24,13 +21,9 @@ def extrair_temas_decreto(caminho_arquivo_decreto):
         print(f"Erro ao processar decreto: {e}")
     return temas_decreto
 
-def ler_pdf(caminho_pdf):
-    texto = ""
+def ler_pdf(caminho_pdf, backend=None):
     try:
-        with open(caminho_pdf, 'rb') as f:
-            leitor = PyPDF2.PdfReader(f)
-            for pagina in leitor.pages:
-                texto += pagina.extract_text() or ""
+        texto, _, _ = extrair_texto(caminho_pdf, backend)
         return texto
     except Exception as e:
         print(f"Erro ao ler PDF {caminho_pdf}: {e}")
@@ -81,32 +74,29 @@ def avaliar_contribuicao(texto, temas_decreto):
 
     return resultado
 
-def salvar_resultados_excel(resultados, caminho_excel):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Análise Contribuições"
+def linhas_resultados(resultados):
+    for r in resultados:
+        a = r["avaliacao"]
+        yield [
+            r["arquivo"],
+            a.get("summary", ""),
+            a.get("contribution_type", ""),
+            ", ".join(a.get("thematic_analysis", {}).keys()),
+            str(a.get("thematic_analysis", {})),
+            ", ".join(a.get("legal_references", [])),
+            a.get("argument_assessment", {}).get("strength", ""),
+            a.get("argument_assessment", {}).get("notes", ""),
+            a.get("classificacao_semantica", ""),
+            round(a.get("confianca_semantica", 0) * 100, 2),
+        ]
 
+def salvar_resultados_excel(resultados, caminho_excel):
     headers = [
         "Arquivo PDF", "Resumo", "Tipo", "Temas Relevantes", "Relevância",
         "Artigos", "Força do Argumento", "Notas", "Tema Semântico", "Confiança (%)"
     ]
-    for col, h in enumerate(headers, 1):
-        ws.cell(row=1, column=col, value=h)
-
-    for i, r in enumerate(resultados, start=2):
-        a = r["avaliacao"]
-        ws.cell(row=i, column=1, value=r["arquivo"])
-        ws.cell(row=i, column=2, value=a.get("summary", ""))
-        ws.cell(row=i, column=3, value=a.get("contribution_type", ""))
-        ws.cell(row=i, column=4, value=", ".join(a.get("thematic_analysis", {}).keys()))
-        ws.cell(row=i, column=5, value=str(a.get("thematic_analysis", {})))
-        ws.cell(row=i, column=6, value=", ".join(a.get("legal_references", [])))
-        ws.cell(row=i, column=7, value=a.get("argument_assessment", {}).get("strength", ""))
-        ws.cell(row=i, column=8, value=a.get("argument_assessment", {}).get("notes", ""))
-        ws.cell(row=i, column=9, value=a.get("classificacao_semantica", ""))
-        ws.cell(row=i, column=10, value=round(a.get("confianca_semantica", 0) * 100, 2))
-
-    wb.save(caminho_excel)
+    # 'resultados' pode ser um gerador: cada linha é gravada assim que é produzida.
+    exportar_linhas(caminho_excel, headers, linhas_resultados(resultados), titulo_aba="Análise Contribuições", largura_maxima=100)
     print(f"\n✅ Resultados salvos em: {caminho_excel}")
 
 # ========== EXECUÇÃO ==========
@@ -115,27 +105,34 @@ if __name__ == "__main__":
     caminho_decreto = r"W:\MINISTÉRIO DAS CIDADES\Consulta 7217\apresentação\base decreto.txt"
     pasta_pdfs = r"W:\MINISTÉRIO DAS CIDADES\Consulta 7217\Contribuições PDF"
     saida_excel = r"W:\MINISTÉRIO DAS CIDADES\Consulta 7217\avaliacao_contribuicoes_semantica.xlsx"
+    backend_pdf = "pymupdf" # ou "pypdf2" (ver benchmark_extracao_pdf.py)
+
+    # Carregar classificador semântico (zero-shot). Fica aqui, e não no topo do módulo, para os
+    # processos de extração (que importam este script no Windows) não carregarem o modelo.
+    classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
 
     temas_decreto = extrair_temas_decreto(caminho_decreto)
     lista_temas = list(temas_decreto.keys())
 
     resultados = []
 
-    for nome_arquivo in os.listdir(pasta_pdfs):
-        if nome_arquivo.lower().endswith(".pdf"):
-            caminho_pdf = os.path.join(pasta_pdfs, nome_arquivo)
-            texto = ler_pdf(caminho_pdf)
-            if texto:
-                aval = avaliar_contribuicao(texto, temas_decreto)
-                tema_sem, conf = classificar_com_transformer(texto, lista_temas)
-                aval["classificacao_semantica"] = tema_sem
-                aval["confianca_semantica"] = conf
-                resultados.append({
-                    "arquivo": nome_arquivo,
-                    "avaliacao": aval
-                })
+    # Os PDFs são extraídos em paralelo; cada um é classificado assim que o seu texto fica pronto.
+    for nome_arquivo, texto, _, erros in extrair_pasta(pasta_pdfs, backend=backend_pdf):
+        if texto is None:
+            print(f"Erro ao ler PDF {os.path.join(pasta_pdfs, nome_arquivo)}: {erros[0]}")
+            continue
+        if texto:
+            aval = avaliar_contribuicao(texto, temas_decreto)
+            tema_sem, conf = classificar_com_transformer(texto, lista_temas)
+            aval["classificacao_semantica"] = tema_sem
+            aval["confianca_semantica"] = conf
+            resultados.append({
+                "arquivo": nome_arquivo,
+                "avaliacao": aval
+            })
 
     if resultados:
+        resultados.sort(key=lambda r: r["arquivo"]) # Chegam na ordem de conclusão da extração
         salvar_resultados_excel(resultados, saida_excel)
     else:
         print("⚠️ Nenhum PDF processado com sucesso.")
@@ -1,14 +1,15 @@
-import pandas as pd
 import logging
 from docx import Document
-from docx.shared import Pt
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
 from pathlib import Path
-from collections import defaultdict
 import re
 
+from cache_planilha import carregar_planilha
+from normalizacao_contribuicoes import normalizar_contribuicoes, contribuicoes_por_item
+from renderizador_celulas import renderizador_do_documento
+from indice_linhas_word import IndiceLinhasWord
+
 # ==============================================================================
 # 1. CONFIGURAÇÃO INICIAL
 # ==============================================================================
@@ -36,58 +37,16 @@ def limpar_celula(celula) -> None:
     for paragraph in celula.paragraphs:
         for run in paragraph.runs:
             run.text = ""
-    while len(celula.paragraphs) >= 52:
-        celula._element.remove(celula.paragraphs[0]._element)
-
-def adicionar_linha_separadora(paragraph):
-    """Adiciona uma borda inferior ao parágrafo para criar uma linha separadora"""
-    p_pr = paragraph._p.get_or_add_pPr()
-    p_bdr = OxmlElement('w:pBdr')
-    p_pr.append(p_bdr)
-    
-    bottom_border = OxmlElement('w:bottom')
-    bottom_border.set(qn('w:val'), 'single')
-    bottom_border.set(qn('w:sz'), '6')
-    bottom_border.set(qn('w:space'), '1')
-    bottom_border.set(qn('w:color'), 'auto')
-    
-    p_bdr.append(bottom_border)
+    # Mesmo efeito do antigo 'while len(celula.paragraphs) >= 52', sem reconsultar a lista a cada remoção
+    paragrafos = celula._tc.findall(qn('w:p'))
+    for p in paragrafos[:max(0, len(paragrafos) - 51)]:
+        celula._tc.remove(p)
 
 def formatar_celula_com_contribuicoes(celula, contribuicoes: list, fonte: str = 'Calibri', tamanho: int = 8):
     """Preenche a célula com as contribuições usando linhas gráficas como separadores"""
     limpar_celula(celula)
-    
-    for idx, contrib in enumerate(contribuicoes):
-        # Adicionar número da contribuição
-        p_num = celula.add_paragraph()
-        run_num = p_num.add_run(contrib['numero'])
-        run_num.font.name = fonte
-        run_num.font.size = Pt(tamanho)
-        run_num.bold = True
-        
-        # Adicionar Titulo da Contribuição 
-        p_num = celula.add_paragraph()
-        run_num = p_num.add_run(contrib['Titulo da Contribuição'])
-        run_num.font.name = fonte
-        run_num.font.size = Pt(tamanho)
-        
-        # Adicionar texto da contribuição
-        p_texto = celula.add_paragraph(contrib['texto'])
-        for run in p_texto.runs:
-            run.font.name = fonte
-            run.font.size = Pt(tamanho)
-        
-        # Adicionar nome do autor
-        p_autor = celula.add_paragraph()
-        run_autor = p_autor.add_run(f"({contrib['nome']})")
-        run_autor.font.name = fonte
-        run_autor.font.size = Pt(tamanho)
-        run_autor.italic = True
-        
-        # Adicionar linha separadora (exceto após a última contribuição)
-        if idx < len(contribuicoes) - 1:
-            p_separador = celula.add_paragraph()
-            adicionar_linha_separadora(p_separador)
+    # Parágrafos montados direto em XML, referenciando estilos registrados uma vez no documento
+    renderizador_do_documento(celula, fonte, tamanho).preencher(celula, contribuicoes)
 
 def validar_item(item: str) -> int:
     """Valida e converte valores de item com tratamento robusto"""
@@ -106,10 +65,8 @@ def main() -> None:
     logging.info(f"Iniciando leitura do Excel: {ARQUIVO_EXCEL}")
     
     try:
-        df = pd.read_excel(
+        df = carregar_planilha(
             ARQUIVO_EXCEL,
-            engine="openpyxl",
-            dtype=str,
             usecols=['Item CP alterado', 'Numero', 'Titulo da Contribuição ','Texto', 'Nome']
             )
 
@@ -118,35 +75,14 @@ def main() -> None:
         logging.exception(f"Falha na leitura do Excel: {e}")
         return
 
-    # Pré-processamento de dados
-    for col in df.columns:
-        if df[col].dtype == 'object': # Verifica se a coluna contém strings
-            df[col] = df[col].astype(str).str.replace('_x000D_', '\n', regex=False)
-    df.columns = df.columns.str.strip()
-    
-    # Filtragem e validação de itens
-    df['Item_validado'] = df['Item CP alterado'].apply(validar_item)
-    df = df.dropna(subset=['Item_validado'])
-    df['Item_validado'] = df['Item_validado'].astype(int)
-    df = df[df['Item_validado'] == 0]
+    # Normalização, filtragem e agrupamento (etapa vetorizada, sem apply/iterrows)
+    df = normalizar_contribuicoes(df, filtro_item=lambda item: item == 0)
     
     if df.empty:
         logging.warning("Nenhum dado válido encontrado após filtragem!")
         return
 
-    # Agrupamento de contribuições em formato estruturado
-    contrib_por_item = defaultdict(list)
-    df = df.sort_values(by=["Item_validado", "Numero"])
-    
-    for _, row in df.iterrows():
-        item = row['Item_validado']
-        contrib = {
-            'numero': f"{row['Numero']}" if pd.notna(row['Numero']) else "[sem número]",
-            'Titulo da Contribuição': row['Titulo da Contribuição'] if pd.notna(row['Titulo da Contribuição']) else "[sem Titulo da Contribuição]", 
-            'texto': row['Texto'] if pd.notna(row['Texto']) else "[sem texto]",
-            'nome': row['Nome'] if pd.notna(row['Nome']) else "[autor desconhecido]"
-        }
-        contrib_por_item[item].append(contrib)
+    contrib_por_item = contribuicoes_por_item(df)
     
     logging.info(f"Contribuições agrupadas para {len(contrib_por_item)} itens")
 
@@ -159,21 +95,22 @@ def main() -> None:
 
     itens_atualizados = 0
     
-    for tabela in doc.tables:
-        for linha in tabela.rows:
-            if len(linha.cells) < 3:
-                continue
-                
-            celula_item = linha.cells[0]
-            item_cp = validar_item(celula_item.text)
-            
-            if item_cp and item_cp in contrib_por_item:
-                formatar_celula_com_contribuicoes(
-                    linha.cells[2], 
-                    contrib_por_item[item_cp],
-                    tamanho=8
-                )
-                itens_atualizados += 1
+    # Linhas das tabelas indexadas numa única varredura do XML
+    indice_linhas = IndiceLinhasWord.de_documento(doc, chave=validar_item)
+
+    for linha in indice_linhas.todas:
+        if len(linha) < 3:
+            continue
+
+        item_cp = linha.item
+
+        if item_cp and item_cp in contrib_por_item:
+            formatar_celula_com_contribuicoes(
+                linha.celula(2), 
+                contrib_por_item[item_cp],
+                tamanho=8
+            )
+            itens_atualizados += 1
 
     # Salvamento do resultado
     try:
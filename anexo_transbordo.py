@@ -0,0 +1,144 @@
+import logging
+from pathlib import Path
+
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+from renderizador_celulas import inserir_xml, renderizador_do_documento
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+# Limites padrão acima dos quais a célula recebe só um resumo e o texto integral vai para o anexo.
+MAX_CONTRIBUICOES = 15
+MAX_CARACTERES = 20000
+
+TITULO_ANEXO = "ANEXO – Íntegra das contribuições dos itens extensos"
+
+
+def nome_ancora(item) -> str:
+    """
+    Nome do indicador (bookmark) do item no anexo.
+    """
+    return f"anexo_item_{item}"
+
+
+# ==============================================================================
+# 2. ANEXO
+# ==============================================================================
+
+class AnexoTransbordo:
+    """
+    Política de transbordo para as células de "Visões das contribuições" muito extensas.
+
+    Quando um item passa de 'max_contribuicoes' contribuições ou de 'max_caracteres' caracteres
+    de texto, a célula recebe só um resumo (quantidade, números CP e autores) com um hiperlink
+    interno, e a íntegra vai para uma seção de anexo no fim do documento ou, com
+    'caminho_anexo', para um documento à parte. Assim a tabela principal fica com altura
+    limitada, e a paginação do Word e do LibreOffice deixa de depender dos itens mais volumosos.
+    """
+
+    def __init__(self, documento, max_contribuicoes=MAX_CONTRIBUICOES, max_caracteres=MAX_CARACTERES,
+                 caminho_anexo=None, fonte='Calibri', tamanho=8, cor='auto'):
+        self.documento = documento
+        self.max_contribuicoes = max_contribuicoes
+        self.max_caracteres = max_caracteres
+        self.caminho_anexo = Path(caminho_anexo) if caminho_anexo else None
+        self.fonte, self.tamanho, self.cor = fonte, tamanho, cor
+        self.itens = {} # Item -> contribuições enviadas ao anexo, na ordem do documento
+        self._r_id_anexo = None
+
+    def excede(self, contribuicoes) -> bool:
+        if self.max_contribuicoes is not None and len(contribuicoes) > self.max_contribuicoes:
+            return True
+        if self.max_caracteres is not None:
+            total = 0
+            for contrib in contribuicoes:
+                total += len(str(contrib['texto'])) + len(str(contrib['Titulo da Contribuição']))
+                if total > self.max_caracteres:
+                    return True
+        return False
+
+    def preencher(self, celula, item, contribuicoes) -> bool:
+        """
+        Escreve o resumo na célula se o item exceder os limites (a célula já deve estar limpa).
+
+        Returns:
+            bool: True se o item foi para o anexo; False se a célula deve ser preenchida normalmente.
+        """
+        if not self.excede(contribuicoes):
+            return False
+        renderizador = renderizador_do_documento(celula, self.fonte, self.tamanho, self.cor)
+        numeros = ", ".join(str(contrib['numero']) for contrib in contribuicoes)
+        autores = ", ".join(dict.fromkeys(str(contrib['nome']) for contrib in contribuicoes))
+        local = "no documento anexo" if self.caminho_anexo else "no anexo ao final deste documento"
+        inserir_xml(celula, "".join([
+            renderizador.xml_paragrafo('numero', f"{len(contribuicoes)} contribuições: {numeros}"),
+            renderizador.xml_paragrafo('autor', f"({autores})"),
+            renderizador.xml_paragrafo(
+                'texto', f"Íntegra {local} (item {item})", ancora=nome_ancora(item), r_id=self._relacao_anexo()
+            ),
+        ]))
+        self.itens.setdefault(item, contribuicoes)
+        return True
+
+    def _relacao_anexo(self):
+        if self.caminho_anexo is None:
+            return None
+        if self._r_id_anexo is None:
+            self._r_id_anexo = self.documento.part.relate_to(self.caminho_anexo.name, RT.HYPERLINK, is_external=True)
+        return self._r_id_anexo
+
+    # --- Gravação do anexo ---
+
+    def finalizar(self):
+        """
+        Grava a íntegra dos itens que transbordaram: no fim do documento ou no documento anexo.
+
+        Returns:
+            Path | None: Caminho do documento anexo, quando gravado à parte.
+        """
+        if not self.itens:
+            return None
+        if self.caminho_anexo is None:
+            self._escrever_anexo(self.documento, quebra_de_pagina=True)
+            logging.info(f"Anexo com {len(self.itens)} itens acrescentado ao final do documento.")
+            return None
+        anexo = Document()
+        self._escrever_anexo(anexo, quebra_de_pagina=False)
+        anexo.save(self.caminho_anexo)
+        logging.info(f"Anexo com {len(self.itens)} itens gravado em {self.caminho_anexo}")
+        return self.caminho_anexo
+
+    def _escrever_anexo(self, documento, quebra_de_pagina) -> None:
+        corpo = documento.element.body
+        renderizador = renderizador_do_documento(documento, self.fonte, self.tamanho, self.cor)
+        id_indicador = 1 + max(
+            (int(b.get(qn('w:id'))) for b in corpo.iter(qn('w:bookmarkStart')) if b.get(qn('w:id'), '').isdigit()),
+            default=0,
+        )
+
+        partes = []
+        if quebra_de_pagina:
+            partes.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+        partes.append(renderizador.xml_paragrafo('numero', TITULO_ANEXO))
+        for item, contribuicoes in self.itens.items():
+            partes.append(
+                f'<w:p><w:bookmarkStart w:id="{id_indicador}" w:name="{nome_ancora(item)}"/>'
+                f'<w:bookmarkEnd w:id="{id_indicador}"/></w:p>'
+            )
+            partes.append(renderizador.xml_paragrafo('numero', f"Item {item} – {len(contribuicoes)} contribuições"))
+            partes.append(renderizador.xml_contribuicoes(contribuicoes))
+            id_indicador += 1
+
+        # Os parágrafos entram antes do w:sectPr final, que precisa continuar sendo o último filho do corpo.
+        fragmento = parse_xml(f'<w:body {nsdecls("w")}>{"".join(partes)}</w:body>')
+        sect_pr = corpo.find(qn('w:sectPr'))
+        for elemento in list(fragmento):
+            if sect_pr is not None:
+                sect_pr.addprevious(elemento)
+            else:
+                corpo.append(elemento)
@@ -0,0 +1,370 @@
+import logging
+import re
+import unicodedata
+import zlib
+from array import array
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    PYARROW_DISPONIVEL = True
+except ImportError:
+    PYARROW_DISPONIVEL = False
+
+from leitor_contribuicoes import CAMPOS_REGISTRO
+from normalizacao_contribuicoes import preparar_planilha, extrair_pares_item, normalizar_textos
+
+RE_NUMERO_CP = re.compile(r'^CP-([1-9]\d*)$') # Sem zeros à esquerda, para a volta ao texto ser exata
+SEM_NUMERO = -1 # Marca contribuições cujo número não segue o padrão 'CP-<dígitos>'
+
+# Compressão dos textos (zlib) em blocos de contribuições vizinhas na ordem dos itens. O texto em
+# português do decreto cai para menos de um terço em blocos de 64 KB; False guarda os buffers
+# sem compressão (leitura um pouco mais rápida, memória maior).
+COMPRIMIR_TEXTOS = True
+BYTES_POR_BLOCO = 64 * 1024
+NIVEL_COMPRESSAO = 6
+
+
+# ==============================================================================
+# 1. COLUNA DE TEXTO COMPACTA
+# ==============================================================================
+
+class ColunaTexto:
+    """
+    Coluna de textos guardada num único buffer UTF-8 com um vetor de offsets (layout do Arrow).
+
+    O texto i ocupa dados[offsets[i]:offsets[i + 1]]; não há um objeto str por valor até que
+    ele seja lido.
+    """
+
+    def __init__(self, offsets, dados):
+        self.offsets = offsets
+        self.dados = dados
+        self._memoria = memoryview(dados)
+
+    @classmethod
+    def de_serie(cls, serie):
+        """
+        Cria a coluna a partir de uma Series de textos sem valores nulos.
+
+        Com o pyarrow, os buffers da própria coluna Arrow são aproveitados; sem ele, os textos
+        são codificados e concatenados em Python.
+        """
+        if PYARROW_DISPONIVEL:
+            arr = pa.array(serie, type=pa.large_string())
+            if isinstance(arr, pa.ChunkedArray):
+                arr = arr.combine_chunks()
+            _, buffer_offsets, buffer_dados = arr.buffers()
+            offsets = np.frombuffer(buffer_offsets, dtype=np.int64)[arr.offset:arr.offset + len(arr) + 1]
+            inicio, fim = int(offsets[0]), int(offsets[-1])
+            dados = np.frombuffer(buffer_dados, dtype=np.uint8)[inicio:fim] if buffer_dados is not None else np.zeros(0, dtype=np.uint8)
+            return cls(offsets - inicio, dados)
+
+        codificados = [texto.encode('utf-8') for texto in serie]
+        offsets = np.zeros(len(codificados) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, codificados), dtype=np.int64, count=len(codificados)), out=offsets[1:])
+        return cls(offsets, np.frombuffer(b"".join(codificados), dtype=np.uint8))
+
+    def _trechos(self, ordem=None):
+        # Bytes de cada texto (views, sem cópia), na ordem das posições indicadas.
+        inicios, fins = self.offsets[:-1], self.offsets[1:]
+        if ordem is not None:
+            inicios, fins = inicios[ordem], fins[ordem]
+        offsets = np.zeros(len(inicios) + 1, dtype=np.int64)
+        np.cumsum(fins - inicios, out=offsets[1:])
+        return offsets, (self._memoria[inicio:fim] for inicio, fim in zip(inicios.tolist(), fins.tolist()))
+
+    def reordenar(self, ordem):
+        """
+        Nova coluna com os textos nas posições 'ordem' desta, em sequência.
+        """
+        offsets, trechos = self._trechos(ordem)
+        return ColunaTexto(offsets, np.frombuffer(b"".join(trechos), dtype=np.uint8))
+
+    def __getitem__(self, i) -> str:
+        return str(self._memoria[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return self.dados.nbytes + self.offsets.nbytes
+
+
+class ColunaTextoComprimida:
+    """
+    ColunaTexto com os dados comprimidos (zlib) em blocos de textos consecutivos.
+
+    Os offsets continuam sendo os dos textos descomprimidos e cada bloco começa no início de um
+    texto. Um bloco é descomprimido inteiro e mantido até que outro seja pedido: ler os textos
+    na ordem em que foram gravados descomprime cada bloco uma única vez.
+    """
+
+    def __init__(self, offsets, inicios_blocos, blocos):
+        self.offsets = offsets
+        self.inicios_blocos = inicios_blocos # Offset (descomprimido) em que cada bloco começa
+        self.blocos = blocos # Lista de bytes comprimidos
+        self._atual = (-1, b"") # (bloco, bytes descomprimidos); trocado de uma vez, seguro entre threads
+
+    @classmethod
+    def de_coluna(cls, coluna, ordem=None, bytes_por_bloco=BYTES_POR_BLOCO):
+        """
+        Comprime uma ColunaTexto, com os textos nas posições 'ordem' (padrão: a ordem atual).
+        Só um bloco de cada vez fica descomprimido durante a criação.
+        """
+        offsets, trechos = coluna._trechos(ordem)
+        inicios_blocos, blocos, bloco = [0], [], bytearray()
+        for posicao, trecho in enumerate(trechos):
+            if len(bloco) >= bytes_por_bloco:
+                blocos.append(zlib.compress(bloco, NIVEL_COMPRESSAO))
+                inicios_blocos.append(int(offsets[posicao]))
+                bloco = bytearray()
+            bloco += trecho
+        blocos.append(zlib.compress(bloco, NIVEL_COMPRESSAO))
+        return cls(offsets, np.array(inicios_blocos, dtype=np.int64), blocos)
+
+    def __getitem__(self, i) -> str:
+        inicio, fim = int(self.offsets[i]), int(self.offsets[i + 1])
+        bloco = int(np.searchsorted(self.inicios_blocos, inicio, side='right')) - 1
+        atual = self._atual
+        if atual[0] != bloco:
+            atual = (bloco, zlib.decompress(self.blocos[bloco]))
+            self._atual = atual
+        base = int(self.inicios_blocos[bloco])
+        return str(atual[1][inicio - base:fim - base], 'utf-8')
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return self.offsets.nbytes + self.inicios_blocos.nbytes + sum(len(bloco) for bloco in self.blocos)
+
+
+# ==============================================================================
+# 2. VISÃO DAS CONTRIBUIÇÕES DE UM ITEM
+# ==============================================================================
+
+class VisaoItem:
+    """
+    Contribuições de um item como fatia (sem cópia) da permutação ordenada do armazém.
+
+    Comporta-se como a lista de dicts usada pelos preenchedores: len(), iteração, índice e
+    fatias. Cada dict só é montado quando a contribuição é acessada.
+    """
+
+    def __init__(self, armazem, posicoes):
+        self._armazem = armazem
+        self.posicoes = posicoes # Fatia de armazem.permutacao (view do numpy)
+
+    def __len__(self) -> int:
+        return len(self.posicoes)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return VisaoItem(self._armazem, self.posicoes[indice])
+        return self._armazem.contribuicao(self.posicoes[indice])
+
+    def __iter__(self):
+        for posicao in self.posicoes:
+            yield self._armazem.contribuicao(posicao)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+# ==============================================================================
+# 3. ARMAZÉM DE CONTRIBUIÇÕES
+# ==============================================================================
+
+class ArmazemContribuicoes:
+    """
+    Armazém compacto de contribuições, agrupadas por item.
+
+    Cada contribuição é guardada uma única vez, mesmo quando altera vários itens: os campos de
+    texto ficam em ColunaTexto (comprimidos em blocos, com COMPRIMIR_TEXTOS), os números
+    'CP-930603' viram inteiros (930603) e os itens são intervalos contíguos de uma permutação
+    ordenada por (item, número). As contribuições são gravadas na ordem em que os itens as
+    leem, de modo que percorrer um item lê posições vizinhas dos buffers. Substitui o
+    defaultdict(list) de dicts do 'contrib_por_item' com a mesma interface de leitura
+    (item in armazem, armazem[item], len(armazem)).
+    """
+
+    CAMPOS_TEXTO = ('Titulo da Contribuição', 'texto', 'justificativa', 'nome')
+
+    def __init__(self, numeros, colunas, itens_unicos, inicios, permutacao, numeros_fora_do_padrao=None):
+        self.numeros = numeros
+        self.colunas = colunas
+        self.itens_unicos = itens_unicos
+        self.inicios = inicios
+        self.permutacao = permutacao
+        self.numeros_fora_do_padrao = numeros_fora_do_padrao or {}
+        self._posicao_do_item = {int(item): i for i, item in enumerate(itens_unicos)}
+
+    @classmethod
+    def de_dataframe(cls, df, filtro_item=None, limpar_texto=False):
+        """
+        Cria o armazém a partir da planilha lida do Excel (uma contribuição por linha).
+
+        Args:
+            df (pd.DataFrame): Planilha com 'Item CP alterado', 'Numero', 'Texto', 'Nome'...
+            filtro_item (callable, opcional): Recebe um número de item (int) e retorna True para mantê-lo.
+            limpar_texto (bool): Aplica strip + NFKC aos textos (ver normalizar_contribuicoes).
+        """
+        df = preparar_planilha(df)
+        pares = extrair_pares_item(df, filtro_item)
+        linhas = pares['linha'].unique()
+        textos = normalizar_textos(df, linhas, limpar_texto)
+
+        # Números 'CP-<dígitos>' viram inteiros; os demais são guardados à parte, em texto.
+        numeros_texto = textos['numero'] if 'numero' in textos.columns else pd.Series("[sem número]", index=textos.index)
+        digitos = numeros_texto.astype(str).str.extract(RE_NUMERO_CP.pattern)[0]
+        numeros = pd.to_numeric(digitos, errors='coerce').fillna(SEM_NUMERO).astype(np.int64).to_numpy()
+        numeros_fora_do_padrao = {
+            i: texto for i, texto in enumerate(numeros_texto.astype(str)) if numeros[i] == SEM_NUMERO
+        }
+
+        colunas = {
+            campo: ColunaTexto.de_serie(textos[campo])
+            for campo in cls.CAMPOS_TEXTO if campo in textos.columns
+        }
+
+        # Posição compacta (0..n-1) de cada par.
+        posicao = pd.Index(linhas).get_indexer(pares['linha'].to_numpy())
+        itens = pares['item'].to_numpy(dtype=np.int64)
+        return cls._agrupar(numeros, numeros_texto.astype(str).to_numpy(), colunas, posicao, itens, numeros_fora_do_padrao)
+
+    @classmethod
+    def de_registros(cls, registros, limpar_texto=False):
+        """
+        Cria o armazém a partir dos registros de leitor_contribuicoes.ler_contribuicoes.
+
+        Cada registro é copiado para os buffers das colunas assim que chega e depois descartado:
+        com a leitura em fluxo, nem a planilha inteira nem a lista de dicts ficam em memória, só
+        o próprio armazém.
+
+        Args:
+            registros (iterable): Dicts com 'itens', 'numero' e os campos de CAMPOS_TEXTO.
+            limpar_texto (bool): Aplica strip + NFKC aos textos (ver normalizar_contribuicoes).
+        """
+        padroes = {chave: padrao for chave, (_, padrao) in CAMPOS_REGISTRO.items()}
+        numeros = array('q')
+        numeros_texto = []
+        numeros_fora_do_padrao = {}
+        dados = {campo: bytearray() for campo in cls.CAMPOS_TEXTO}
+        offsets = {campo: array('q', [0]) for campo in cls.CAMPOS_TEXTO}
+        campos = None
+        posicao, itens = array('q'), array('q')
+
+        for i, registro in enumerate(registros):
+            if campos is None: # A leitura só traz os campos das colunas presentes na planilha
+                campos = [campo for campo in cls.CAMPOS_TEXTO if campo in registro]
+            numero = registro.get('numero', padroes['numero'])
+            if limpar_texto:
+                numero = unicodedata.normalize('NFKC', numero.strip()) or padroes['numero']
+            correspondencia = RE_NUMERO_CP.match(numero)
+            numeros.append(int(correspondencia.group(1)) if correspondencia else SEM_NUMERO)
+            if not correspondencia:
+                numeros_fora_do_padrao[i] = numero
+            numeros_texto.append(numero)
+
+            for campo in campos:
+                texto = registro[campo]
+                if limpar_texto:
+                    texto = unicodedata.normalize('NFKC', texto.strip()) or padroes[campo]
+                dados[campo] += texto.encode('utf-8')
+                offsets[campo].append(len(dados[campo]))
+            for item in registro['itens']:
+                posicao.append(i)
+                itens.append(item)
+
+        colunas = {
+            campo: ColunaTexto(np.frombuffer(offsets[campo], dtype=np.int64), np.frombuffer(dados[campo], dtype=np.uint8))
+            for campo in campos or []
+        }
+        return cls._agrupar(
+            np.frombuffer(numeros, dtype=np.int64), np.array(numeros_texto, dtype=object), colunas,
+            np.frombuffer(posicao, dtype=np.int64), np.frombuffer(itens, dtype=np.int64), numeros_fora_do_padrao,
+        )
+
+    @classmethod
+    def _agrupar(cls, numeros, numeros_texto, colunas, posicao, itens, numeros_fora_do_padrao):
+        # Ordena os pares contribuição/item por (item, número em texto) e marca onde começa cada item.
+        ordem_numero = pd.factorize(numeros_texto, sort=True)[0]
+        ordem = np.lexsort((ordem_numero[posicao], itens))
+        permutacao = posicao[ordem].astype(np.int64)
+        itens_ordenados = itens[ordem]
+
+        # Regrava as contribuições na ordem da primeira aparição na permutação, renumerando as posições.
+        gravacao = pd.unique(permutacao)
+        nova_posicao = np.empty(len(numeros), dtype=np.int64)
+        nova_posicao[gravacao] = np.arange(len(gravacao))
+        permutacao = nova_posicao[permutacao]
+        numeros = numeros[gravacao]
+        numeros_fora_do_padrao = {int(nova_posicao[i]): texto for i, texto in numeros_fora_do_padrao.items()}
+        colunas = {
+            campo: ColunaTextoComprimida.de_coluna(coluna, gravacao) if COMPRIMIR_TEXTOS else coluna.reordenar(gravacao)
+            for campo, coluna in colunas.items()
+        }
+        itens_unicos, inicios = np.unique(itens_ordenados, return_index=True)
+        inicios = np.append(inicios, len(itens_ordenados)).astype(np.int64)
+
+        armazem = cls(numeros, colunas, itens_unicos, inicios, permutacao, numeros_fora_do_padrao)
+        logging.info(f"Armazém de contribuições criado: {len(numeros)} contribuições, {len(armazem)} itens, {armazem.nbytes / 1024:.0f} KB.")
+        return armazem
+
+    # --- Acesso por contribuição ---
+
+    def numero_texto(self, posicao) -> str:
+        numero = self.numeros[posicao]
+        if numero == SEM_NUMERO:
+            return self.numeros_fora_do_padrao.get(int(posicao), "[sem número]")
+        return f"CP-{numero}"
+
+    def contribuicao(self, posicao) -> dict:
+        """
+        Monta o dict da contribuição no formato de formatar_celula_com_contribuicoes.
+        """
+        registro = {'numero': self.numero_texto(posicao)}
+        for campo, coluna in self.colunas.items():
+            registro[campo] = coluna[posicao]
+        return registro
+
+    # --- Acesso por item ---
+
+    def contribuicoes(self, item) -> VisaoItem:
+        i = self._posicao_do_item.get(item)
+        if i is None:
+            return VisaoItem(self, self.permutacao[0:0])
+        return VisaoItem(self, self.permutacao[self.inicios[i]:self.inicios[i + 1]])
+
+    def itens(self) -> list:
+        return [int(item) for item in self.itens_unicos]
+
+    def __getitem__(self, item) -> VisaoItem:
+        if item not in self._posicao_do_item:
+            raise KeyError(item)
+        return self.contribuicoes(item)
+
+    def __contains__(self, item) -> bool:
+        return item in self._posicao_do_item
+
+    def __len__(self) -> int:
+        return len(self.itens_unicos)
+
+    @property
+    def total_pares(self) -> int:
+        """
+        Quantidade de pares contribuição/item (linhas que o DataFrame normalizado teria).
+        """
+        return len(self.permutacao)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.numeros.nbytes + self.permutacao.nbytes + self.inicios.nbytes + self.itens_unicos.nbytes
+            + sum(coluna.nbytes for coluna in self.colunas.values())
+        )
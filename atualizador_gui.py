@@ -3,12 +3,16 @@ import logging
 import pandas as pd
 import unicodedata
 from docx import Document
-from docx.shared import Pt
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QFileDialog, QPushButton, QLabel,
     QVBoxLayout, QHBoxLayout, QLineEdit, QCheckBox, QMessageBox
 )
 
+from cache_planilha import carregar_planilha
+from estilos_documento import estilo_celula
+from indice_itens import ItemIndex
+from indice_linhas_word import IndiceLinhasWord, item_somente_digitos
+
 # ==============================================================================
 # FUNÇÕES AUXILIARES
 # ==============================================================================
@@ -21,11 +25,8 @@ def limpar_texto(texto):
 
 def formatar_celula(celula, texto, nome_fonte='Calibri', tamanho_fonte=10, negrito=False):
     celula.text = texto
-    paragraph = celula.paragraphs[0]
-    run = paragraph.add_run() if not paragraph.runs else paragraph.runs[0]
-    run.font.name = nome_fonte
-    run.font.size = Pt(tamanho_fonte)
-    run.bold = negrito
+    # Fonte, tamanho e negrito vêm de um estilo de parágrafo registrado uma vez no documento
+    celula.paragraphs[0]._p.style = estilo_celula(celula.part, nome_fonte, tamanho_fonte, negrito)
 
 
 def processar_contribuicoes(arquivo_excel, word_entrada, word_saida, debug=False):
@@ -35,52 +36,47 @@ def processar_contribuicoes(arquivo_excel, word_entrada, word_saida, debug=False
         logging.basicConfig(level=logging.INFO)
 
     logging.info(f"Lendo Excel: {arquivo_excel}")
-    df = pd.read_excel(arquivo_excel, engine="openpyxl")
+    df = carregar_planilha(arquivo_excel)
     df.columns = df.columns.str.strip()
 
     colunas_desejadas = ['Item CP alterado', 'Numero', 'Texto', 'Justificativa', 'Nome']
     df = df[colunas_desejadas].dropna()
-    df["Item CP alterado"] = pd.to_numeric(df["Item CP alterado"], errors="coerce").astype('Int64')
-    df = df.dropna(subset=["Item CP alterado"])
-    df = df[df["Item CP alterado"] >= 100]
 
-    df_agrupado = df.groupby("Item CP alterado").agg(lambda x: list(x)).reset_index()
+    # Índice item -> contribuições, montado uma vez e consultado em O(1) por linha do Word
+    indice = ItemIndex.de_dataframe(df, filtro_item=lambda item: item >= 100)
 
     logging.info(f"Abrindo documento Word: {word_entrada}")
     doc = Document(word_entrada)
 
     itens_atualizados = 0
-    for table in doc.tables:
-        for row in table.rows:
-            item_cp_cell_text = row.cells[0].text.strip()
-            if item_cp_cell_text.isdigit():
-                item_cp_word = int(item_cp_cell_text)
-                matching_row = df_agrupado[df_agrupado["Item CP alterado"] == item_cp_word]
-
-                if not matching_row.empty:
-                    contrib_list = []
-                    for num, texto, justificativa, nome in zip(
-                        matching_row["Numero"].values[0],
-                        matching_row["Texto"].values[0],
-                        matching_row["Justificativa"].values[0],
-                        matching_row["Nome"].values[0]
-                    ):
-                        if pd.notna(texto) and pd.notna(justificativa):
-                            contrib_list.append(
-                                f"CP-{item_cp_word}: {limpar_texto(num)}\r\n"
-                                f"{limpar_texto(texto)}\r\n"
-                                f"{limpar_texto(justificativa)}\r\n"
-                                f"({limpar_texto(nome)})"
-                            )
-
-                    if contrib_list:
-                        texto_completo = "\r\n\r\n".join(contrib_list)
-                        logging.debug(f"Item {item_cp_word}, Visões:\n{texto_completo}")
-                        formatar_celula(row.cells[2], texto=texto_completo, tamanho_fonte=8)
-
-                    formatar_celula(row.cells[0], texto=str(item_cp_word), tamanho_fonte=10, negrito=True)
-                    formatar_celula(row.cells[1], texto="")
-                    itens_atualizados += 1
+    # Linhas das tabelas indexadas numa única varredura do XML
+    indice_linhas = IndiceLinhasWord.de_documento(doc, chave=item_somente_digitos)
+    for row in indice_linhas.todas:
+        if row.item is not None:
+            item_cp_word = row.item
+            contribuicoes = indice.contribuicoes(item_cp_word)
+
+            if contribuicoes:
+                contrib_list = []
+                for contrib in contribuicoes:
+                    num, texto = contrib["Numero"], contrib["Texto"]
+                    justificativa, nome = contrib["Justificativa"], contrib["Nome"]
+                    if pd.notna(texto) and pd.notna(justificativa):
+                        contrib_list.append(
+                            f"CP-{item_cp_word}: {limpar_texto(num)}\r\n"
+                            f"{limpar_texto(texto)}\r\n"
+                            f"{limpar_texto(justificativa)}\r\n"
+                            f"({limpar_texto(nome)})"
+                        )
+
+                if contrib_list:
+                    texto_completo = "\r\n\r\n".join(contrib_list)
+                    logging.debug(f"Item {item_cp_word}, Visões:\n{texto_completo}")
+                    formatar_celula(row.celula(2), texto=texto_completo, tamanho_fonte=8)
+
+                formatar_celula(row.celula(0), texto=str(item_cp_word), tamanho_fonte=10, negrito=True)
+                formatar_celula(row.celula(1), texto="")
+                itens_atualizados += 1
 
     doc.save(word_saida)
     logging.info(f"{itens_atualizados} itens atualizados. Word salvo em {word_saida}")
@@ -1,12 +1,10 @@
 import re
 import os
-import PyPDF2
-from openpyxl import Workbook
+from exportador_tabelas import exportar_linhas
+from extracao_pdf import extrair_pasta, extrair_texto
 
 from transformers import pipeline
 
-classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
-
 def classificar_com_transformer(texto_contribuicao, lista_temas):
     """
     Usa modelo de linguagem para classificar contribuição entre os temas.
@@ -52,22 +50,19 @@ def extrair_temas_decreto(caminho_arquivo_decreto):
 
     return temas_decreto
 
-def ler_pdf(caminho_pdf):
+def ler_pdf(caminho_pdf, backend=None):
     """
-    Lê o texto de um arquivo PDF.
+    Lê o texto de um arquivo PDF (do cache da pasta, se o mesmo conteúdo já foi lido; ver cache_textos_pdf.py).
 
     Args:
         caminho_pdf (str): O caminho para o arquivo PDF.
+        backend (str, opcional): 'pymupdf' ou 'pypdf2'. Padrão: extracao_pdf.BACKEND_PADRAO.
 
     Returns:
         str: O texto completo do PDF, ou None em caso de erro.
     """
-    texto = ""
     try:
-        with open(caminho_pdf, 'rb') as arquivo_pdf:
-            leitor_pdf = PyPDF2.PdfReader(arquivo_pdf)
-            for pagina in leitor_pdf.pages:
-                texto += pagina.extract_text() or ""  # Handle None returns
+        texto, _, _ = extrair_texto(caminho_pdf, backend)
         return texto
     except FileNotFoundError:
         print(f"Erro: Arquivo PDF não encontrado em '{caminho_pdf}'")
@@ -176,40 +171,31 @@ def salvar_resultados_em_excel(resultados, caminho_excel):
                           o texto da contribuição e sua avaliação.
         caminho_excel (str): O caminho para o arquivo XLSX onde os resultados serão salvos.
     """
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Avaliação das Contribuições"
-
-    # Cabeçalhos
-    sheet['A1'] = "Arquivo PDF"
-    sheet['B1'] = "Resumo"
-    sheet['C1'] = "Tipo de Contribuição"
-    sheet['D1'] = "Temas Relevantes"
-    sheet['E1'] = "Relevância (por tema)"
-    sheet['F1'] = "Artigos Mencionados"
-    sheet['G1'] = "Força do Argumento"
-    sheet['H1'] = "Notas do Argumento"
-    sheet['I1'] = "Tema Semântico (Transformer)"
-    sheet['J1'] = "Confiança (%)"
-
-    sheet.cell(row=linha, column=9, value=resultado["avaliacao"].get("classificacao_semantica", ""))
-    sheet.cell(row=linha, column=10, value=round(resultado["avaliacao"].get("confianca_semantica", 0) * 100, 2))
-
-
-    linha = 2
-    for resultado in resultados:
-        sheet.cell(row=linha, column=1, value=resultado["arquivo"])
-        sheet.cell(row=linha, column=2, value=resultado["avaliacao"]["summary"])
-        sheet.cell(row=linha, column=3, value=resultado["avaliacao"]["contribution_type"])
-        sheet.cell(row=linha, column=4, value=", ".join(resultado["avaliacao"].get("thematic_analysis", {}).keys()))
-        sheet.cell(row=linha, column=5, value=str(resultado["avaliacao"].get("thematic_analysis", {})))
-        sheet.cell(row=linha, column=6, value=", ".join(resultado["avaliacao"].get("legal_references", [])))
-        sheet.cell(row=linha, column=7, value=resultado["avaliacao"].get("argument_assessment", {}).get("strength", ""))
-        sheet.cell(row=linha, column=8, value=resultado["avaliacao"].get("argument_assessment", {}).get("notes", "") )
-        linha += 1
+    cabecalho = [
+        "Arquivo PDF", "Resumo", "Tipo de Contribuição", "Temas Relevantes", "Relevância (por tema)",
+        "Artigos Mencionados", "Força do Argumento", "Notas do Argumento",
+        "Tema Semântico (Transformer)", "Confiança (%)",
+    ]
+
+    def linhas():
+        for resultado in resultados:
+            avaliacao = resultado["avaliacao"]
+            yield [
+                resultado["arquivo"],
+                avaliacao["summary"],
+                avaliacao["contribution_type"],
+                ", ".join(avaliacao.get("thematic_analysis", {}).keys()),
+                str(avaliacao.get("thematic_analysis", {})),
+                ", ".join(avaliacao.get("legal_references", [])),
+                avaliacao.get("argument_assessment", {}).get("strength", ""),
+                avaliacao.get("argument_assessment", {}).get("notes", ""),
+                avaliacao.get("classificacao_semantica", ""),
+                round(avaliacao.get("confianca_semantica", 0) * 100, 2),
+            ]
 
     try:
-        workbook.save(caminho_excel)
+        # Cada linha é gravada assim que produzida; 'resultados' pode ser um gerador.
+        exportar_linhas(caminho_excel, cabecalho, linhas(), titulo_aba="Avaliação das Contribuições", largura_maxima=100)
         print(f"Resultados salvos em '{caminho_excel}'")
     except Exception as e:
         print(f"Ocorreu um erro ao salvar o arquivo Excel: {e}")
@@ -218,6 +204,11 @@ if __name__ == "__main__":
     caminho_arquivo_decreto = r"W:\MINISTÉRIO DAS CIDADES\Consulta 7217\apresentação\base decreto.txt"
     pasta_contribuicoes = r"W:\MINISTÉRIO DAS CIDADES\Consulta 7217\Contribuições PDF"
     caminho_arquivo_excel = r"W:\MINISTÉRIO DAS CIDADES\Consulta 7217\avaliacao_contribuicoes.xlsx"
+    backend_pdf = "pymupdf" # ou "pypdf2" (ver benchmark_extracao_pdf.py)
+
+    # O modelo é carregado aqui, e não no topo do módulo, para os processos de extração
+    # (que importam este script no Windows) não o carregarem de novo.
+    classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
 
     temas_decreto_7217 = extrair_temas_decreto(caminho_arquivo_decreto)
 
@@ -226,11 +217,11 @@ if __name__ == "__main__":
         exit()
 
     resultados_avaliacao = []
-    arquivos_pdf = [arquivo for arquivo in os.listdir(pasta_contribuicoes) if arquivo.lower().endswith(".pdf")]
 
-    for arquivo_pdf in arquivos_pdf:
-        caminho_completo_pdf = os.path.join(pasta_contribuicoes, arquivo_pdf)
-        texto_contribuicao = ler_pdf(caminho_completo_pdf)
+    # Extração em paralelo: cada PDF é avaliado assim que o seu texto fica pronto.
+    for arquivo_pdf, texto_contribuicao, _, erros in extrair_pasta(pasta_contribuicoes, backend=backend_pdf):
+        if texto_contribuicao is None:
+            print(f"Ocorreu um erro ao ler o PDF '{os.path.join(pasta_contribuicoes, arquivo_pdf)}': {erros[0]}")
 
         if texto_contribuicao:
             avaliacao = avaliar_contribuicao(texto_contribuicao, temas_decreto_7217)
@@ -244,6 +235,7 @@ if __name__ == "__main__":
             print(f"Não foi possível ler o arquivo: {arquivo_pdf}")
 
     if resultados_avaliacao:
+        resultados_avaliacao.sort(key=lambda r: r["arquivo"]) # Chegam na ordem de conclusão da extração
         salvar_resultados_em_excel(resultados_avaliacao, caminho_arquivo_excel)
     else:
         print("Nenhuma contribuição válida encontrada para avaliar.")
\ No newline at end of file
@@ -0,0 +1,134 @@
+import logging
+import random
+import tempfile
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import pymupdf
+
+from extracao_pdf import EXTRATORES, _DISPONIVEIS, obter_extrator
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+ARQUIVOS = 150 # PDFs no corpus sintético
+PAGINAS = (1, 40) # Mínimo e máximo de páginas por PDF
+REPETICOES = 3 # Melhor de N execuções para cada backend
+
+PALAVRAS = ("saneamento", "básico", "regulação", "prestação", "serviços", "água", "esgoto", "tarifa",
+            "município", "universalização", "drenagem", "resíduos", "titularidade", "ação", "contribuição",
+            "art.", "§", "inciso", "–", "“proposta”", "Decreto", "nº", "7.217/2010", "União", "Estados")
+
+
+# ==============================================================================
+# 2. CORPUS SINTÉTICO
+# ==============================================================================
+
+def gerar_corpus(pasta, arquivos=ARQUIVOS, semente=7217) -> dict:
+    """
+    Gera PDFs com texto em português (acentos, travessões, aspas curvas) em parágrafos justificados.
+
+    Returns:
+        dict: Caminho do PDF -> lista com o texto original de cada página.
+    """
+    aleatorio = random.Random(semente)
+    corpus = {}
+    for i in range(arquivos):
+        documento = pymupdf.open()
+        originais = []
+        for _ in range(aleatorio.randint(*PAGINAS)):
+            pagina = documento.new_page()
+            paragrafos = [" ".join(aleatorio.choice(PALAVRAS) for _ in range(aleatorio.randint(30, 90)))
+                          for _ in range(aleatorio.randint(3, 7))]
+            texto = "\n".join(paragrafos)
+            # Fonte com Unicode completo (a Helvetica padrão do PDF não tem '–' nem aspas curvas).
+            pagina.insert_htmlbox(pagina.rect + (56, 56, -56, -56), "".join(f"<p>{p}</p>" for p in paragrafos),
+                                  css="* {font-family: sans-serif; font-size: 10pt; text-align: justify;}")
+            originais.append(texto)
+        caminho = Path(pasta) / f"CP-{917000 + i} - CONTRIBUINTE {i}.pdf"
+        documento.subset_fonts() # Como nos PDFs gerados por editores de texto: só os glifos usados
+        documento.save(caminho, garbage=3, deflate=True)
+        documento.close()
+        corpus[caminho] = originais
+    return corpus
+
+
+# ==============================================================================
+# 3. MEDIDAS
+# ==============================================================================
+
+def _palavras(texto) -> list:
+    return texto.split()
+
+
+def semelhanca(texto_a, texto_b) -> float:
+    """
+    Semelhança palavra a palavra (0 a 1), ignorando diferenças de espaços e quebras de linha.
+    """
+    a, b = _palavras(texto_a), _palavras(texto_b)
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def medir_backend(backend, corpus) -> dict:
+    """
+    Extrai o corpus inteiro página a página e mede tempo, páginas/s e MB/s (melhor de REPETICOES).
+    """
+    extrator = obter_extrator(backend)
+    tamanho_mb = sum(caminho.stat().st_size for caminho in corpus) / 1e6
+    melhor = float("inf")
+    textos = {}
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        textos = {caminho: [p if isinstance(p, str) else "" for p in extrator.paginas(caminho)] for caminho in corpus}
+        melhor = min(melhor, time.perf_counter() - inicio)
+    paginas = sum(len(p) for p in textos.values())
+    return {'tempo': melhor, 'paginas_s': paginas / melhor, 'mb_s': tamanho_mb / melhor, 'textos': textos}
+
+
+def comparar_paginas(textos_a, textos_b) -> dict:
+    """
+    Estatísticas de equivalência entre dois conjuntos de textos por página.
+    """
+    notas = [semelhanca(a, b) for caminho in textos_a for a, b in zip(textos_a[caminho], textos_b[caminho])]
+    return {
+        'identicas': sum(1 for n in notas if n == 1.0) / len(notas),
+        'media': sum(notas) / len(notas),
+        'minima': min(notas),
+    }
+
+
+# ==============================================================================
+# 4. EXECUÇÃO
+# ==============================================================================
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    backends = [nome for nome in EXTRATORES if _DISPONIVEIS[nome]]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        corpus = gerar_corpus(pasta)
+        paginas = sum(len(p) for p in corpus.values())
+        tamanho_mb = sum(caminho.stat().st_size for caminho in corpus) / 1e6
+        print(f"Corpus sintético: {len(corpus)} PDFs, {paginas} páginas, {tamanho_mb:.1f} MB\n")
+
+        resultados = {nome: medir_backend(nome, corpus) for nome in backends}
+
+        print(f"{'Backend':>10} | {'Tempo (s)':>9} | {'Páginas/s':>9} | {'MB/s':>6} | "
+              f"{'Págs. idênticas ao original':>27} | {'Semelhança média/mín.':>21}")
+        print("-" * 98)
+        for nome, r in resultados.items():
+            contra_original = comparar_paginas(r['textos'], corpus)
+            print(f"{nome:>10} | {r['tempo']:>9.2f} | {r['paginas_s']:>9.0f} | {r['mb_s']:>6.2f} | "
+                  f"{contra_original['identicas']:>26.1%} | "
+                  f"{contra_original['media']:>12.4f} / {contra_original['minima']:.4f}")
+
+        if len(resultados) == 2:
+            a, b = resultados.values()
+            entre = comparar_paginas(a['textos'], b['textos'])
+            print(f"\n{backends[0]} x {backends[1]}: {entre['identicas']:.1%} das páginas com as mesmas palavras; "
+                  f"semelhança média {entre['media']:.4f}, mínima {entre['minima']:.4f}")
+            print(f"Ganho de velocidade: {a['tempo'] / b['tempo']:.1f}x")
@@ -0,0 +1,139 @@
+import logging
+import random
+import re
+import time
+from collections import defaultdict
+
+import pandas as pd
+
+from normalizacao_contribuicoes import normalizar_contribuicoes, contribuicoes_por_item
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+LINHAS_ATUAIS = 1220 # Contribuições recebidas na consulta do Decreto 7217
+FATORES = [1, 10, 100] # Tamanhos a medir, em múltiplos da planilha atual
+REPETICOES = 3 # Melhor de N execuções para cada medida
+ITEM_MINIMO = 52 # Mesmo filtro do 'ajusta visões.py'
+
+PALAVRAS = ("saneamento", "regulação", "prestação", "serviços", "água", "esgoto", "tarifa",
+            "município", "universalização", "drenagem", "resíduos", "titularidade")
+
+
+# ==============================================================================
+# 2. DADOS SINTÉTICOS
+# ==============================================================================
+
+def gerar_planilha(linhas, semente=7217) -> pd.DataFrame:
+    """
+    Gera uma planilha com as mesmas colunas (e o mesmo tipo texto) da consulta real.
+    """
+    aleatorio = random.Random(semente)
+
+    def frase(minimo, maximo):
+        return " ".join(aleatorio.choice(PALAVRAS) for _ in range(aleatorio.randint(minimo, maximo)))
+
+    def item_cp():
+        sorteio = aleatorio.random()
+        if sorteio < 0.02:
+            return None
+        item = aleatorio.randint(0, 270)
+        if sorteio < 0.05:
+            # Contribuições que citam vários itens, nos formatos vistos na consulta
+            outro = aleatorio.randint(0, 270)
+            return aleatorio.choice((f"{item}, {outro}", f"Itens {item} e {outro}", f"{item}/{outro}"))
+        return str(item)
+
+    dados = []
+    for i in range(linhas):
+        dados.append({
+            'Item CP alterado': item_cp(),
+            'Numero': f"CP-{917000 + i}",
+            'Titulo da Contribuição ': frase(2, 6),
+            'Texto': "_x000D_".join(frase(20, 80) for _ in range(aleatorio.randint(1, 4))),
+            'Nome': frase(2, 3).title() if aleatorio.random() > 0.05 else None,
+        })
+    return pd.DataFrame(dados, dtype=object)
+
+
+# ==============================================================================
+# 3. CAMINHOS COMPARADOS
+# ==============================================================================
+
+def validar_itens(item: str) -> list:
+    """Retorna os números de item citados no valor, sem repetição e na ordem em que aparecem."""
+    if item is None or pd.isna(item):
+        return []
+    return list(dict.fromkeys(int(numero) for numero in re.findall(r'\d+', str(item))))
+
+
+def caminho_atual(df) -> dict:
+    """
+    Pré-processamento e agrupamento linha a linha do 'ajusta visões.py' antes da etapa vetorizada.
+
+    Mantém o df.apply e o laço iterrows() originais, com duas correções para servir de referência
+    ao caminho vetorizado: uma contribuição que cita vários itens ("12, 13") entra em cada um deles
+    (o validar_item original juntava os dígitos em 1213), e os valores vazios continuam vazios no
+    pré-processamento (o astype(str) original os transformava no texto "None").
+    """
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == 'object':
+            df[col] = df[col].str.replace('_x000D_', '\n', regex=False)
+    df.columns = df.columns.str.strip()
+
+    df['Itens_validados'] = df['Item CP alterado'].apply(validar_itens)
+
+    contrib_por_item = defaultdict(list)
+    df = df.sort_values(by="Numero")
+    for _, row in df.iterrows():
+        contrib = {
+            'numero': f"{row['Numero']}" if pd.notna(row['Numero']) else "[sem número]",
+            'Titulo da Contribuição': row['Titulo da Contribuição'] if pd.notna(row['Titulo da Contribuição']) else "[sem Titulo da Contribuição]",
+            'texto': row['Texto'] if pd.notna(row['Texto']) else "[sem texto]",
+            'nome': row['Nome'] if pd.notna(row['Nome']) else "[autor desconhecido]"
+        }
+        for item in row['Itens_validados']:
+            if item >= ITEM_MINIMO:
+                contrib_por_item[item].append(contrib)
+    return contrib_por_item
+
+
+def caminho_vetorizado(df) -> dict:
+    df_normalizado = normalizar_contribuicoes(df, filtro_item=lambda item: item >= ITEM_MINIMO)
+    return contribuicoes_por_item(df_normalizado)
+
+
+def medir(funcao, df):
+    melhor = float("inf")
+    resultado = None
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        resultado = funcao(df)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+# ==============================================================================
+# 4. EXECUÇÃO
+# ==============================================================================
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+
+    print(f"{'Linhas':>10} | {'Atual (s)':>10} | {'Vetorizado (s)':>14} | {'Ganho':>7} | Itens")
+    print("-" * 62)
+    for fator in FATORES:
+        df = gerar_planilha(LINHAS_ATUAIS * fator)
+        tempo_atual, grupos_atual = medir(caminho_atual, df)
+        tempo_novo, grupos_novo = medir(caminho_vetorizado, df)
+
+        # Os dois caminhos precisam produzir os mesmos grupos: mesmos itens e, em cada item,
+        # as mesmas contribuições na mesma ordem, com todos os campos iguais
+        iguais = (
+            set(grupos_atual) == set(grupos_novo)
+            and all(grupos_atual[i] == grupos_novo[i] for i in grupos_novo)
+        )
+        print(f"{len(df):>10} | {tempo_atual:>10.3f} | {tempo_novo:>14.3f} | {tempo_atual / tempo_novo:>6.1f}x | "
+              f"{len(grupos_novo)} {'(grupos idênticos)' if iguais else '(GRUPOS DIFERENTES)'}")
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (necessário para ler/gravar Parquet)
+    PARQUET_DISPONIVEL = True
+except ImportError:
+    PARQUET_DISPONIVEL = False
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO DO CACHE
+# ==============================================================================
+
+# Pasta (ao lado da planilha) onde ficam os arquivos .parquet e seus metadados.
+PASTA_CACHE = ".cache_planilhas"
+
+# Incrementar sempre que o formato do cache mudar, para forçar a reconstrução.
+VERSAO_CACHE = 1
+
+TAMANHO_BLOCO_HASH = 1024 * 1024 # Lê a planilha em blocos de 1 MB para calcular o hash
+
+
+# ==============================================================================
+# 2. FUNÇÕES AUXILIARES
+# ==============================================================================
+
+def calcular_hash_arquivo(caminho) -> str:
+    """
+    Calcula o SHA-256 do conteúdo de um arquivo, lendo-o em blocos.
+    """
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO_HASH), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def caminhos_cache(caminho_excel, sheet_name=0, pasta_cache=None):
+    """
+    Retorna os caminhos (arquivo .parquet, arquivo .json de metadados) do cache de uma aba.
+    """
+    caminho_excel = Path(caminho_excel)
+    pasta = Path(pasta_cache) if pasta_cache else caminho_excel.parent / PASTA_CACHE
+    nome_base = f"{caminho_excel.stem}__{sheet_name}"
+    return pasta / f"{nome_base}.parquet", pasta / f"{nome_base}.json"
+
+
+def _ler_metadados(caminho_meta):
+    try:
+        with open(caminho_meta, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _gravar_metadados(caminho_meta, metadados) -> None:
+    temporario = caminho_meta.with_suffix(".json.tmp")
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(metadados, f, indent=4, ensure_ascii=False)
+    os.replace(temporario, caminho_meta)
+
+
+def _validar_colunas(colunas_disponiveis, usecols) -> None:
+    """
+    Levanta o mesmo erro que o pd.read_excel daria para colunas inexistentes em usecols.
+    """
+    ausentes = [col for col in usecols if col not in colunas_disponiveis]
+    if ausentes:
+        raise ValueError(f"Usecols do not match columns, columns expected but not found: {ausentes}")
+
+
+def _projetar_colunas(df, usecols):
+    if usecols is None:
+        return df
+    _validar_colunas(df.columns, usecols)
+    return df[list(usecols)]
+
+
+def _ler_cache(caminho_parquet, metadados, usecols):
+    """
+    Lê o Parquet do cache trazendo do disco apenas as colunas pedidas.
+    """
+    if usecols is None:
+        return pd.read_parquet(caminho_parquet)
+    _validar_colunas(metadados["colunas"], usecols)
+    return pd.read_parquet(caminho_parquet, columns=list(usecols))
+
+
+def _reconstruir_cache(caminho_excel, sheet_name, caminho_parquet, caminho_meta, metadados):
+    """
+    Converte a aba do Excel para Parquet (uma única leitura completa via openpyxl).
+    """
+    logging.info(f"Convertendo planilha para o cache colunar: {caminho_excel} -> {caminho_parquet}")
+    df = pd.read_excel(caminho_excel, engine="openpyxl", dtype=str, sheet_name=sheet_name)
+    # Parquet exige nomes de coluna em texto; os nomes originais (inclusive espaços finais) são preservados.
+    df.columns = [str(col) for col in df.columns]
+    metadados["colunas"] = list(df.columns)
+
+    caminho_parquet.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho_parquet.with_suffix(".parquet.tmp")
+    df.to_parquet(temporario, index=False)
+    os.replace(temporario, caminho_parquet)
+    _gravar_metadados(caminho_meta, metadados)
+    return df
+
+
+# ==============================================================================
+# 3. FUNÇÃO PRINCIPAL
+# ==============================================================================
+
+def carregar_planilha(caminho_excel, usecols=None, sheet_name=0, pasta_cache=None) -> pd.DataFrame:
+    """
+    Lê uma aba da planilha de contribuições usando um cache Parquet em disco.
+
+    Na primeira execução a planilha é lida com o openpyxl e gravada em Parquet. Nas execuções
+    seguintes o cache é validado pelo tamanho e data de modificação do .xlsx; se esses valores
+    mudarem, o SHA-256 do conteúdo decide se o cache ainda vale ou se precisa ser reconstruído.
+    Todas as colunas são devolvidas como texto (equivalente a dtype=str no pd.read_excel).
+
+    Args:
+        caminho_excel (str | Path): Caminho da planilha .xlsx.
+        usecols (list, opcional): Colunas a carregar (nomes exatamente como no cabeçalho do Excel).
+        sheet_name (int | str): Aba a ser lida, como no pd.read_excel.
+        pasta_cache (str | Path, opcional): Pasta do cache. Padrão: PASTA_CACHE ao lado da planilha.
+
+    Returns:
+        pd.DataFrame: Os dados da aba, somente com as colunas pedidas.
+    """
+    caminho_excel = Path(caminho_excel)
+    info = caminho_excel.stat() # Levanta FileNotFoundError se a planilha não existir
+
+    if not PARQUET_DISPONIVEL:
+        logging.warning("pyarrow não está instalado; lendo o Excel diretamente, sem cache.")
+        return pd.read_excel(caminho_excel, engine="openpyxl", dtype=str, sheet_name=sheet_name, usecols=usecols)
+
+    caminho_parquet, caminho_meta = caminhos_cache(caminho_excel, sheet_name, pasta_cache)
+    metadados = _ler_metadados(caminho_meta)
+    cache_existe = (
+        metadados is not None
+        and metadados.get("versao") == VERSAO_CACHE
+        and caminho_parquet.exists()
+    )
+
+    # Caminho rápido: tamanho e data de modificação idênticos aos registrados.
+    if cache_existe and metadados["tamanho"] == info.st_size and metadados["mtime_ns"] == info.st_mtime_ns:
+        logging.info(f"Planilha carregada do cache: {caminho_parquet}")
+        return _ler_cache(caminho_parquet, metadados, usecols)
+
+    hash_atual = calcular_hash_arquivo(caminho_excel)
+    novos_metadados = {
+        "versao": VERSAO_CACHE,
+        "arquivo": caminho_excel.name,
+        "aba": sheet_name,
+        "tamanho": info.st_size,
+        "mtime_ns": info.st_mtime_ns,
+        "sha256": hash_atual,
+    }
+
+    # O arquivo foi tocado (cópia, sincronização), mas o conteúdo é o mesmo.
+    if cache_existe and metadados.get("sha256") == hash_atual:
+        logging.info("Planilha com nova data de modificação, mas conteúdo idêntico; reaproveitando o cache.")
+        novos_metadados["colunas"] = metadados["colunas"]
+        _gravar_metadados(caminho_meta, novos_metadados)
+        return _ler_cache(caminho_parquet, novos_metadados, usecols)
+
+    df = _reconstruir_cache(caminho_excel, sheet_name, caminho_parquet, caminho_meta, novos_metadados)
+    return _projetar_colunas(df, usecols)
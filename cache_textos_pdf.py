@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import sqlite3
+import zlib
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from cache_planilha import calcular_hash_arquivo
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO DO CACHE
+# ==============================================================================
+
+# Pasta (ao lado dos PDFs) onde fica o banco SQLite com os textos já extraídos.
+PASTA_CACHE = ".cache_textos_pdf"
+ARQUIVO_BANCO = "textos.sqlite"
+
+# Incrementar sempre que o formato do banco mudar, para forçar a reconstrução.
+VERSAO_CACHE = 1
+
+NIVEL_COMPRESSAO = 6 # zlib: o texto de uma contribuição cai para cerca de um terço
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS textos (
+    sha256 TEXT NOT NULL,
+    configuracao TEXT NOT NULL,
+    paginas INTEGER NOT NULL,
+    erros TEXT NOT NULL,
+    texto BLOB NOT NULL,
+    criado TEXT NOT NULL,
+    PRIMARY KEY (sha256, configuracao)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS arquivos (
+    caminho TEXT PRIMARY KEY,
+    tamanho INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+"""
+
+
+# ==============================================================================
+# 2. CACHE ENDEREÇADO PELO CONTEÚDO
+# ==============================================================================
+
+class CacheTextosPDF:
+    """
+    Textos extraídos de PDFs, indexados pelo SHA-256 dos bytes do arquivo e pela configuração
+    do extrator (backend e versão, ou parâmetros do OCR).
+
+    Como a chave é o conteúdo, um mesmo PDF salvo com dois nomes é extraído uma única vez, e
+    renomear ou mover um arquivo não invalida o texto. A tabela 'arquivos' guarda o tamanho e a
+    data de modificação de cada caminho já visto, para que uma nova execução não precise nem
+    recalcular o hash dos PDFs que não mudaram (o mesmo critério do cache_planilha).
+
+    O banco usa o journal padrão do SQLite (e não WAL), que funciona em pastas de rede.
+    """
+
+    def __init__(self, caminho_banco):
+        self.caminho_banco = Path(caminho_banco)
+        self.caminho_banco.parent.mkdir(parents=True, exist_ok=True)
+        self._conexao = sqlite3.connect(self.caminho_banco, timeout=30)
+        versao = self._conexao.execute("PRAGMA user_version").fetchone()[0]
+        if versao != VERSAO_CACHE:
+            if versao:
+                logging.info(f"Cache de textos na versão {versao}; reconstruindo na versão {VERSAO_CACHE}.")
+            self._conexao.executescript("DROP TABLE IF EXISTS textos; DROP TABLE IF EXISTS arquivos;")
+            self._conexao.execute(f"PRAGMA user_version = {VERSAO_CACHE}")
+        self._conexao.executescript(_ESQUEMA)
+        self._conexao.commit()
+
+    def hash_do_arquivo(self, caminho) -> str:
+        """
+        SHA-256 do PDF, reaproveitando o valor registrado se tamanho e data de modificação não mudaram.
+
+        Raises:
+            OSError: Se o arquivo não existir ou não puder ser lido.
+        """
+        caminho = os.path.normcase(os.path.abspath(caminho))
+        info = os.stat(caminho)
+        registro = self._conexao.execute(
+            "SELECT tamanho, mtime_ns, sha256 FROM arquivos WHERE caminho = ?", (caminho,)
+        ).fetchone()
+        if registro is not None and registro[0] == info.st_size and registro[1] == info.st_mtime_ns:
+            return registro[2]
+        sha256 = calcular_hash_arquivo(caminho)
+        self._conexao.execute(
+            "INSERT OR REPLACE INTO arquivos (caminho, tamanho, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+            (caminho, info.st_size, info.st_mtime_ns, sha256),
+        )
+        return sha256
+
+    def obter(self, sha256, configuracao):
+        """
+        Returns:
+            tuple | None: (texto, quantidade de páginas, lista de erros por página), ou None se
+            esse conteúdo ainda não foi extraído com essa configuração.
+        """
+        registro = self._conexao.execute(
+            "SELECT texto, paginas, erros FROM textos WHERE sha256 = ? AND configuracao = ?", (sha256, configuracao)
+        ).fetchone()
+        if registro is None:
+            return None
+        texto, paginas, erros = registro
+        return zlib.decompress(texto).decode("utf-8"), paginas, json.loads(erros)
+
+    def gravar(self, sha256, configuracao, texto, paginas, erros, confirmar=True) -> None:
+        """
+        Registra o resultado de uma extração.
+
+        Args:
+            confirmar (bool): Grava no disco imediatamente. Em lotes, passe False e chame
+                'confirmar()' de tempos em tempos, para não sincronizar o banco a cada PDF.
+        """
+        self._conexao.execute(
+            "INSERT OR REPLACE INTO textos (sha256, configuracao, paginas, erros, texto, criado) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (sha256, configuracao, paginas, json.dumps(erros, ensure_ascii=False),
+             zlib.compress(texto.encode("utf-8"), NIVEL_COMPRESSAO), datetime.now().isoformat(timespec="seconds")),
+        )
+        if confirmar:
+            self.confirmar()
+
+    def confirmar(self) -> None:
+        self._conexao.commit()
+
+    def fechar(self) -> None:
+        self._conexao.commit()
+        self._conexao.close()
+
+
+@lru_cache(maxsize=None)
+def _cache_no_banco(caminho_banco) -> CacheTextosPDF:
+    return CacheTextosPDF(caminho_banco)
+
+
+def cache_da_pasta(pasta_pdfs) -> CacheTextosPDF:
+    """
+    Cache da pasta de PDFs (PASTA_CACHE/ARQUIVO_BANCO dentro dela), aberto uma vez por processo.
+    """
+    caminho_banco = Path(os.path.abspath(pasta_pdfs)) / PASTA_CACHE / ARQUIVO_BANCO
+    return _cache_no_banco(caminho_banco)
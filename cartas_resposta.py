@@ -0,0 +1,478 @@
+import html
+import io
+import logging
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import pandas as pd
+from docx import Document
+from docx.oxml.ns import qn
+from lxml import etree
+
+try:
+    import pymupdf
+    PDF_DISPONIVEL = True
+except ImportError:
+    PDF_DISPONIVEL = False
+
+from cache_planilha import carregar_planilha
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+BASE_DIR = Path(__file__).parent
+ARQUIVO_EXCEL = BASE_DIR / "Consideracoes-sobre-a-Consulta_Publica_Decreto_7217.2010.xlsx"
+ARQUIVO_DEVOLUTIVA = BASE_DIR / "devolutiva_decreto_7217.xlsx" # Gerado por 'CP-classifica.py'
+ARQUIVO_SITUACAO = BASE_DIR / "contribuicoes_formatadas.xlsx" # Gerado por 'CP-organiza.py'
+ARQUIVO_MODELO_CARTA = BASE_DIR / "modelo_carta_resposta.docx"
+PASTA_CARTAS = BASE_DIR / "cartas_resposta"
+
+GERAR_PDF = True
+MAX_PROCESSOS = None # None: um processo por núcleo
+TAMANHO_LOTE = 25 # Cartas por tarefa enviada a cada processo
+
+# Fontes TrueType para o PDF (opcional). Sem elas, valem as fontes embutidas no PyMuPDF,
+# que já cobrem acentos, travessões e aspas curvas.
+# ex.: {'normal': r"C:\Windows\Fonts\calibri.ttf", 'negrito': r"C:\Windows\Fonts\calibrib.ttf",
+#       'italico': r"C:\Windows\Fonts\calibrii.ttf", 'negrito_italico': r"C:\Windows\Fonts\calibriz.ttf"}
+FONTES_PDF = None
+
+CSS_PDF = """
+body { font-family: sans-serif; font-size: 11pt; }
+p { margin: 0 0 6pt 0; }
+h3 { font-size: 13pt; margin: 6pt 0 6pt 0; }
+td { border: 0.5pt solid black; padding: 2pt; vertical-align: top; }
+"""
+MARGEM_PDF = 72 # Pontos (2,54 cm)
+
+PARTE_DOCUMENTO = "word/document.xml"
+
+# Campos da carta, no modelo escritos como {{Campo}}.
+RE_CAMPO = re.compile(r'\{\{\s*([^{}]+?)\s*\}\}')
+RE_NUMERO_CP = re.compile(r'CP\s*-?\s*(\d+)', re.IGNORECASE)
+# Caracteres proibidos em XML 1.0. As quebras manuais de linha e de página do Word (\x0b e \x0c,
+# comuns em textos colados) viram quebras de linha; os demais são removidos.
+RE_QUEBRA_WORD = re.compile('[\x0b\x0c]')
+RE_CONTROLE_XML = re.compile('[\x00-\x08\x0e-\x1f\ufffe\uffff]')
+
+_W_P = qn('w:p')
+_W_T = qn('w:t')
+_W_R = qn('w:r')
+_W_TBL = qn('w:tbl')
+_W_TR = qn('w:tr')
+_W_TC = qn('w:tc')
+_W_BR = qn('w:br')
+_W_TAB = qn('w:tab')
+_XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+
+
+# ==============================================================================
+# 2. DADOS DAS CARTAS
+# ==============================================================================
+
+def normalizar_numero(valor):
+    """
+    'cp 921098', 'CP-921098 ' -> 'CP-921098'. Retorna None se o valor não tiver um número CP.
+    """
+    encontrado = RE_NUMERO_CP.search(str(valor)) if valor is not None else None
+    return f"CP-{encontrado.group(1)}" if encontrado else None
+
+
+def texto_para_xml(valor) -> str:
+    """
+    Texto do campo sem os caracteres de controle que tornariam o document.xml da carta ilegível.
+    """
+    return RE_CONTROLE_XML.sub("", RE_QUEBRA_WORD.sub("\n", str(valor)))
+
+
+def _juntar(valores) -> str:
+    # Valores distintos, na ordem em que aparecem, um por linha.
+    return "\n".join(dict.fromkeys(v.strip() for v in valores if isinstance(v, str) and v.strip()))
+
+
+def montar_registros(df_contribuicoes, df_devolutiva=None, df_situacao=None) -> dict:
+    """
+    Junta, por número CP, os dados de cada contribuição usados nas cartas de resposta.
+
+    Args:
+        df_contribuicoes (pd.DataFrame): Planilha da consulta ('Numero', 'Nome', 'Titulo da Contribuição ',
+            'Item CP alterado').
+        df_devolutiva (pd.DataFrame, opcional): Saída de 'CP-classifica.py' ('Número', 'Nota Final', 'Decisão').
+        df_situacao (pd.DataFrame, opcional): Saída de 'CP-organiza.py' ('Número da Contribuição', 'Dispositivo',
+            'Proposta de Redação Acolhida', 'Situação da Contribuição', 'Justificativa Técnica').
+
+    Returns:
+        dict: Número CP -> campos da carta (nomes usados como {{Campo}} no modelo).
+    """
+    df = df_contribuicoes.copy()
+    df.columns = [str(col).strip() for col in df.columns]
+    df['Numero'] = df['Numero'].map(normalizar_numero)
+    df = df.dropna(subset=['Numero'])
+
+    registros = {}
+    for numero, grupo in df.groupby('Numero', sort=False):
+        registros[numero] = {
+            'Numero': numero,
+            'Nome': _juntar(grupo.get('Nome', [])) or "Contribuinte",
+            'Título': _juntar(grupo.get('Titulo da Contribuição', [])),
+            'Itens': _juntar(grupo.get('Item CP alterado', [])).replace("\n", "; "),
+            'Decisão': "", 'Nota Final': "",
+            'Dispositivo': "", 'Proposta de Redação Acolhida': "",
+            'Situação': "", 'Justificativa Técnica': "",
+        }
+
+    if df_devolutiva is not None:
+        for _, linha in df_devolutiva.iterrows():
+            registro = registros.get(normalizar_numero(linha.get('Número')))
+            if registro is not None:
+                registro['Decisão'] = _juntar([linha.get('Decisão')])
+                registro['Nota Final'] = _juntar([linha.get('Nota Final')]).replace(".", ",")
+
+    if df_situacao is not None:
+        df_situacao = df_situacao.assign(_numero=df_situacao['Número da Contribuição'].map(normalizar_numero))
+        for numero, grupo in df_situacao.groupby('_numero', sort=False):
+            registro = registros.get(numero)
+            if registro is not None:
+                registro['Dispositivo'] = _juntar(grupo['Dispositivo'])
+                registro['Proposta de Redação Acolhida'] = _juntar(grupo['Proposta de Redação Acolhida'])
+                registro['Situação'] = _juntar(grupo['Situação da Contribuição'])
+                registro['Justificativa Técnica'] = _juntar(grupo['Justificativa Técnica'])
+    return registros
+
+
+# ==============================================================================
+# 3. MODELO DA CARTA (INTERPRETADO UMA VEZ)
+# ==============================================================================
+
+def criar_modelo_padrao(caminho) -> None:
+    """
+    Grava um modelo simples de carta de resposta, com os campos disponíveis em montar_registros.
+    """
+    doc = Document()
+    doc.add_heading("Consulta Pública – Decreto nº 7.217/2010", level=1)
+    doc.add_paragraph("Brasília, {{Data}}")
+    doc.add_paragraph("Prezado(a) {{Nome}},")
+    doc.add_paragraph(
+        "Agradecemos a contribuição {{Numero}} – “{{Título}}”, referente aos itens {{Itens}} da minuta. "
+        "Após a análise técnica, informamos o resultado:"
+    )
+    tabela = doc.add_table(rows=0, cols=2)
+    for rotulo, campo in [("Decisão", "Decisão"), ("Nota final", "Nota Final"), ("Situação", "Situação"),
+                          ("Dispositivo", "Dispositivo"), ("Redação acolhida", "Proposta de Redação Acolhida"),
+                          ("Justificativa técnica", "Justificativa Técnica")]:
+        celulas = tabela.add_row().cells
+        celulas[0].paragraphs[0].add_run(rotulo).bold = True
+        celulas[1].text = "{{" + campo + "}}"
+    doc.add_paragraph("")
+    doc.add_paragraph("Atenciosamente,")
+    doc.add_paragraph("Ministério das Cidades")
+    doc.save(caminho)
+
+
+def _unir_campos_do_paragrafo(p) -> None:
+    """
+    Deixa cada {{Campo}} inteiro dentro de um único w:t.
+
+    O Word costuma dividir o texto digitado em vários runs (revisão ortográfica, histórico de
+    edição); o campo passa para o w:t onde começa, e os pedaços dos runs seguintes são retirados.
+    """
+    ts = [t for t in p.iter(_W_T)]
+    textos = [t.text or "" for t in ts]
+    inicios, posicao = [], 0
+    for texto in textos:
+        inicios.append(posicao)
+        posicao += len(texto)
+    completo = "".join(textos)
+
+    def t_da_posicao(pos):
+        i = len(inicios) - 1
+        while inicios[i] > pos:
+            i -= 1
+        return i
+
+    for encontrado in reversed(list(RE_CAMPO.finditer(completo))):
+        i, j = t_da_posicao(encontrado.start()), t_da_posicao(encontrado.end() - 1)
+        if i == j:
+            continue
+        ts[i].text = textos[i][:encontrado.start() - inicios[i]] + encontrado.group(0)
+        ts[i].set(_XML_SPACE, "preserve")
+        for k in range(i + 1, j):
+            ts[k].text = ""
+        ts[j].text = textos[j][encontrado.end() - inicios[j]:]
+        ts[j].set(_XML_SPACE, "preserve")
+        textos[i], textos[j] = ts[i].text, ts[j].text
+
+
+def _atributo(elemento, caminho):
+    encontrado = elemento.find(caminho)
+    return None if encontrado is None else encontrado.get(qn('w:val'), "true")
+
+
+def _html_paragrafo(p) -> str:
+    partes = []
+    for r in p.iter(_W_R):
+        negrito = _atributo(r, f"{qn('w:rPr')}/{qn('w:b')}") not in (None, "0", "false")
+        italico = _atributo(r, f"{qn('w:rPr')}/{qn('w:i')}") not in (None, "0", "false")
+        texto = []
+        for filho in r:
+            if filho.tag == _W_T:
+                texto.append(html.escape(filho.text or "", quote=False))
+            elif filho.tag == _W_BR:
+                texto.append("<br/>")
+            elif filho.tag == _W_TAB:
+                texto.append("&#160;&#160;&#160;&#160;")
+        texto = "".join(texto)
+        if texto and italico:
+            texto = f"<i>{texto}</i>"
+        if texto and negrito:
+            texto = f"<b>{texto}</b>"
+        partes.append(texto)
+    conteudo = "".join(partes) or "&#160;"
+
+    estilo = _atributo(p, f"{qn('w:pPr')}/{qn('w:pStyle')}") or ""
+    if estilo.lower().startswith(("heading", "ttulo", "title")):
+        return f"<h3>{conteudo}</h3>"
+    alinhamento = {"center": "center", "right": "right", "end": "right", "both": "justify"}.get(
+        _atributo(p, f"{qn('w:pPr')}/{qn('w:jc')}")
+    )
+    return f'<p style="text-align: {alinhamento}">{conteudo}</p>' if alinhamento else f"<p>{conteudo}</p>"
+
+
+def _html_blocos(elemento) -> str:
+    partes = []
+    for filho in elemento:
+        if filho.tag == _W_P:
+            partes.append(_html_paragrafo(filho))
+        elif filho.tag == _W_TBL:
+            linhas = []
+            for tr in filho.iterchildren(_W_TR):
+                celulas = "".join(f"<td>{_html_blocos(tc)}</td>" for tc in tr.iterchildren(_W_TC))
+                linhas.append(f"<tr>{celulas}</tr>")
+            partes.append(f'<table style="width: 100%; border-collapse: collapse">{"".join(linhas)}</table>')
+    return "".join(partes)
+
+
+class ModeloCarta:
+    """
+    Modelo .docx de carta lido e interpretado uma única vez.
+
+    O document.xml é normalizado (cada {{Campo}} inteiro num w:t) e guardado como texto; as
+    demais partes do pacote ficam em bytes. Preencher uma carta é só substituir os campos no
+    texto e gravar o zip, sem abrir o modelo de novo. O HTML usado no PDF também é montado
+    uma vez, a partir dos mesmos parágrafos e tabelas. O objeto é pequeno e serializável, para
+    ser enviado uma vez a cada processo.
+    """
+
+    def __init__(self, caminho_modelo):
+        self.caminho_modelo = Path(caminho_modelo)
+        with zipfile.ZipFile(self.caminho_modelo) as pacote:
+            self.partes = [(info.filename, pacote.read(info)) for info in pacote.infolist()]
+
+        raiz = etree.fromstring(dict(self.partes)[PARTE_DOCUMENTO])
+        for p in raiz.iter(_W_P):
+            _unir_campos_do_paragrafo(p)
+        self.documento_xml = etree.tostring(raiz, xml_declaration=True, encoding="UTF-8", standalone=True).decode("utf-8")
+        self.html = _html_blocos(raiz.find(qn('w:body')))
+        self.campos = sorted(set(RE_CAMPO.findall(self.documento_xml)))
+        logging.info(f"Modelo de carta '{self.caminho_modelo.name}' carregado: campos {self.campos}")
+
+    @staticmethod
+    def _substituir(modelo, campos, converter) -> str:
+        return RE_CAMPO.sub(lambda m: converter(texto_para_xml(campos.get(m.group(1), ""))), modelo)
+
+    def preencher_xml(self, campos) -> str:
+        # Quebras de linha do valor viram w:br dentro do mesmo run.
+        return self._substituir(self.documento_xml, campos, lambda valor: escape(valor).replace(
+            "\n", '</w:t><w:br/><w:t xml:space="preserve">'
+        ))
+
+    def preencher_html(self, campos) -> str:
+        return self._substituir(self.html, campos, lambda valor: html.escape(valor, quote=False).replace("\n", "<br/>"))
+
+    def gravar_docx(self, campos, caminho) -> None:
+        documento_xml = self.preencher_xml(campos).encode("utf-8")
+        with zipfile.ZipFile(caminho, "w", zipfile.ZIP_DEFLATED) as saida:
+            for nome, conteudo in self.partes:
+                saida.writestr(nome, documento_xml if nome == PARTE_DOCUMENTO else conteudo)
+
+
+# ==============================================================================
+# 4. PDF
+# ==============================================================================
+
+# Fontes carregadas uma vez por processo (o PyMuPDF embute só os glifos usados em cada carta).
+_ARQUIVO_FONTES = None
+_CSS_FONTES = ""
+
+
+def carregar_fontes_pdf(fontes=None) -> None:
+    """
+    Lê as fontes TrueType do PDF (ver FONTES_PDF) para o processo atual.
+    """
+    global _ARQUIVO_FONTES, _CSS_FONTES
+    if not fontes or not PDF_DISPONIVEL:
+        _ARQUIVO_FONTES, _CSS_FONTES = None, ""
+        return
+    _ARQUIVO_FONTES = pymupdf.Archive()
+    regras = []
+    for chave, (peso, estilo) in {'normal': ("normal", "normal"), 'negrito': ("bold", "normal"),
+                                  'italico': ("normal", "italic"), 'negrito_italico': ("bold", "italic")}.items():
+        if fontes.get(chave):
+            caminho = Path(fontes[chave])
+            _ARQUIVO_FONTES.add((caminho.read_bytes(), caminho.name))
+            regras.append(f'@font-face {{font-family: carta; src: url({caminho.name}); '
+                          f'font-weight: {peso}; font-style: {estilo};}}')
+    _CSS_FONTES = "\n".join(regras) + "\nbody { font-family: carta; }"
+
+
+def gravar_pdf(html_corpo, caminho, css=CSS_PDF) -> None:
+    """
+    Grava um PDF A4 a partir de um fragmento HTML, com Unicode completo (acentos, '–', aspas curvas).
+
+    As fontes são embutidas só com os glifos usados (subset_fonts), o que deixa cada arquivo
+    com dezenas de kB em vez de centenas.
+
+    Raises:
+        RuntimeError: Se o PyMuPDF não estiver instalado.
+    """
+    if not PDF_DISPONIVEL:
+        raise RuntimeError("PyMuPDF não está instalado; instale 'pymupdf' para gerar PDFs.")
+    historia = pymupdf.Story(html=html_corpo, user_css=css + _CSS_FONTES, archive=_ARQUIVO_FONTES)
+    pagina = pymupdf.paper_rect("a4")
+    area = pagina + (MARGEM_PDF, MARGEM_PDF, -MARGEM_PDF, -MARGEM_PDF)
+    bruto = io.BytesIO()
+    escritor = pymupdf.DocumentWriter(bruto)
+    continua = True
+    while continua:
+        dispositivo = escritor.begin_page(pagina)
+        continua, _ = historia.place(area)
+        historia.draw(dispositivo)
+        escritor.end_page()
+    escritor.close()
+
+    with pymupdf.open("pdf", bruto.getvalue()) as pdf:
+        pdf.subset_fonts()
+        pdf.save(caminho, garbage=3, deflate=True)
+
+
+# ==============================================================================
+# 5. GERAÇÃO EM PARALELO
+# ==============================================================================
+
+_MODELO = None # Modelo recebido uma vez por processo (initializer)
+
+
+def _iniciar_processo(modelo, fontes_pdf) -> None:
+    global _MODELO
+    _MODELO = modelo
+    carregar_fontes_pdf(fontes_pdf)
+
+
+def _gerar_lote(lote) -> int:
+    """
+    Gera as cartas de um lote de (campos, caminho do .docx, caminho do .pdf ou None).
+    """
+    for campos, caminho_docx, caminho_pdf in lote:
+        _MODELO.gravar_docx(campos, caminho_docx)
+        if caminho_pdf is not None:
+            gravar_pdf(_MODELO.preencher_html(campos), caminho_pdf)
+    return len(lote)
+
+
+def nome_arquivo_carta(numero) -> str:
+    return re.sub(r'[<>:"/\\|?*]', "_", f"{numero} - resposta")
+
+
+def gerar_cartas(modelo, registros, pasta_saida, gerar_pdf=GERAR_PDF, fontes_pdf=FONTES_PDF,
+                 max_processos=MAX_PROCESSOS, tamanho_lote=TAMANHO_LOTE) -> int:
+    """
+    Gera uma carta de resposta (.docx e, opcionalmente, .pdf) para cada número CP.
+
+    O modelo é interpretado uma vez e enviado a cada processo no início (initializer), junto
+    com as fontes do PDF; as tarefas levam só os campos das cartas, em lotes.
+
+    Args:
+        modelo (ModeloCarta | str | Path): Modelo já carregado ou caminho do .docx.
+        registros (dict): Número CP -> campos (ver montar_registros).
+        pasta_saida (str | Path): Pasta das cartas, criada se não existir.
+        gerar_pdf (bool): Gera também o PDF de cada carta.
+        fontes_pdf (dict, opcional): Fontes TrueType do PDF (ver FONTES_PDF).
+        max_processos (int, opcional): Limite de processos; 1 gera tudo no processo atual.
+        tamanho_lote (int): Cartas por tarefa.
+
+    Returns:
+        int: Quantidade de cartas geradas.
+    """
+    if not isinstance(modelo, ModeloCarta):
+        modelo = ModeloCarta(modelo)
+    if gerar_pdf and not PDF_DISPONIVEL:
+        logging.warning("PyMuPDF não está instalado; as cartas serão geradas só em .docx.")
+        gerar_pdf = False
+    if registros:
+        ausentes = set(modelo.campos) - set(next(iter(registros.values()))) - {'Data'}
+        if ausentes:
+            logging.warning(f"Campos do modelo sem dados (ficarão em branco): {sorted(ausentes)}")
+
+    pasta_saida = Path(pasta_saida)
+    pasta_saida.mkdir(parents=True, exist_ok=True)
+    data = date.today().strftime("%d/%m/%Y")
+    tarefas = []
+    for numero, campos in registros.items():
+        nome = nome_arquivo_carta(numero)
+        tarefas.append((
+            {'Data': data, **campos},
+            pasta_saida / f"{nome}.docx",
+            pasta_saida / f"{nome}.pdf" if gerar_pdf else None,
+        ))
+    lotes = [tarefas[i:i + tamanho_lote] for i in range(0, len(tarefas), tamanho_lote)]
+
+    if max_processos == 1:
+        _iniciar_processo(modelo, fontes_pdf)
+        geradas = sum(map(_gerar_lote, lotes))
+    else:
+        with ProcessPoolExecutor(max_workers=max_processos, initializer=_iniciar_processo,
+                                 initargs=(modelo, fontes_pdf)) as executor:
+            geradas = 0
+            for quantidade in executor.map(_gerar_lote, lotes):
+                geradas += quantidade
+                logging.info(f"Cartas geradas: {geradas}/{len(tarefas)}")
+
+    logging.info(f"{geradas} cartas de resposta gravadas em {pasta_saida}")
+    return geradas
+
+
+# ==============================================================================
+# 6. EXECUÇÃO
+# ==============================================================================
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if not ARQUIVO_MODELO_CARTA.exists():
+        criar_modelo_padrao(ARQUIVO_MODELO_CARTA)
+        logging.info(f"Modelo de carta não encontrado; modelo padrão criado em {ARQUIVO_MODELO_CARTA}")
+
+    try:
+        df = carregar_planilha(ARQUIVO_EXCEL, usecols=['Numero', 'Nome', 'Titulo da Contribuição ', 'Item CP alterado'])
+    except Exception as e:
+        logging.exception(f"Falha na leitura do Excel: {e}")
+        return
+    complementos = {}
+    for nome, caminho in (('df_devolutiva', ARQUIVO_DEVOLUTIVA), ('df_situacao', ARQUIVO_SITUACAO)):
+        if caminho.exists():
+            complementos[nome] = pd.read_excel(caminho, dtype=str)
+        else:
+            logging.warning(f"Planilha não encontrada, campos correspondentes ficarão em branco: {caminho}")
+
+    registros = montar_registros(df, **complementos)
+    logging.info(f"{len(registros)} contribuições com número CP.")
+    gerar_cartas(ARQUIVO_MODELO_CARTA, registros, PASTA_CARTAS)
+
+
+if __name__ == "__main__":
+    main()
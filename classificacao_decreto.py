@@ -1,8 +1,8 @@
 import re
 import json
 import os
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
+
+from exportador_tabelas import exportar_linhas
 
 def parse_decreto_para_dados_tabela(texto_decreto):
     """
@@ -184,32 +184,9 @@ def gerar_tabela_analise_e_planilha(dados_tabela, nome_arquivo_xlsx="analise_dec
 
     # --- Parte 2: Salvar a Planilha XLSX ---
     try:
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Análise Decreto"
-
-        ws.append(cabecalho)
-
-        for row_data in dados_tabela:
-            row_to_write = [row_data.get(col, "") for col in cabecalho]
-            ws.append(row_to_write)
-
-        # Ajusta automaticamente a largura das colunas
-        for col_idx, col_name in enumerate(cabecalho):
-            max_length = 0
-            for cell in ws[get_column_letter(col_idx + 1)]:
-                try:
-                    if cell.value is not None:
-                        cell_value_str = str(cell.value)
-                        current_length = min(len(cell_value_str), 100) # Limite de 100 caracteres na largura do Excel
-                        if current_length > max_length:
-                            max_length = current_length
-                except:
-                    pass
-            adjusted_width = (max_length + 2)
-            ws.column_dimensions[get_column_letter(col_idx + 1)].width = adjusted_width
-
-        wb.save(nome_arquivo_xlsx)
+        linhas = ([row_data.get(col, "") for col in cabecalho] for row_data in dados_tabela)
+        # Larguras ajustadas durante a gravação, com limite de 100 caracteres na largura do Excel
+        exportar_linhas(nome_arquivo_xlsx, cabecalho, linhas, titulo_aba="Análise Decreto", largura_maxima=100)
         print(f"Planilha '{nome_arquivo_xlsx}' gerada com sucesso!")
     except Exception as e:
         print(f"Erro ao salvar o arquivo XLSX: {e}")
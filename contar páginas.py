@@ -1,5 +1,5 @@
-import docx
-from openpyxl import Workbook
+from exportador_tabelas import exportar_linhas
+from leitor_tabelas_docx import CABECALHOS_DECRETO, linhas_por_cabecalho
 import re
 import os
 import fitz # PyMuPDF
@@ -127,66 +127,34 @@ def analisar_decreto_word(caminho_documento_word, caminho_saida_excel):
         print("Por favor, salve o documento Word como PDF com o mesmo nome base (.docx e .pdf) e na mesma pasta.")
         return
 
+    # A tabela é lida direto do XML em streaming, procurada pelo cabeçalho 'Item', 'Minuta de Decreto' e
+    # 'Visões das contribuições' (com ou sem acentos); cada linha chega como uma tupla com o texto das células.
     try:
-        documento = docx.Document(caminho_documento_word)
-        print(f"Documento Word '{caminho_documento_word}' aberto com sucesso.")
+        linhas_tabela_decreto = list(linhas_por_cabecalho(caminho_documento_word, CABECALHOS_DECRETO))
+        print(f"Documento Word '{caminho_documento_word}' lido com sucesso.")
     except Exception as e:
         print(f"Erro ao abrir o documento Word: {e}")
         return
 
-    dados_para_excel = []
-    dados_para_excel.append(["Item Principal", "Texto da Minuta de Decreto", "Quantidade de Contribuições", "Página Inicial", "Número de Páginas"])
+    cabecalho_excel = ["Item Principal", "Texto da Minuta de Decreto", "Quantidade de Contribuições", "Página Inicial", "Número de Páginas"]
 
     regex_contexto = re.compile(r"^(Art\.\s*\d+º?|Parágrafo único\.?|\u00a7\s*\d+\u00ba?|[IVXLCDM]+\s*[-–.]\s*|[a-z]\))", re.IGNORECASE)
 
-    encontrou_tabela_decreto = False
-    tabela_decreto = None
-
-    for table in documento.tables:
-        if len(table.rows) > 0 and len(table.rows[0].cells) >= 3:
-            cell1_text = table.rows[0].cells[0].text.strip()
-            cell2_text = table.rows[0].cells[1].text.strip()
-            cell3_text = table.rows[0].cells[2].text.strip()
-            
-            print(f"DEBUG: Cabeçalhos da primeira tabela lidos do Word: '{cell1_text}', '{cell2_text}', '{cell3_text}'")
-
-            is_item_header = "ITEM" in cell1_text.upper()
-            is_minuta_header = "MINUTA DE DECRETO" in cell2_text.upper()
-            
-            is_visoes_header = False
-            if "VISÕES DAS CONTRIBUIÇÕES" in cell3_text.upper():
-                is_visoes_header = True
-            elif "VISOES DAS CONTRIBUICOES" in cell3_text.upper():
-                is_visoes_header = True
-            elif "VISAO DAS CONTRIBUICOES" in cell3_text.upper():
-                is_visoes_header = True
-
-            if is_item_header and is_minuta_header and is_visoes_header:
-                encontrou_tabela_decreto = True
-                tabela_decreto = table
-                print("Tabela do decreto identificada.")
-                break
-
-    if not encontrou_tabela_decreto:
-        print("A tabela principal do decreto não foi encontrada no documento Word com os cabeçalhos esperados.")
+    if linhas_tabela_decreto:
+        print("Tabela do decreto identificada.")
+    else:
+        print("A tabela principal do decreto não foi encontrada no documento Word com os cabeçalhos esperados (ou está vazia).")
         print("Verifique se os cabeçalhos 'Item', 'Minuta de Decreto' e 'Visões das contribuições' (ou variações próximas) estão presentes na primeira linha da tabela.")
         return
 
     itens_para_buscar_no_pdf = []
     dados_itens_brutos = []
 
-    for i, row in enumerate(tabela_decreto.rows):
-        if i == 0:
-            continue
-
-        if len(row.cells) >= 3:
-            item_principal_cell = row.cells[0]
-            minuta_decreto_cell = row.cells[1]
-            quantidade_contribuicoes_cell = row.cells[2]
-
-            item_number_raw = item_principal_cell.text.strip()
-            minuta_text_raw = minuta_decreto_cell.text.strip()
-            quantidade_contribuicoes_text_raw = quantidade_contribuicoes_cell.text.strip()
+    for i, textos_celulas in enumerate(linhas_tabela_decreto, start=1):
+        if len(textos_celulas) >= 3:
+            item_number_raw = textos_celulas[0].strip()
+            minuta_text_raw = textos_celulas[1].strip()
+            quantidade_contribuicoes_text_raw = textos_celulas[2].strip()
 
             if item_number_raw.isdigit() and len(item_number_raw) > 0 and len(minuta_text_raw) > 0:
                 match = regex_contexto.search(minuta_text_raw)
@@ -208,7 +176,7 @@ def analisar_decreto_word(caminho_documento_word, caminho_saida_excel):
                     "num_paginas": None
                 })
         else:
-            print(f"Aviso: Linha {i+1} da tabela tem menos de 3 células esperadas, ignorando. Conteúdo: {normalize_text_for_comparison(row.text)}")
+            print(f"Aviso: Linha {i+1} da tabela tem menos de 3 células esperadas, ignorando. Conteúdo: {normalize_text_for_comparison(' '.join(textos_celulas))}")
 
     paginas_dos_itens = obter_pagina_dos_itens_no_pdf(caminho_pdf_correspondente, itens_para_buscar_no_pdf)
 
@@ -262,36 +230,20 @@ def analisar_decreto_word(caminho_documento_word, caminho_saida_excel):
             else:
                 last_item_data["num_paginas"] = "N/A"
 
-    for item_data in dados_itens_brutos:
-        dados_para_excel.append([
+    dados_para_excel = (
+        [
             item_data["identificador"],
             item_data["minuta_text"],
             item_data["quantidade_contribuicoes"],
             item_data["pagina_inicial"],
             item_data["num_paginas"]
-        ])
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Analise Decreto"
-
-    for row_data in dados_para_excel:
-        ws.append(row_data)
-
-    for col in ws.columns:
-        max_length = 0
-        column = col[0].column_letter
-        for cell in col:
-            try:
-                if cell.value is not None and len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = (max_length + 2)
-        ws.column_dimensions[column].width = adjusted_width
+        ]
+        for item_data in dados_itens_brutos
+    )
 
     try:
-        wb.save(caminho_saida_excel)
+        # As larguras das colunas são ajustadas durante a gravação (maior valor + 2).
+        exportar_linhas(caminho_saida_excel, cabecalho_excel, dados_para_excel, titulo_aba="Analise Decreto")
         print(f"Análise concluída! Dados salvos em: {caminho_saida_excel}")
     except Exception as e:
         print(f"Erro ao salvar o arquivo Excel: {e}")
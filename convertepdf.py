@@ -1,35 +1,41 @@
-import fitz  # PyMuPDF
-import pytesseract
-from PIL import Image
-import io
+import logging
+import os
 
-# Definir caminho para o executável do Tesseract
-pytesseract.pytesseract.tesseract_cmd = r"J:\tesseract\tesseract.exe"
+from cache_textos_pdf import cache_da_pasta
+from ocr_pdf import TESSERACT_DISPONIVEL, configuracao_ocr, converter_pdf
+
+if TESSERACT_DISPONIVEL:
+    import pytesseract
+
+    # Definir caminho para o executável do Tesseract
+    pytesseract.pytesseract.tesseract_cmd = r"J:\tesseract\tesseract.exe"
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 
 # Caminho do PDF de entrada
 pdf_path = r"W:\MINISTÉRIO DAS CIDADES\Consulta 7217\Contribuições PDF\CP-930603 - FRANCISCO DOS SANTOS LOPES.pdf"
 # Caminho do arquivo .txt de saída
 output_txt_path = r"W:\MINISTÉRIO DAS CIDADES\Consulta 7217\Contribuições PDF\CP-930603 - FRANCISCO DOS SANTOS LOPES.txt"
 
-# Abrir o PDF
-doc = fitz.open(pdf_path)
-all_text = ""
-
-for i, page in enumerate(doc):
-    print(f"Processando página {i + 1} de {len(doc)}...")
-
-    # Renderizar como imagem em alta resolução
-    pix = page.get_pixmap(dpi=300)
-    img_bytes = pix.tobytes("png")
-
-    # Carregar imagem com Pillow
-    image = Image.open(io.BytesIO(img_bytes))
-
-    # Aplicar OCR em português
-    text = pytesseract.image_to_string(image, lang="por", config="--psm 6")
-
-    # Adicionar separador por página
-    all_text += f"\n--- Página {i + 1} ---\n{text}\n"
+# True: OCR só das páginas sem camada de texto utilizável; False: OCR de todas as páginas
+OCR_SELETIVO = True
+
+# Parâmetros do OCR (DPI, idioma, --psm e limites do modo seletivo) ficam em ocr_pdf.py e
+# entram todos na chave do cache: mudar qualquer um refaz a conversão.
+CONFIGURACAO_OCR = configuracao_ocr(OCR_SELETIVO)
+
+# O mesmo PDF (mesmo com outro nome) já foi convertido com esta configuração?
+cache = cache_da_pasta(os.path.dirname(pdf_path))
+sha256 = cache.hash_do_arquivo(pdf_path)
+registro = cache.obter(sha256, CONFIGURACAO_OCR)
+
+if registro is not None:
+    all_text = registro[0]
+    print(f"Texto encontrado no cache ({registro[1]} páginas); nada a processar.")
+else:
+    all_text, total_paginas, paginas_ocr = converter_pdf(pdf_path, seletivo=OCR_SELETIVO)
+    print(f"{total_paginas - len(paginas_ocr)} página(s) com texto próprio; {len(paginas_ocr)} passaram pelo OCR.")
+    cache.gravar(sha256, CONFIGURACAO_OCR, all_text, total_paginas, [])
 
 # Salvar o texto no arquivo .txt
 with open(output_txt_path, "w", encoding="utf-8") as f:
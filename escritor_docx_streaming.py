@@ -0,0 +1,212 @@
+import logging
+import shutil
+import zipfile
+from pathlib import Path
+
+from docx import Document
+from docx.oxml.ns import nsdecls, qn
+from lxml import etree
+
+from indice_linhas_word import tcs_da_grade, item_por_digitos
+from renderizador_celulas import renderizador_do_documento
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+BASE_DIR = Path(__file__).parent
+ARQUIVO_EXCEL = BASE_DIR / "Consideracoes-sobre-a-Consulta_Publica_Decreto_7217.2010.xlsx"
+ARQUIVO_WORD_MODELO = BASE_DIR / "saida.docx"
+ARQUIVO_WORD_SAIDA = BASE_DIR / "saida_completa.docx"
+
+PARTE_DOCUMENTO = "word/document.xml"
+PARTE_ESTILOS = "word/styles.xml"
+
+_W_DOCUMENT = qn('w:document')
+_W_BODY = qn('w:body')
+_W_TBL = qn('w:tbl')
+_W_TR = qn('w:tr')
+_W_P = qn('w:p')
+_W_T = qn('w:t')
+_REMOVIDOS_CELULA = {qn('w:p'), qn('w:tbl')}
+
+
+# ==============================================================================
+# 2. TRANSFORMAÇÃO DE UMA LINHA
+# ==============================================================================
+
+def _texto_celula(tc) -> str:
+    # Só o texto dos w:t: basta para ler o número do item (o elemento vem do iterparse, sem as classes do python-docx).
+    return "\n".join("".join(t.text or "" for t in p.iter(_W_T)) for p in tc.iterchildren(_W_P))
+
+
+def _preencher_tc(tc, xml) -> None:
+    """
+    Troca os parágrafos (e tabelas aninhadas) da célula pelos parágrafos do XML renderizado.
+    """
+    tc[:] = [filho for filho in tc if filho.tag not in _REMOVIDOS_CELULA]
+    tc.extend(list(etree.fromstring(f'<w:tc {nsdecls("w")}>{xml}</w:tc>')))
+
+
+# ==============================================================================
+# 3. ESCRITOR
+# ==============================================================================
+
+def gravar_docx_streaming(caminho_modelo, caminho_saida, contrib_por_item, chave=item_por_digitos,
+                          coluna_item=0, coluna=2, fonte='Calibri', tamanho=8, cor='auto') -> int:
+    """
+    Gera o documento de análise preenchido sem montar a árvore inteira do document.xml na memória.
+
+    As partes do modelo são copiadas uma a uma para o novo .docx. O word/document.xml é lido
+    com iterparse e escrito de forma incremental: cada linha de tabela é preenchida assim que
+    termina de ser lida, gravada no arquivo de saída e descartada. A memória fica limitada ao
+    modelo (aberto uma vez com o python-docx só para registrar os estilos) e à maior linha,
+    qualquer que seja o volume de contribuições.
+
+    Args:
+        caminho_modelo (str | Path): .docx com a tabela "Item / Minuta de Decreto / Visões das contribuições".
+        caminho_saida (str | Path): .docx a gerar.
+        contrib_por_item: Item -> contribuições (ArmazemContribuicoes ou dict de listas).
+        chave (callable): Recebe o texto da célula do item e retorna o número do item ou None.
+        coluna_item (int) / coluna (int): Colunas da grade com o item e com as contribuições.
+        fonte (str) / tamanho (float) / cor (str): Configuração dos estilos (ex.: ESTILOS_CONTRIBUICAO).
+
+    Returns:
+        int: Quantidade de células preenchidas.
+    """
+    # Os estilos usados pelos parágrafos são registrados no styles.xml do modelo, que é pequeno.
+    modelo = Document(caminho_modelo)
+    renderizador = renderizador_do_documento(modelo, fonte, tamanho, cor)
+    estilos_xml = modelo.part._styles_part.blob
+    del modelo
+
+    preenchidas = 0
+    with zipfile.ZipFile(caminho_modelo) as entrada, \
+            zipfile.ZipFile(caminho_saida, "w", zipfile.ZIP_DEFLATED) as saida:
+        for info in entrada.infolist():
+            if info.filename == PARTE_DOCUMENTO:
+                with entrada.open(info) as origem, saida.open(PARTE_DOCUMENTO, "w", force_zip64=True) as destino:
+                    preenchidas = _transformar_documento(origem, destino, contrib_por_item, renderizador,
+                                                         chave, coluna_item, coluna)
+            elif info.filename == PARTE_ESTILOS:
+                saida.writestr(info, estilos_xml)
+            else:
+                with entrada.open(info) as origem, saida.open(info, "w") as destino:
+                    shutil.copyfileobj(origem, destino)
+
+    logging.info(f"Documento gravado em streaming: {preenchidas} células preenchidas -> {caminho_saida}")
+    return preenchidas
+
+
+def _transformar_documento(origem, destino, contrib_por_item, renderizador, chave, coluna_item, coluna) -> int:
+    """
+    Copia o document.xml de 'origem' para 'destino' elemento a elemento, preenchendo as linhas das tabelas.
+
+    Os elementos w:document, w:body e as tabelas do corpo têm só as marcas de abertura e de
+    fechamento escritas; as linhas e os demais blocos do corpo são escritos inteiros ao terminar
+    e removidos da árvore do iterparse em seguida.
+    """
+    preenchidas = 0
+    abertos = [] # Elementos já abertos na saída: w:document, w:body e a tabela atual
+    grade = {}
+    escritor = None
+    destino.write(b"<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n")
+    for evento, elemento in etree.iterparse(origem, events=("start", "end")):
+        pai = abertos[-1] if abertos else None
+        if evento == "start":
+            # Só w:document, w:body e as tabelas do corpo ficam abertos; o resto é escrito inteiro no 'end'.
+            if pai is None:
+                escritor = _EscritorBlocos(destino, elemento.nsmap)
+            elif not (elemento.getparent() is pai and (
+                    pai.tag == _W_DOCUMENT and elemento.tag == _W_BODY
+                    or pai.tag == _W_BODY and elemento.tag == _W_TBL)):
+                continue
+            escritor.abrir(elemento, declarar_namespaces=pai is None)
+            abertos.append(elemento)
+            grade = {}
+            continue
+
+        if elemento is pai:
+            escritor.fechar(abertos.pop())
+            _descartar(elemento)
+            continue
+        if elemento.getparent() is not pai:
+            continue # Elemento interno: é escrito junto com o bloco que o contém
+
+        if elemento.tag == _W_TR and pai.tag == _W_TBL:
+            tcs, grade = tcs_da_grade(elemento, grade)
+            if len(tcs) > max(coluna, coluna_item):
+                texto = _texto_celula(tcs[coluna_item])
+                item = chave(texto) if texto else None
+                if item is not None and item in contrib_por_item:
+                    if tcs[coluna].getparent() is elemento:
+                        _preencher_tc(tcs[coluna], renderizador.xml_contribuicoes(contrib_por_item[item]))
+                        preenchidas += 1
+                    else:
+                        logging.warning(f"Item {item}: célula de contribuições mesclada com a linha anterior; ignorada.")
+        escritor.escrever(elemento)
+        _descartar(elemento)
+    return preenchidas
+
+
+class _EscritorBlocos:
+    """
+    Escreve marcas de abertura/fechamento e blocos inteiros, declarando os namespaces só na raiz.
+
+    Os elementos do iterparse herdam as declarações da raiz, e o etree.tostring (como o
+    xmlfile.write) as repetiria em cada linha de tabela; aqui elas são retiradas da primeira
+    marca de cada bloco quando já estão declaradas na raiz.
+    """
+
+    def __init__(self, destino, nsmap):
+        self.destino = destino
+        self.nsmap = dict(nsmap)
+        self._declaracoes = [
+            (f' xmlns:{prefixo}="{uri}"' if prefixo else f' xmlns="{uri}"').encode("utf-8")
+            for prefixo, uri in nsmap.items()
+        ]
+
+    def _sem_declaracoes(self, xml) -> bytes:
+        fim = xml.index(b">")
+        marca = xml[:fim]
+        for declaracao in self._declaracoes:
+            marca = marca.replace(declaracao, b"")
+        return marca + xml[fim:]
+
+    def abrir(self, elemento, declarar_namespaces=False) -> None:
+        raso = etree.Element(elemento.tag, dict(elemento.attrib), nsmap=self.nsmap)
+        xml = etree.tostring(raso)
+        if not declarar_namespaces:
+            xml = self._sem_declaracoes(xml)
+        self.destino.write(xml[:-2] + b">") # '<w:body/>' -> '<w:body>'
+
+    def fechar(self, elemento) -> None:
+        nome = etree.QName(elemento).localname
+        self.destino.write(f"</{elemento.prefix}:{nome}>".encode("utf-8") if elemento.prefix else f"</{nome}>".encode("utf-8"))
+
+    def escrever(self, elemento) -> None:
+        self.destino.write(self._sem_declaracoes(etree.tostring(elemento)))
+
+
+def _descartar(elemento) -> None:
+    # Libera o elemento já escrito e os irmãos anteriores que o iterparse ainda mantém.
+    elemento.clear(keep_tail=True)
+    pai = elemento.getparent()
+    if pai is not None:
+        while elemento.getprevious() is not None:
+            del pai[0]
+
+
+# ==============================================================================
+# 4. EXECUÇÃO
+# ==============================================================================
+
+if __name__ == "__main__":
+    from armazem_contribuicoes import ArmazemContribuicoes
+    from cache_planilha import carregar_planilha
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    df = carregar_planilha(ARQUIVO_EXCEL, usecols=['Item CP alterado', 'Numero', 'Titulo da Contribuição ', 'Texto', 'Nome'])
+    contrib_por_item = ArmazemContribuicoes.de_dataframe(df)
+    logging.info(f"{contrib_por_item.total_pares} contribuições em {len(contrib_por_item)} itens.")
+    gravar_docx_streaming(ARQUIVO_WORD_MODELO, ARQUIVO_WORD_SAIDA, contrib_por_item)
@@ -0,0 +1,117 @@
+import logging
+import weakref
+
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Pt, RGBColor
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+# Estilos de parágrafo da coluna "Visões das contribuições" (chave -> nome do estilo no Word).
+ESTILOS_VISOES = {
+    'numero': "Contribuicao Numero",
+    'titulo': "Contribuicao Titulo",
+    'texto': "Contribuicao Texto",
+    'autor': "Contribuicao Autor",
+    'separador': "Contribuicao Separador",
+}
+
+# Estilos já registrados em cada documento (pela DocumentPart), para não consultar styles.xml a cada célula.
+_ESTILOS_REGISTRADOS = weakref.WeakKeyDictionary()
+
+
+# ==============================================================================
+# 2. REGISTRO DE ESTILOS
+# ==============================================================================
+
+def _adicionar_borda_inferior(estilo) -> None:
+    """
+    Linha separadora (mesma borda do antigo adicionar_linha_separadora), definida no estilo.
+    """
+    p_pr = estilo.element.get_or_add_pPr()
+    p_bdr = p_pr.find(qn('w:pBdr'))
+    if p_bdr is not None:
+        p_pr.remove(p_bdr)
+    p_bdr = OxmlElement('w:pBdr')
+    bottom_border = OxmlElement('w:bottom')
+    bottom_border.set(qn('w:val'), 'single')
+    bottom_border.set(qn('w:sz'), '6')
+    bottom_border.set(qn('w:space'), '1')
+    bottom_border.set(qn('w:color'), 'auto')
+    p_bdr.append(bottom_border)
+    p_pr.append(p_bdr)
+
+
+def registrar_estilo_paragrafo(documento, nome, fonte=None, tamanho=None, negrito=None, italico=None,
+                               cor='auto', borda_inferior=False) -> str:
+    """
+    Cria (ou atualiza, se já existir) um estilo de parágrafo baseado no 'Normal' do documento.
+
+    Args:
+        documento: Document do python-docx (ou a DocumentPart, por exemplo celula.part).
+        nome (str): Nome do estilo.
+        fonte (str, opcional) / tamanho (float, opcional): Fonte e tamanho em pontos.
+        negrito (bool) / italico (bool): Ênfase aplicada a todo o parágrafo (None herda do 'Normal').
+        cor (str): 'auto' ou um código RGB (ex.: '0000FF').
+        borda_inferior (bool): Desenha a linha separadora sob o parágrafo.
+
+    Returns:
+        str: O styleId, usado em <w:pStyle w:val="..."/>.
+    """
+    estilos = documento.styles
+    try:
+        estilo = estilos[nome]
+    except KeyError:
+        estilo = estilos.add_style(nome, WD_STYLE_TYPE.PARAGRAPH)
+        logging.debug(f"Estilo '{nome}' registrado no documento.")
+    try:
+        estilo.base_style = estilos['Normal']
+    except KeyError:
+        pass
+
+    estilo.font.name = fonte
+    estilo.font.size = Pt(tamanho) if tamanho else None
+    estilo.font.bold = negrito
+    estilo.font.italic = italico
+    estilo.font.color.rgb = RGBColor.from_string(cor) if cor and cor != 'auto' else None
+    if borda_inferior:
+        _adicionar_borda_inferior(estilo)
+    return estilo.style_id
+
+
+def registrar_estilos_visoes(documento, fonte='Calibri', tamanho=8, cor='auto') -> dict:
+    """
+    Registra os estilos das contribuições (número, título, texto, autor e separador).
+
+    O separador herda a fonte do 'Normal', como o parágrafo vazio usado antes como linha.
+
+    Returns:
+        dict: Chave de ESTILOS_VISOES -> styleId.
+    """
+    return {
+        'numero': registrar_estilo_paragrafo(documento, ESTILOS_VISOES['numero'], fonte, tamanho, negrito=True, cor=cor),
+        'titulo': registrar_estilo_paragrafo(documento, ESTILOS_VISOES['titulo'], fonte, tamanho, cor=cor),
+        'texto': registrar_estilo_paragrafo(documento, ESTILOS_VISOES['texto'], fonte, tamanho, cor=cor),
+        'autor': registrar_estilo_paragrafo(documento, ESTILOS_VISOES['autor'], fonte, tamanho, italico=True, cor=cor),
+        'separador': registrar_estilo_paragrafo(documento, ESTILOS_VISOES['separador'], borda_inferior=True),
+    }
+
+
+def estilo_celula(documento, fonte='Calibri', tamanho=8, negrito=False) -> str:
+    """
+    Estilo de parágrafo para células de texto simples, registrado na primeira vez que é pedido.
+
+    Usado pelos preenchedores que aplicavam fonte, tamanho e negrito run a run; como antes,
+    negrito=False desliga o negrito explicitamente (não herda do estilo da tabela).
+
+    Returns:
+        str: O styleId, para paragrafo._p.style = ...
+    """
+    nome = f"Celula {fonte} {tamanho:g}{' Negrito' if negrito else ''}"
+    registrados = _ESTILOS_REGISTRADOS.setdefault(documento.part, {})
+    if nome not in registrados:
+        registrados[nome] = registrar_estilo_paragrafo(documento, nome, fonte, tamanho, negrito=bool(negrito))
+    return registrados[nome]
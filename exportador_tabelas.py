@@ -0,0 +1,262 @@
+import csv
+import json
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_DISPONIVEL = True
+except ImportError:
+    PARQUET_DISPONIVEL = False
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+FORMATOS = ("xlsx", "csv", "jsonl", "parquet")
+DELIMITADOR_CSV = ";" # O Excel em português abre CSV separado por ';' sem perguntar nada
+TAMANHO_LOTE_PARQUET = 10_000 # Linhas acumuladas antes de gravar cada row group
+
+
+# ==============================================================================
+# 2. EXPORTADOR
+# ==============================================================================
+
+class ExportadorTabela:
+    """
+    Grava uma tabela linha a linha em XLSX, CSV, JSON Lines ou Parquet, sem montá-la em memória.
+
+    As larguras das colunas do XLSX são calculadas durante a gravação (a partir do texto de cada
+    valor), e não por uma nova varredura da planilha no final. Como o openpyxl em modo somente
+    escrita exige as larguras antes da primeira linha, as linhas do XLSX passam por um arquivo
+    temporário e são copiadas para a planilha ao fechar.
+
+    Todos os formatos são gravados num arquivo '.tmp' ao lado do destino, que só o substitui ao
+    fechar sem erro: uma exportação interrompida não deixa um arquivo pela metade.
+
+    Uso:
+        with ExportadorTabela("saida.xlsx", cabecalho, titulo_aba="Análise") as exportador:
+            exportador.escrever_linhas(gerador_de_linhas)
+    """
+
+    def __init__(self, caminho, cabecalho, formato=None, titulo_aba="Planilha",
+                 ajustar_larguras=True, largura_maxima=None):
+        """
+        Args:
+            caminho (str | Path): Arquivo de saída.
+            cabecalho (list): Nomes das colunas (primeira linha do XLSX/CSV, chaves do JSON Lines).
+            formato (str, opcional): Um de FORMATOS. Padrão: a extensão do arquivo.
+            titulo_aba (str): Nome da aba do XLSX.
+            ajustar_larguras (bool): Ajusta a largura das colunas do XLSX ao maior valor + 2.
+            largura_maxima (int, opcional): Limite de caracteres considerado no ajuste de largura.
+        """
+        self.caminho = Path(caminho)
+        self.cabecalho = list(cabecalho)
+        self.formato = (formato or self.caminho.suffix.lstrip(".")).lower()
+        if self.formato not in FORMATOS:
+            raise ValueError(f"Formato de exportação não suportado: '{self.formato}'. Use um de {FORMATOS}.")
+        if self.formato == "parquet" and not PARQUET_DISPONIVEL:
+            raise ImportError("A exportação em Parquet requer o pacote 'pyarrow'.")
+        self.temporario = self.caminho.with_name(self.caminho.name + ".tmp")
+        self.titulo_aba = titulo_aba
+        self.ajustar_larguras = ajustar_larguras
+        self.largura_maxima = largura_maxima
+        self.total_linhas = 0
+        self.larguras = [self._largura(nome) for nome in self.cabecalho]
+        self._arquivo = None
+        self._escritor = None
+        self._lote = []
+        self._esquema = None
+
+    # --- Abertura e fechamento ---
+
+    def __enter__(self):
+        self.abrir()
+        return self
+
+    def __exit__(self, tipo_erro, erro, rastreio):
+        if tipo_erro is None:
+            self.fechar()
+        else:
+            self._descartar()
+        return False
+
+    def abrir(self) -> None:
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        if self.formato == "xlsx":
+            self._arquivo = tempfile.TemporaryFile()
+        elif self.formato == "csv":
+            self._arquivo = open(self.temporario, "w", encoding="utf-8-sig", newline="")
+            self._escritor = csv.writer(self._arquivo, delimiter=DELIMITADOR_CSV)
+            self._escritor.writerow(self.cabecalho)
+        elif self.formato == "jsonl":
+            self._arquivo = open(self.temporario, "w", encoding="utf-8")
+
+    def fechar(self) -> None:
+        if self.formato == "xlsx":
+            self._gravar_xlsx()
+        elif self.formato == "parquet":
+            self._gravar_lote_parquet()
+            if self._escritor is None:
+                # Nenhuma linha: grava um arquivo só com as colunas, em texto.
+                self._esquema = pa.schema([(nome, pa.string()) for nome in self.cabecalho])
+                self._escritor = pq.ParquetWriter(self.temporario, self._esquema)
+            self._escritor.close()
+        if self._arquivo is not None:
+            self._arquivo.close()
+        if self.formato != "xlsx":
+            os.replace(self.temporario, self.caminho)
+        logging.info(f"Exportação concluída: {self.total_linhas} linhas -> {self.caminho}")
+
+    def _descartar(self) -> None:
+        if self.formato == "parquet" and self._escritor is not None:
+            self._escritor.close()
+        if self._arquivo is not None:
+            self._arquivo.close()
+        self.temporario.unlink(missing_ok=True)
+
+    # --- Gravação ---
+
+    def escrever(self, linha) -> None:
+        """
+        Grava uma linha (sequência na ordem do cabeçalho).
+        """
+        linha = list(linha)
+        if self.ajustar_larguras and self.formato == "xlsx":
+            for i, valor in enumerate(linha[:len(self.larguras)]):
+                largura = self._largura(valor)
+                if largura > self.larguras[i]:
+                    self.larguras[i] = largura
+
+        if self.formato == "xlsx":
+            pickle.dump(linha, self._arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+        elif self.formato == "csv":
+            self._escritor.writerow(linha)
+        elif self.formato == "jsonl":
+            self._arquivo.write(json.dumps(dict(zip(self.cabecalho, linha)), ensure_ascii=False, default=str) + "\n")
+        else:
+            self._lote.append(linha)
+            if len(self._lote) >= TAMANHO_LOTE_PARQUET:
+                self._gravar_lote_parquet()
+        self.total_linhas += 1
+
+    def escrever_linhas(self, linhas) -> int:
+        """
+        Grava todas as linhas de um iterável (lista ou gerador), à medida que são produzidas.
+
+        Returns:
+            int: Quantidade de linhas gravadas nesta chamada.
+        """
+        inicio = self.total_linhas
+        for linha in linhas:
+            self.escrever(linha)
+        return self.total_linhas - inicio
+
+    # --- Auxiliares ---
+
+    def _largura(self, valor) -> int:
+        if valor is None:
+            return 0
+        largura = len(str(valor))
+        return min(largura, self.largura_maxima) if self.largura_maxima else largura
+
+    def _gravar_xlsx(self) -> None:
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(self.titulo_aba)
+        if self.ajustar_larguras:
+            for i, largura in enumerate(self.larguras, start=1):
+                ws.column_dimensions[get_column_letter(i)].width = largura + 2
+        ws.append(self.cabecalho)
+
+        self._arquivo.seek(0)
+        while True:
+            try:
+                ws.append(pickle.load(self._arquivo))
+            except EOFError:
+                break
+
+        wb.save(self.temporario)
+        os.replace(self.temporario, self.caminho)
+
+    @staticmethod
+    def _tipo_comum(atual, novo):
+        # Tipo que comporta os valores dos dois sem perda: inteiros e reais viram real; o resto, texto.
+        if atual is None or pa.types.is_null(atual) or atual == novo:
+            return novo
+        if pa.types.is_null(novo):
+            return atual
+        numericos = (pa.types.is_integer, pa.types.is_floating)
+        if any(f(atual) for f in numericos) and any(f(novo) for f in numericos):
+            return pa.float64()
+        return pa.string()
+
+    def _gravar_lote_parquet(self) -> None:
+        """
+        Grava o lote acumulado como um row group.
+
+        O tipo de cada coluna vem dos valores já vistos. Se um lote exigir um tipo mais amplo
+        (um real depois de só inteiros, um texto como "N/A" numa coluna numérica), o esquema é
+        promovido e os row groups já gravados são relidos e convertidos: nada é truncado nem
+        convertido sem aviso, ao custo de regravar o arquivo nessas (raras) mudanças.
+        """
+        if not self._lote:
+            return
+        colunas = list(zip(*self._lote))
+        anterior = self._esquema
+        campos = []
+        for i, (nome, valores) in enumerate(zip(self.cabecalho, colunas)):
+            try:
+                tipo = pa.array(valores).type
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+                tipo = pa.string() # Coluna com tipos misturados (ex.: 3 e "N/A") fica em texto
+            campos.append((nome, self._tipo_comum(anterior.field(i).type if anterior else None, tipo)))
+        esquema = pa.schema(campos)
+
+        if anterior is None or not esquema.equals(anterior):
+            gravado = None
+            if self._escritor is not None:
+                self._escritor.close()
+                gravado = pq.read_table(self.temporario).cast(esquema)
+                ampliadas = [f"{novo.name} ({velho.type} -> {novo.type})" for velho, novo in zip(anterior, esquema) if velho.type != novo.type]
+                logging.info(f"Parquet: colunas ampliadas {', '.join(ampliadas)}; regravando {gravado.num_rows} linhas.")
+            self._esquema = esquema
+            self._escritor = pq.ParquetWriter(self.temporario, esquema)
+            if gravado is not None:
+                self._escritor.write_table(gravado)
+
+        arrays = []
+        for campo, valores in zip(self._esquema, colunas):
+            if pa.types.is_string(campo.type):
+                valores = [None if v is None else str(v) for v in valores]
+            arrays.append(pa.array(valores, type=campo.type, safe=True))
+        self._escritor.write_table(pa.Table.from_arrays(arrays, schema=self._esquema))
+        self._lote = []
+
+
+# ==============================================================================
+# 3. ATALHO
+# ==============================================================================
+
+def exportar_linhas(caminho, cabecalho, linhas, **opcoes) -> int:
+    """
+    Grava o cabeçalho e as linhas (lista ou gerador) num único passo.
+
+    Args:
+        caminho (str | Path): Arquivo de saída; o formato vem da extensão (.xlsx, .csv, .jsonl, .parquet).
+        cabecalho (list): Nomes das colunas.
+        linhas (iterable): Linhas na ordem do cabeçalho.
+        **opcoes: Repassadas a ExportadorTabela (titulo_aba, largura_maxima...).
+
+    Returns:
+        int: Quantidade de linhas gravadas (sem o cabeçalho).
+    """
+    with ExportadorTabela(caminho, cabecalho, **opcoes) as exportador:
+        exportador.escrever_linhas(linhas)
+    return exportador.total_linhas
@@ -0,0 +1,288 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cache_textos_pdf import cache_da_pasta
+
+try:
+    import PyPDF2
+    PYPDF2_DISPONIVEL = True
+except ImportError:
+    PYPDF2_DISPONIVEL = False
+
+try:
+    import pymupdf
+    PYMUPDF_DISPONIVEL = True
+except ImportError:
+    PYMUPDF_DISPONIVEL = False
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+MAX_PROCESSOS = None # None: um processo por núcleo
+
+# Backend de extração usado quando nenhum é informado: o PyMuPDF (MuPDF, em C) quando instalado.
+# Ver 'benchmark_extracao_pdf.py' para a comparação de velocidade e de texto com o PyPDF2.
+BACKEND_PADRAO = 'pymupdf' if PYMUPDF_DISPONIVEL else 'pypdf2'
+
+# Consulta o cache de textos (ver cache_textos_pdf.py) quando nenhum cache é informado.
+USAR_CACHE = True
+CONFIRMAR_A_CADA = 50 # Em lotes, grava o cache no disco a cada N PDFs extraídos
+
+
+# ==============================================================================
+# 2. BACKENDS DE EXTRAÇÃO
+# ==============================================================================
+
+class ExtratorPDF:
+    """
+    Interface dos backends: 'paginas' abre o arquivo e produz o texto de cada página.
+
+    Os textos das páginas são guardados numa lista e unidos uma única vez no fim: o 'texto +=
+    pagina.extract_text()' dos scripts copiava o texto acumulado a cada página (custo quadrático
+    em PDFs longos). Uma página com erro não invalida as demais; o erro é devolvido.
+    """
+
+    nome = None
+    versao = None
+
+    def configuracao(self) -> str:
+        """
+        Identifica o backend e a versão da biblioteca na chave do cache: outra versão pode extrair outro texto.
+        """
+        return f"{self.nome} {self.versao}"
+
+    def paginas(self, caminho_pdf):
+        """
+        Yields:
+            str | Exception: Texto de cada página, ou a exceção levantada ao extraí-la.
+        """
+        raise NotImplementedError
+
+    def extrair(self, caminho_pdf):
+        """
+        Returns:
+            tuple: (texto, quantidade de páginas, lista de mensagens de erro por página)
+
+        Raises:
+            Exception: Se o arquivo não puder ser aberto como PDF.
+        """
+        textos, erros = [], []
+        for numero, pagina in enumerate(self.paginas(caminho_pdf), start=1):
+            if isinstance(pagina, Exception):
+                erros.append(f"página {numero}: {pagina}")
+                textos.append("")
+            else:
+                textos.append(pagina)
+        return "".join(textos), len(textos), erros
+
+
+class ExtratorPyPDF2(ExtratorPDF):
+    """
+    PyPDF2.PdfReader (Python puro), o backend original dos scripts.
+    """
+
+    nome = 'pypdf2'
+    versao = PyPDF2.__version__ if PYPDF2_DISPONIVEL else None
+
+    def paginas(self, caminho_pdf):
+        with open(caminho_pdf, "rb") as arquivo:
+            for pagina in PyPDF2.PdfReader(arquivo).pages:
+                try:
+                    yield pagina.extract_text() or ""
+                except Exception as e:
+                    yield e
+
+
+class ExtratorPyMuPDF(ExtratorPDF):
+    """
+    PyMuPDF (fitz), o mesmo já usado em 'contar páginas.py' e 'convertepdf.py'.
+    """
+
+    nome = 'pymupdf'
+    versao = pymupdf.VersionBind if PYMUPDF_DISPONIVEL else None
+
+    def paginas(self, caminho_pdf):
+        with pymupdf.open(caminho_pdf) as documento:
+            for pagina in documento:
+                try:
+                    yield pagina.get_text("text")
+                except Exception as e:
+                    yield e
+
+
+EXTRATORES = {classe.nome: classe for classe in (ExtratorPyPDF2, ExtratorPyMuPDF)}
+_DISPONIVEIS = {'pypdf2': PYPDF2_DISPONIVEL, 'pymupdf': PYMUPDF_DISPONIVEL}
+
+
+def obter_extrator(backend=None) -> ExtratorPDF:
+    """
+    Instância do backend pedido ('pypdf2' ou 'pymupdf'; None: BACKEND_PADRAO).
+
+    Raises:
+        ValueError: Se o backend não existir ou a biblioteca dele não estiver instalada.
+    """
+    backend = (backend or BACKEND_PADRAO).lower()
+    if backend not in EXTRATORES:
+        raise ValueError(f"Backend de PDF desconhecido: '{backend}'. Opções: {sorted(EXTRATORES)}")
+    if not _DISPONIVEIS[backend]:
+        raise ValueError(f"O backend '{backend}' não está instalado.")
+    return EXTRATORES[backend]()
+
+
+# ==============================================================================
+# 3. EXTRAÇÃO DE UM ARQUIVO
+# ==============================================================================
+
+def _resolver_cache(cache, pasta):
+    # None: cache padrão da pasta (se USAR_CACHE); False: sem cache; senão, o CacheTextosPDF informado.
+    if cache is None:
+        return cache_da_pasta(pasta) if USAR_CACHE else None
+    return cache or None
+
+
+def extrair_texto(caminho_pdf, backend=None, cache=None):
+    """
+    Extrai o texto de todas as páginas de um PDF com o backend escolhido.
+
+    O resultado é procurado antes no cache pelo SHA-256 do arquivo e pela configuração do backend;
+    só é extraído (e gravado no cache) se esse conteúdo ainda não foi visto.
+
+    Args:
+        caminho_pdf (str | Path): Arquivo PDF.
+        backend (str, opcional): 'pypdf2' ou 'pymupdf'. Padrão: BACKEND_PADRAO.
+        cache (CacheTextosPDF | bool, opcional): Cache a consultar; False desliga. Padrão: o da pasta do PDF.
+
+    Returns:
+        tuple: (texto, quantidade de páginas, lista de mensagens de erro por página)
+
+    Raises:
+        Exception: Se o arquivo não puder ser aberto como PDF.
+    """
+    extrator = obter_extrator(backend)
+    cache = _resolver_cache(cache, os.path.dirname(os.path.abspath(caminho_pdf)))
+    if cache is None:
+        return extrator.extrair(caminho_pdf)
+    sha256 = cache.hash_do_arquivo(caminho_pdf)
+    resultado = cache.obter(sha256, extrator.configuracao())
+    if resultado is None:
+        resultado = extrator.extrair(caminho_pdf)
+        cache.gravar(sha256, extrator.configuracao(), *resultado)
+    return resultado
+
+
+def _extrair_arquivo(caminho_pdf, backend=None):
+    """
+    Tarefa de cada processo: nunca levanta exceção, para um PDF corrompido não derrubar o lote.
+
+    Returns:
+        tuple: (nome do arquivo, texto ou None, quantidade de páginas, lista de erros)
+    """
+    nome = os.path.basename(caminho_pdf)
+    try:
+        texto, paginas, erros = extrair_texto(caminho_pdf, backend, cache=False) # O cache fica no processo principal
+        return nome, texto, paginas, erros
+    except Exception as e:
+        return nome, None, 0, [str(e)]
+
+
+# ==============================================================================
+# 4. EXTRAÇÃO DE UMA PASTA
+# ==============================================================================
+
+def listar_pdfs(pasta) -> list:
+    """
+    Caminhos dos arquivos .pdf da pasta (sem subpastas), em ordem alfabética.
+    """
+    with os.scandir(pasta) as entradas:
+        return sorted(e.path for e in entradas if e.is_file() and e.name.lower().endswith(".pdf"))
+
+
+def extrair_pasta(pasta_ou_arquivos, max_processos=MAX_PROCESSOS, backend=None, cache=None):
+    """
+    Extrai o texto de vários PDFs em paralelo, entregando cada resultado assim que fica pronto.
+
+    Os PDFs já presentes no cache são entregues sem extração; os demais são agrupados pelo
+    SHA-256, de modo que cópias do mesmo arquivo com nomes diferentes são extraídas uma única
+    vez. Os arquivos são distribuídos entre os processos um a um, de modo que um PDF muito
+    grande não segura os demais; a ordem de saída é a de conclusão, e a classificação pode
+    começar enquanto a extração ainda está em andamento.
+
+    Args:
+        pasta_ou_arquivos (str | Path | list): Pasta com os PDFs ou lista de caminhos.
+        max_processos (int, opcional): Limite de processos; 1 extrai tudo no processo atual.
+        backend (str, opcional): 'pypdf2' ou 'pymupdf'. Padrão: BACKEND_PADRAO.
+        cache (CacheTextosPDF | bool, opcional): Cache a consultar; False desliga. Padrão: o da
+            pasta (ou, para uma lista, o da pasta do primeiro arquivo).
+
+    Yields:
+        tuple: (nome do arquivo, texto ou None se o arquivo não abriu, quantidade de páginas, lista de erros)
+    """
+    if isinstance(pasta_ou_arquivos, (str, os.PathLike)):
+        arquivos = listar_pdfs(pasta_ou_arquivos)
+        pasta = pasta_ou_arquivos
+    else:
+        arquivos = list(pasta_ou_arquivos)
+        pasta = os.path.dirname(os.path.abspath(arquivos[0])) if arquivos else None
+    extrator = obter_extrator(backend) # Valida antes de iniciar os processos
+    backend, configuracao = extrator.nome, extrator.configuracao()
+    cache = _resolver_cache(cache, pasta) if pasta is not None else None
+
+    # Conteúdo a extrair (SHA-256, ou o próprio caminho sem cache) -> caminhos com esse conteúdo.
+    pendentes = {}
+    prontos = []
+    if cache is None:
+        pendentes = {caminho: [caminho] for caminho in arquivos}
+    else:
+        for caminho in arquivos:
+            try:
+                sha256 = cache.hash_do_arquivo(caminho)
+            except OSError as e:
+                prontos.append((os.path.basename(caminho), None, 0, [str(e)]))
+                continue
+            resultado = cache.obter(sha256, configuracao)
+            if resultado is not None:
+                prontos.append((os.path.basename(caminho), *resultado))
+            else:
+                pendentes.setdefault(sha256, []).append(caminho)
+        cache.confirmar() # Registra os hashes calculados
+        logging.info(f"{len(prontos)} PDFs já estavam no cache; "
+                     f"{sum(len(c) for c in pendentes.values())} a extrair ({len(pendentes)} conteúdos distintos).")
+
+    processos = min(len(pendentes), max_processos or os.cpu_count() or 1)
+    logging.info(f"Extraindo texto de {len(pendentes)} PDFs com {processos} processo(s) ({backend}).")
+    gravados = 0
+
+    def entregar(chave, resultado):
+        nonlocal gravados
+        _, texto, paginas, erros = resultado
+        if cache is not None and texto is not None:
+            cache.gravar(chave, configuracao, texto, paginas, erros, confirmar=False)
+            gravados += 1
+            if gravados % CONFIRMAR_A_CADA == 0:
+                cache.confirmar()
+        for caminho in pendentes[chave]:
+            yield os.path.basename(caminho), texto, paginas, erros
+
+    try:
+        if processos <= 1:
+            yield from prontos
+            for chave, caminhos in pendentes.items():
+                yield from entregar(chave, _extrair_arquivo(caminhos[0], backend))
+            return
+
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            futuros = {executor.submit(_extrair_arquivo, caminhos[0], backend): chave
+                       for chave, caminhos in pendentes.items()}
+            try:
+                yield from prontos # Entregues enquanto os processos já extraem os demais
+                for futuro in as_completed(futuros):
+                    yield from entregar(futuros[futuro], futuro.result())
+            finally:
+                # Se o consumidor parar antes do fim, os arquivos ainda não iniciados são descartados.
+                for futuro in futuros:
+                    futuro.cancel()
+    finally:
+        if cache is not None:
+            cache.confirmar()
@@ -0,0 +1,188 @@
+import hashlib
+import logging
+from pathlib import Path
+
+from docx import Document
+
+from cache_planilha import calcular_hash_arquivo
+from partes_docx import gravar_parte_json, ler_parte_json
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+# Namespace da parte XML personalizada onde os hashes ficam guardados dentro do .docx.
+NS_HASHES = "urn:consulta-7217:hashes-celulas"
+VERSAO_HASHES = 1
+
+# Incrementar quando o XML gerado pelo renderizador mudar, para forçar a regravação de todas as células.
+VERSAO_RENDERIZACAO = 1
+
+# Separadores que não aparecem nos textos da planilha.
+_SEP_CAMPO = "\x1f"
+_SEP_CONTRIBUICAO = "\x1e"
+
+
+def hash_contribuicoes(contribuicoes, perfil) -> str:
+    """
+    Hash do conjunto de contribuições de um item com a formatação usada para renderizá-lo.
+
+    Args:
+        contribuicoes (iterable): Dicts com 'numero', 'Titulo da Contribuição', 'texto' e 'nome'.
+        perfil (dict): Configuração do renderizador (ex.: ESTILOS_CONTRIBUICAO).
+
+    Returns:
+        str: Resumo hexadecimal de 32 caracteres.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{VERSAO_RENDERIZACAO}{_SEP_CAMPO}{sorted(perfil.items())}".encode("utf-8"))
+    for contrib in contribuicoes:
+        h.update(_SEP_CONTRIBUICAO.encode("utf-8"))
+        h.update(_SEP_CAMPO.join(
+            str(contrib[campo]) for campo in ('numero', 'Titulo da Contribuição', 'texto', 'nome')
+        ).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _base_incremental(ingestao, perfil) -> str:
+    # Ingestão da planilha e formatação com que os hashes de uma coluna foram calculados.
+    return hash_contribuicoes([], {**perfil, 'ingestao': ingestao})
+
+
+# ==============================================================================
+# 2. HASHES GRAVADOS NO DOCUMENTO
+# ==============================================================================
+
+class HashesCelulas:
+    """
+    Hash do conteúdo de cada célula preenchida, por coluna e item, guardado no próprio .docx.
+
+    Numa nova execução sobre o documento já preenchido, só as células cujo hash mudou são
+    limpas e reescritas; as demais são mantidas como estão. O SHA-256 do modelo de onde o
+    documento saiu também é guardado, para que uma alteração no modelo refaça tudo a partir dele
+    (ver abrir_documento_incremental), assim como a ingestão da planilha (reingestao_incremental)
+    em que os hashes de cada coluna foram calculados.
+    """
+
+    def __init__(self, hashes=None, hash_modelo=None, bases=None):
+        self.hashes = hashes or {} # "coluna:item" -> hash
+        self.hash_modelo = hash_modelo
+        self.bases = bases or {} # "coluna" -> _base_incremental da última gravação
+
+    @classmethod
+    def do_documento(cls, documento):
+        """
+        Hashes gravados numa execução anterior (vazio se o documento nunca foi preenchido).
+        """
+        conteudo = ler_parte_json(documento, NS_HASHES, "hashesCelulas", VERSAO_HASHES)
+        if conteudo is None:
+            return cls()
+        hashes = cls(conteudo["celulas"], conteudo.get("modelo"), conteudo.get("bases"))
+        logging.info(f"Hashes de células no documento: {len(hashes.hashes)}.")
+        return hashes
+
+    def salvar_no_documento(self, documento) -> None:
+        gravar_parte_json(documento, NS_HASHES, "hashesCelulas", {
+            "versao": VERSAO_HASHES, "modelo": self.hash_modelo, "bases": self.bases, "celulas": self.hashes,
+        })
+
+    @staticmethod
+    def _chave(coluna, item) -> str:
+        return f"{coluna}:{item}"
+
+    def separar(self, linhas, contrib_por_item, perfil, coluna=2, mudancas=None):
+        """
+        Separa as linhas do documento conforme o estado das células da coluna indicada.
+
+        Args:
+            linhas (iterable): LinhaWord na ordem do documento (ex.: IndiceLinhasWord.todas).
+            contrib_por_item: Item -> contribuições (ArmazemContribuicoes ou dict de listas).
+            perfil (dict): Configuração do renderizador, que também entra no hash.
+            coluna (int): Coluna da grade preenchida com as contribuições.
+            mudancas (Mudancas, opcional): Resultado de reingestao_incremental.reingerir_planilha. Se
+                a coluna foi preenchida a partir da ingestão anterior a ela, com o mesmo perfil, só os
+                itens em mudancas.itens_sujos têm o hash recalculado; os demais mantêm o gravado.
+
+        Returns:
+            tuple: (linhas a reescrever, linhas mantidas, linhas a limpar). As últimas são as de
+            itens preenchidos numa execução anterior que não têm mais contribuições.
+        """
+        reescrever, mantidas, limpar = [], [], []
+        prefixo = self._chave(coluna, "")
+        anteriores = {chave: valor for chave, valor in self.hashes.items() if chave.startswith(prefixo)}
+
+        # Os itens sujos só valem se o documento reflete exatamente a ingestão anterior; senão
+        # (outra planilha, execução interrompida, outro perfil), todos os hashes são recalculados.
+        base_anterior = self.bases.pop(str(coluna), None)
+        sujos = None
+        if mudancas is not None and mudancas.ingestao_atual is not None:
+            if mudancas.ingestao_anterior is not None and base_anterior == _base_incremental(mudancas.ingestao_anterior, perfil):
+                sujos = mudancas.itens_sujos
+            self.bases[str(coluna)] = _base_incremental(mudancas.ingestao_atual, perfil)
+
+        novos = {}
+        reaproveitados = 0
+        for linha in linhas:
+            if len(linha) <= coluna or linha.item is None:
+                continue
+            chave = self._chave(coluna, linha.item)
+            if linha.item in contrib_por_item:
+                if chave not in novos:
+                    if sujos is not None and linha.item not in sujos and chave in anteriores:
+                        novos[chave] = anteriores[chave]
+                        reaproveitados += 1
+                    else:
+                        novos[chave] = hash_contribuicoes(contrib_por_item[linha.item], perfil)
+                if anteriores.get(chave) == novos[chave]:
+                    mantidas.append(linha)
+                else:
+                    reescrever.append(linha)
+            elif chave in anteriores:
+                limpar.append(linha)
+
+        # Os hashes da coluna passam a refletir só o que ficará no documento depois do preenchimento.
+        for chave in anteriores:
+            del self.hashes[chave]
+        self.hashes.update(novos)
+
+        logging.info(
+            f"Atualização incremental: {len(reescrever)} células a reescrever, "
+            f"{len(mantidas)} sem alteração, {len(limpar)} a limpar."
+        )
+        if sujos is not None:
+            logging.info(f"Reingestão: {reaproveitados} itens sem contribuições alteradas mantiveram o hash sem recalculá-lo.")
+        if mantidas:
+            logging.info(f"Itens mantidos sem alteração: {sorted({linha.item for linha in mantidas})}")
+        return reescrever, mantidas, limpar
+
+
+# ==============================================================================
+# 3. ESCOLHA DO DOCUMENTO DE PARTIDA
+# ==============================================================================
+
+def abrir_documento_incremental(caminho_modelo, caminho_saida=None):
+    """
+    Abre o Word de saída de uma execução anterior, se ele ainda corresponder ao modelo; senão, o modelo.
+
+    O documento de saída só é reaproveitado se o SHA-256 do modelo gravado nele for igual ao do
+    modelo atual. Se o modelo foi alterado (ou a saída é de uma versão sem esse registro), o
+    preenchimento recomeça do modelo, com os hashes de células vazios.
+
+    Args:
+        caminho_modelo (str | Path): Modelo (ex.: saida.docx).
+        caminho_saida (str | Path, opcional): Word gerado antes; None sempre parte do modelo.
+
+    Returns:
+        tuple: (Document aberto, HashesCelulas, caminho do arquivo aberto)
+
+    Raises:
+        FileNotFoundError: Se o modelo não existir.
+    """
+    hash_modelo = calcular_hash_arquivo(caminho_modelo)
+    if caminho_saida is not None and Path(caminho_saida).exists():
+        documento = Document(caminho_saida)
+        hashes = HashesCelulas.do_documento(documento)
+        if hashes.hash_modelo == hash_modelo:
+            return documento, hashes, caminho_saida
+        logging.info(f"O modelo '{caminho_modelo}' mudou desde a geração de '{caminho_saida}'; refazendo a partir do modelo.")
+    return Document(caminho_modelo), HashesCelulas(hash_modelo=hash_modelo), caminho_modelo
@@ -1,14 +1,16 @@
-import pandas as pd
 import logging
-from docx import Document
-from docx.shared import Pt
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
 from pathlib import Path
-from collections import defaultdict
 import re
 
+from armazem_contribuicoes import ArmazemContribuicoes
+from leitor_contribuicoes import ler_contribuicoes
+from renderizador_celulas import renderizador_do_documento, limpar_tc
+from indice_linhas_word import IndiceLinhasWord
+from renderizacao_paralela import preencher_em_paralelo
+from hashes_celulas import abrir_documento_incremental
+from reingestao_incremental import ColetorContribuicoes, reingerir_planilha
+
 # ==============================================================================
 # 1. CONFIGURAÇÃO INICIAL
 # ==============================================================================
@@ -45,41 +47,31 @@ ESTILOS_CONTRIBUICAO = {
     'cor': 'auto', # 'auto' para cor padrão, ou um código de cor (ex: '0000FF' para azul)
 }
 
+# Renderização das células em vários processos. O documento gerado é idêntico ao da execução em série.
+# - PROCESSOS_RENDERIZACAO: 1 mantém o preenchimento em série (com o log linha a linha); None usa um processo por CPU.
+# - FATIAS_RENDERIZACAO: None divide os itens pelo volume de contribuições; 'titulo' faz uma fatia por TÍTULO do
+#   decreto; ou uma lista de faixas de itens, por exemplo [range(0, 1), range(53, 1000)] para separar o item 0
+#   dos itens maiores que 52, como o filtro acima.
+PROCESSOS_RENDERIZACAO = 1
+FATIAS_RENDERIZACAO = None
+
+# Atualização incremental: se o Word de saída já existir e tiver sido gerado a partir do modelo atual (o SHA-256
+# do modelo fica gravado nele), ele é reaberto no lugar do modelo e só as células cujas contribuições (ou estilos)
+# mudaram são reescritas. Se o saida.docx for alterado, tudo é refeito a partir dele. False sempre parte do modelo.
+ATUALIZACAO_INCREMENTAL = True
+
 
 # ==============================================================================
 # 2. FUNÇÕES AUXILIARES
 # ==============================================================================
 
-def adicionar_linha_separadora(paragraph):
-    """
-    Adiciona uma borda inferior a um parágrafo no documento Word, criando uma linha separadora visual.
-    """
-    p_pr = paragraph._p.get_or_add_pPr() # Obtém ou adiciona propriedades de parágrafo
-    p_bdr = OxmlElement('w:pBdr') # Cria um elemento XML para bordas de parágrafo
-    p_pr.append(p_bdr) # Adiciona o elemento de borda às propriedades do parágrafo
-    
-    bottom_border = OxmlElement('w:bottom') # Cria um elemento XML para a borda inferior
-    bottom_border.set(qn('w:val'), 'single') # Estilo da linha: 'single' (linha única)
-    bottom_border.set(qn('w:sz'), '6') # Tamanho da linha (em oitavos de ponto, 6 = 0.75pt)
-    bottom_border.set(qn('w:space'), '1') # Espaço entre a linha e o texto
-    bottom_border.set(qn('w:color'), 'auto') # Cor da linha (automática)
-    
-    p_bdr.append(bottom_border) # Adiciona a borda inferior ao elemento de bordas do parágrafo
-    logging.debug("Linha separadora adicionada.")
-
 def clear_cell(cell):
     """
-    Remove todo o conteúdo de uma célula do Word (parágrafos e tabelas aninhadas).
+    Remove todo o conteúdo de uma célula do Word (parágrafos e tabelas aninhadas) numa única operação.
     """
-    for paragraph in cell.paragraphs:
-        p_element = paragraph._element
-        p_element.getparent().remove(p_element)
-    for table in cell.tables:
-        t_element = table._element
-        t_element.getparent().remove(t_element)
-    # Adiciona um parágrafo vazio para garantir que a célula não fique completamente vazia
+    # Deixa um parágrafo vazio para garantir que a célula não fique completamente vazia
     # o que pode causar problemas de layout em algumas versões do Word
-    cell.add_paragraph()
+    limpar_tc(cell, remover_tabelas=True, paragrafo_vazio=True)
     logging.debug("Conteúdo da célula limpo.")
 
 def formatar_celula_com_contribuicoes(celula, contribuicoes: list, estilos: dict):
@@ -87,6 +79,10 @@ def formatar_celula_com_contribuicoes(celula, contribuicoes: list, estilos: dict
     Preenche uma célula do documento Word com uma lista de contribuições, formatando cada uma
     e adicionando linhas separadoras entre elas, usando um dicionário de estilos.
 
+    Os parágrafos (número em negrito, título, texto, autor em itálico e separador) são montados
+    direto em XML, com um único parse por célula, e só referenciam estilos de parágrafo
+    registrados uma vez no documento (ver estilos_documento), sem formatação run a run.
+
     Args:
         celula: O objeto Cell do python-docx a ser preenchido.
         contribuicoes (list): Lista de dicionários, onde cada dicionário representa uma contribuição
@@ -95,47 +91,12 @@ def formatar_celula_com_contribuicoes(celula, contribuicoes: list, estilos: dict
     """
     fonte = estilos.get('fonte', 'Calibri')
     tamanho = estilos.get('tamanho', 8)
-    # cor = estilos.get('cor', '000000') # Para uso futuro se precisar de cor de fonte específica
+    cor = estilos.get('cor', 'auto')
 
     # Limpa o conteúdo existente da célula antes de adicionar o novo
     clear_cell(celula)
-    
-    for idx, contrib in enumerate(contribuicoes):
-        # Adicionar número da contribuição
-        p_num = celula.add_paragraph() # Cria um novo parágrafo na célula
-        run_num = p_num.add_run(contrib['numero']) # Adiciona o número da contribuição
-        run_num.font.name = fonte
-        run_num.font.size = Pt(tamanho)
-        run_num.bold = True # Número em negrito
-        logging.debug(f"   Adicionado número da contribuição: {contrib['numero']}")
-        
-        # Adicionar Titulo da Contribuição 
-        p_titulo = celula.add_paragraph()
-        run_titulo = p_titulo.add_run(contrib['Titulo da Contribuição'])
-        run_titulo.font.name = fonte
-        run_titulo.font.size = Pt(tamanho)
-        logging.debug(f"   Adicionado título da contribuição: {contrib['Titulo da Contribuição']}")
-        
-        # Adicionar texto da contribuição
-        p_texto = celula.add_paragraph(contrib['texto'])
-        for run in p_texto.runs: # Itera sobre os runs do parágrafo para aplicar a formatação
-            run.font.name = fonte
-            run.font.size = Pt(tamanho)
-        logging.debug(f"   Adicionado texto da contribuição (início): {contrib['texto'][:50]}...")
-        
-        # Adicionar nome do autor
-        p_autor = celula.add_paragraph()
-        run_autor = p_autor.add_run(f"({contrib['nome']})")
-        run_autor.font.name = fonte
-        run_autor.font.size = Pt(tamanho)
-        run_autor.italic = True # Nome do autor em itálico
-        logging.debug(f"   Adicionado nome do autor: {contrib['nome']}")
-        
-        # Adicionar linha separadora (exceto após a última contribuição)
-        if idx < len(contribuicoes) - 1:
-            p_separador = celula.add_paragraph()
-            adicionar_linha_separadora(p_separador)
-            logging.debug("   Adicionada linha separadora entre contribuições.")
+    # Os estilos são registrados uma vez no documento; os parágrafos só os referenciam pelo id.
+    renderizador_do_documento(celula, fonte, tamanho, cor).preencher(celula, contribuicoes)
     logging.debug("Célula formatada com todas as contribuições.")
 
 def validar_item(item: str) -> int:
@@ -167,17 +128,44 @@ def main() -> None:
     """
     logging.info(f"Iniciando processamento. Caminho do Excel: {ARQUIVO_EXCEL}")
     
-    # --- Leitura e preparação dos dados do Excel ---
+    # --- FILTRAGEM DE ACORDO COM A NOVA CONFIGURAÇÃO ---
+    # A configuração vira uma função aplicada a cada número de item durante a leitura.
+    if FILTRO_ITEM_EXCEL == 'all':
+        filtro_item = None
+        logging.info("Configurado para processar TODOS os itens válidos.")
+    elif FILTRO_ITEM_EXCEL == 'zero_and_greater_than_52':
+        # Filtra o item 0 OU itens maiores que VALOR_REFERENCIA_FILTRO
+        filtro_item = lambda item: item == 0 or item > VALOR_REFERENCIA_FILTRO
+        logging.info(f"Configurado para processar item 0 E itens maiores que {VALOR_REFERENCIA_FILTRO}.")
+    elif isinstance(FILTRO_ITEM_EXCEL, list):
+        # Filtra por uma lista específica de itens
+        itens_escolhidos = set(FILTRO_ITEM_EXCEL)
+        filtro_item = lambda item: item in itens_escolhidos
+        logging.info(f"Configurado para processar itens específicos: {FILTRO_ITEM_EXCEL}.")
+    else:
+        logging.warning(f"Configuração de FILTRO_ITEM_EXCEL inválida: '{FILTRO_ITEM_EXCEL}'. Nenhum item será processado.")
+        return # Encerra a execução se a configuração for inválida
+
+    # --- Leitura, normalização e agrupamento das contribuições ---
+    # A planilha é lida em fluxo (openpyxl read_only), já com o filtro de item e só com as colunas
+    # usadas: as linhas de itens descartados nunca chegam a virar objetos Python. Cada contribuição
+    # passa direto para o armazém compacto (textos em buffers contíguos, cada item como uma fatia
+    # sem cópia das contribuições ordenadas), de modo que a memória não cresce com uma planilha
+    # inteira em DataFrame. "12, 13" conta para os dois itens e campos vazios recebem os valores padrão.
+    # Na mesma leitura, o coletor resume todas as contribuições (antes do filtro e com a Justificativa,
+    # se houver) para a comparação com a ingestão anterior da planilha.
+    coletor = ColetorContribuicoes()
     try:
-        # Lê o arquivo Excel, especificando o motor, tipo de dados e colunas a serem usadas
-        df = pd.read_excel(
-            ARQUIVO_EXCEL,
-            engine="openpyxl",
-            dtype=str, # Lê todas as colunas como string para evitar problemas de tipo
-            usecols=['Item CP alterado', 'Numero', 'Titulo da Contribuição ', 'Texto', 'Nome']
-        )
-        logging.info(f"Excel lido com sucesso. Colunas: {df.columns.tolist()}")
-        logging.debug(f"DataFrame lido (primeiras 5 linhas):\n{df.head().to_string()}")
+        contrib_por_item = ArmazemContribuicoes.de_registros(coletor.acompanhar(
+            ler_contribuicoes(
+                ARQUIVO_EXCEL,
+                colunas=['Item CP alterado', 'Numero', 'Titulo da Contribuição', 'Texto', 'Nome'],
+                opcionais=['Justificativa'],
+            ),
+            filtro_item=filtro_item,
+            campos=('numero', 'Titulo da Contribuição', 'texto', 'nome'),
+        ))
+        logging.info("Excel lido com sucesso.")
     except FileNotFoundError:
         logging.error(f"Erro: Arquivo Excel não encontrado em '{ARQUIVO_EXCEL}'. Verifique o caminho.")
         return
@@ -188,70 +176,30 @@ def main() -> None:
         logging.exception(f"Falha inesperada na leitura do Excel: {e}")
         return
 
-    # --- Pré-processamento de dados do DataFrame ---
-    for col in df.columns:
-        if df[col].dtype == 'object':
-            df[col] = df[col].astype(str).str.replace('_x000D_', '\n', regex=False)
-    df.columns = df.columns.str.strip()
-    logging.info("Pré-processamento de colunas e dados do Excel concluído.")
-    logging.debug(f"DataFrame após pré-processamento (primeiras 5 linhas):\n{df.head().to_string()}")
-    
-    # --- Filtragem e validação de itens ---
-    df['Item_validado'] = df['Item CP alterado'].apply(validar_item)
-    logging.info("Coluna 'Item_validado' criada.")
-    
-    df = df.dropna(subset=['Item_validado'])
-    logging.info(f"Removidas linhas com 'Item_validado' inválido. Restam {len(df)} linhas.")
-
-    df['Item_validado'] = df['Item_validado'].astype(int)
-    logging.info("Coluna 'Item_validado' convertida para inteiro.")
+    logging.info(f"Normalização e filtragem concluídas. Total: {contrib_por_item.total_pares} linhas.")
 
-    # --- FILTRAGEM DE ACORDO COM A NOVA CONFIGURAÇÃO ---
-    df_para_processar = pd.DataFrame() # Inicializa um DataFrame vazio para os dados filtrados
-
-    if FILTRO_ITEM_EXCEL == 'all':
-        df_para_processar = df.copy()
-        logging.info(f"Configurado para processar TODOS os itens válidos. Total: {len(df_para_processar)} linhas.")
-    elif FILTRO_ITEM_EXCEL == 'zero_and_greater_than_52':
-        # Filtra o item 0 OU itens maiores que VALOR_REFERENCIA_FILTRO
-        df_para_processar = df[(df['Item_validado'] == 0) | (df['Item_validado'] > VALOR_REFERENCIA_FILTRO)].copy()
-        logging.info(f"Configurado para processar item 0 E itens maiores que {VALOR_REFERENCIA_FILTRO}. Total: {len(df_para_processar)} linhas.")
-    elif isinstance(FILTRO_ITEM_EXCEL, list):
-        # Filtra por uma lista específica de itens
-        df_para_processar = df[df['Item_validado'].isin(FILTRO_ITEM_EXCEL)].copy()
-        logging.info(f"Configurado para processar itens específicos: {FILTRO_ITEM_EXCEL}. Total: {len(df_para_processar)} linhas.")
-    else:
-        logging.warning(f"Configuração de FILTRO_ITEM_EXCEL inválida: '{FILTRO_ITEM_EXCEL}'. Nenhum item será processado.")
-        return # Encerra a execução se a configuração for inválida
+    # Contribuições adicionadas, removidas, editadas ou movidas de item desde a última ingestão.
+    # Sem esse registro, os hashes de todas as células são recalculados.
+    try:
+        mudancas, _ = reingerir_planilha(ARQUIVO_EXCEL, contribuicoes=coletor.contribuicoes())
+    except Exception as e:
+        logging.warning(f"Falha ao registrar a ingestão da planilha ({e}); todos os hashes de células serão recalculados.")
+        mudancas = None
 
-    if df_para_processar.empty:
+    if len(contrib_por_item) == 0:
         logging.warning("Nenhum dado encontrado para processamento após a filtragem! Verifique o Excel ou as configurações de filtro.")
         return # Encerra a execução se não houver dados para o filtro
-
-    # A partir daqui, usaremos o DataFrame filtrado conforme a configuração
-    df = df_para_processar
-
-    # --- Agrupamento de contribuições em formato estruturado ---
-    contrib_por_item = defaultdict(list)
-    df = df.sort_values(by=["Item_validado", "Numero"])
-    
-    for _, row in df.iterrows():
-        item = row['Item_validado']
-        contrib = {
-            'numero': f"{row['Numero']}" if pd.notna(row['Numero']) else "[sem número]",
-            'Titulo da Contribuição': row['Titulo da Contribuição'] if pd.notna(row['Titulo da Contribuição']) else "[sem Titulo da Contribuição]",
-            'texto': row['Texto'] if pd.notna(row['Texto']) else "[sem texto]",
-            'nome': row['Nome'] if pd.notna(row['Nome']) else "[autor desconhecido]"
-        }
-        contrib_por_item[item].append(contrib)
     
     logging.info(f"Contribuições agrupadas para {len(contrib_por_item)} itens únicos encontrados no Excel (após filtro).")
-    logging.debug(f"Itens agrupados: {list(contrib_por_item.keys())}") # Exibe os itens que foram agrupados
+    logging.debug(f"Itens agrupados: {contrib_por_item.itens()}") # Exibe os itens que foram agrupados
 
     # --- Processamento do documento Word ---
+    # Reaproveita as células que não mudaram desde a última execução, se a saída veio do modelo atual.
     try:
-        doc = Document(ARQUIVO_WORD_ENTRADA)
-        logging.info(f"Documento Word de entrada '{ARQUIVO_WORD_ENTRADA}' aberto com sucesso.")
+        doc, hashes_celulas, arquivo_word_base = abrir_documento_incremental(
+            ARQUIVO_WORD_ENTRADA, ARQUIVO_WORD_SAIDA if ATUALIZACAO_INCREMENTAL else None
+        )
+        logging.info(f"Documento Word de entrada '{arquivo_word_base}' aberto com sucesso.")
     except FileNotFoundError:
         logging.error(f"Erro: Arquivo Word não encontrado em '{ARQUIVO_WORD_ENTRADA}'. Verifique o caminho.")
         return
@@ -261,24 +209,49 @@ def main() -> None:
 
     itens_atualizados = 0
     
-    # Itera sobre todas as tabelas e linhas do documento Word
-    for idx_tabela, tabela in enumerate(doc.tables):
-        logging.info(f"Processando Tabela {idx_tabela + 1} no Word...")
-        for idx_linha, linha in enumerate(tabela.rows):
-            if len(linha.cells) < 3:
+    # Índice das linhas das tabelas, montado numa única varredura do XML, em vez de
+    # linha.cells a cada acesso.
+    indice_linhas = IndiceLinhasWord.de_documento(doc, chave=validar_item)
+
+    # Compara o hash das contribuições de cada item com o gravado quando a célula foi preenchida:
+    # células iguais são mantidas e as de itens que deixaram de ter contribuições são esvaziadas.
+    # Só os itens sujos da reingestão têm o hash recalculado.
+    linhas_alteradas, linhas_mantidas, linhas_removidas = hashes_celulas.separar(
+        indice_linhas.todas, contrib_por_item, ESTILOS_CONTRIBUICAO, mudancas=mudancas
+    )
+    linhas_mantidas = set(linhas_mantidas)
+    for linha in linhas_removidas:
+        clear_cell(linha.celula(2))
+
+    if PROCESSOS_RENDERIZACAO != 1:
+        # O XML das células é gerado em paralelo, por fatias de itens, e juntado aqui na ordem das linhas.
+        itens_atualizados = preencher_em_paralelo(
+            doc, linhas_alteradas, contrib_por_item,
+            fonte=ESTILOS_CONTRIBUICAO.get('fonte', 'Calibri'),
+            tamanho=ESTILOS_CONTRIBUICAO.get('tamanho', 8),
+            cor=ESTILOS_CONTRIBUICAO.get('cor', 'auto'),
+            fatias=FATIAS_RENDERIZACAO,
+            max_processos=PROCESSOS_RENDERIZACAO,
+            limpar=clear_cell,
+        )
+    else:
+        for linha in indice_linhas.todas:
+            idx_tabela, idx_linha = linha.indice_tabela, linha.indice_linha
+            if len(linha) < 3:
                 logging.debug(f"   Linha {idx_linha + 1} da Tabela {idx_tabela + 1}: Ignorada (menos de 3 células).")
                 continue
-            
-            celula_item = linha.cells[0]
-            item_cp_text = celula_item.text.strip()
-            item_cp = validar_item(item_cp_text)
-            
+
+            item_cp_text = linha.texto_item.strip()
+            item_cp = linha.item
+
             logging.info(f"   Linha {idx_linha + 1} da Tabela {idx_tabela + 1}: Texto da célula de item '{item_cp_text}' -> Validado como: {item_cp}")
-            
-            if item_cp is not None and item_cp in contrib_por_item:
+
+            if linha in linhas_mantidas:
+                logging.info(f"     Item {item_cp} sem alteração desde a última execução (mesmo hash). Célula mantida.")
+            elif item_cp is not None and item_cp in contrib_por_item:
                 logging.info(f"     *** Item {item_cp} encontrado no Word e com contribuições no Excel. ATUALIZANDO CÉLULA... ***")
                 formatar_celula_com_contribuicoes(
-                    linha.cells[2], # A célula a ser preenchida (terceira coluna)
+                    linha.celula(2), # A célula a ser preenchida (terceira coluna)
                     contrib_por_item[item_cp], # As contribuições agrupadas para este item
                     estilos=ESTILOS_CONTRIBUICAO # Passa o dicionário de estilos
                 )
@@ -288,9 +261,10 @@ def main() -> None:
 
     # --- Salvamento do documento Word ---
     try:
+        hashes_celulas.salvar_no_documento(doc)
         doc.save(ARQUIVO_WORD_SAIDA)
         logging.info(f"Documento Word salvo com sucesso: {ARQUIVO_WORD_SAIDA}")
-        logging.info(f"Total de itens atualizados: {itens_atualizados}")
+        logging.info(f"Total de itens atualizados: {itens_atualizados} (mantidos sem alteração: {len(linhas_mantidas)}, esvaziados: {len(linhas_removidas)})")
     except Exception as e:
         logging.exception(f"Erro ao salvar documento Word: {e}")
 
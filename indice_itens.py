@@ -0,0 +1,105 @@
+import logging
+import re
+from collections import defaultdict
+
+RE_NUMERO_ITEM = re.compile(r'\d+')
+
+
+def extrair_itens(valor) -> list:
+    """
+    Extrai todos os números de item de um valor de 'Item CP alterado'.
+
+    Valores como "12, 13" ou "12 e 13" resultam em [12, 13] (e não em 1213, como acontecia
+    ao remover os não dígitos). Listas já processadas são devolvidas sem duplicatas.
+
+    Returns:
+        list: Números de item na ordem em que aparecem, sem repetição (vazia se não houver).
+    """
+    if valor is None:
+        return []
+    if isinstance(valor, (list, tuple)):
+        numeros = valor
+    elif isinstance(valor, float):
+        if valor != valor: # NaN
+            return []
+        numeros = [int(valor)] if valor.is_integer() else RE_NUMERO_ITEM.findall(str(valor))
+    else:
+        numeros = RE_NUMERO_ITEM.findall(str(valor))
+    return list(dict.fromkeys(int(n) for n in numeros))
+
+
+class ItemIndex:
+    """
+    Índice muitos-para-muitos entre itens do decreto e contribuições.
+
+    Construído uma única vez a partir das linhas da planilha, substitui as varreduras
+    df_agrupado[df_agrupado["Item CP alterado"] == item] feitas para cada linha do Word:
+    item -> contribuições e contribuição -> itens são consultas O(1) em dicionários.
+    """
+
+    def __init__(self):
+        self._por_item = defaultdict(list)
+        self._itens_por_contribuicao = {}
+
+    def adicionar(self, contribuicao, itens, numero=None) -> None:
+        """
+        Registra uma contribuição em cada um dos itens informados.
+        """
+        itens = extrair_itens(itens)
+        for item in itens:
+            self._por_item[item].append(contribuicao)
+        if numero is not None:
+            anteriores = self._itens_por_contribuicao.setdefault(numero, [])
+            anteriores.extend(item for item in itens if item not in anteriores)
+
+    @classmethod
+    def de_registros(cls, registros, coluna_item='Item CP alterado', coluna_numero='Numero', filtro_item=None):
+        """
+        Cria o índice a partir de registros (dicts), por exemplo df.to_dict('records').
+
+        Args:
+            registros (iterable): Contribuições, uma por registro.
+            coluna_item (str): Chave com o(s) item(ns) alterado(s) pela contribuição.
+            coluna_numero (str): Chave com o número da contribuição (ex.: 'CP-930603').
+            filtro_item (callable, opcional): Recebe um número de item e retorna True para indexá-lo.
+        """
+        indice = cls()
+        sem_item = 0
+        for registro in registros:
+            itens = extrair_itens(registro.get(coluna_item))
+            if filtro_item is not None:
+                itens = [item for item in itens if filtro_item(item)]
+            if not itens:
+                sem_item += 1
+                continue
+            indice.adicionar(registro, itens, numero=registro.get(coluna_numero))
+        logging.info(f"Índice de itens criado: {len(indice)} itens, {len(indice._itens_por_contribuicao)} contribuições ({sem_item} registros sem item válido).")
+        return indice
+
+    @classmethod
+    def de_dataframe(cls, df, coluna_item='Item CP alterado', coluna_numero='Numero', filtro_item=None):
+        """
+        Cria o índice a partir de um DataFrame com uma contribuição por linha.
+        """
+        return cls.de_registros(df.to_dict('records'), coluna_item, coluna_numero, filtro_item)
+
+    def contribuicoes(self, item) -> list:
+        """
+        Contribuições do item, na ordem em que foram lidas (lista vazia se não houver).
+        """
+        return self._por_item.get(item, [])
+
+    def itens_da_contribuicao(self, numero) -> list:
+        """
+        Todos os itens tocados pela contribuição informada.
+        """
+        return self._itens_por_contribuicao.get(numero, [])
+
+    def itens(self) -> list:
+        return sorted(self._por_item)
+
+    def __contains__(self, item) -> bool:
+        return item in self._por_item
+
+    def __len__(self) -> int:
+        return len(self._por_item)
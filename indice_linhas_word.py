@@ -0,0 +1,182 @@
+import logging
+import re
+from collections import defaultdict
+
+from docx.oxml.ns import nsmap, qn
+from docx.table import _Cell
+from lxml import etree
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+_W_TC = qn('w:tc')
+_W_TR = qn('w:tr')
+_W_P = qn('w:p')
+_W_T = qn('w:t')
+_W_VAL = qn('w:val')
+_W_TCPR = qn('w:tcPr')
+_W_TRPR = qn('w:trPr')
+_W_GRIDSPAN = qn('w:gridSpan')
+_W_VMERGE = qn('w:vMerge')
+_W_GRIDBEFORE = qn('w:gridBefore')
+
+# Conteúdo dos runs de um parágrafo (o mesmo conjunto que o CT_P.text do python-docx percorre).
+_CONTEUDO_RUNS = etree.XPath(
+    './w:r/*[not(self::w:rPr)] | ./w:hyperlink/w:r/*[not(self::w:rPr)]', namespaces={'w': nsmap['w']}
+)
+
+
+def item_por_digitos(texto):
+    """
+    Chave padrão: todos os dígitos do texto viram o número do item ('Item 12' -> 12), como o validar_item.
+    """
+    digitos = re.sub(r'\D', '', texto)
+    return int(digitos) if digitos else None
+
+
+def item_somente_digitos(texto):
+    """
+    Chave dos preenchedores que só aceitam células com apenas o número ('12', mas não 'Item 12').
+    """
+    texto = texto.strip()
+    return int(texto) if texto.isdigit() else None
+
+
+# ==============================================================================
+# 2. LINHA INDEXADA
+# ==============================================================================
+
+def _texto_paragrafo(p) -> str:
+    conteudo = _CONTEUDO_RUNS(p)
+    if all(filho.tag == _W_T for filho in conteudo):
+        return "".join(filho.text or "" for filho in conteudo)
+    return p.text # Tabulações, quebras etc.: usa a conversão completa do python-docx
+
+
+def texto_tc(tc) -> str:
+    """
+    Texto de uma célula (w:tc), igual ao cell.text do python-docx.
+    """
+    return "\n".join(_texto_paragrafo(p) for p in tc.iterchildren(_W_P))
+
+
+def _valor_inteiro(pai, tag, padrao) -> int:
+    filho = pai.find(tag) if pai is not None else None
+    if filho is None:
+        return padrao
+    return int(filho.get(_W_VAL, padrao))
+
+
+class LinhaWord:
+    """
+    Uma linha de tabela já resolvida: uma célula (w:tc) por coluna da grade, como em row.cells.
+
+    Células mescladas na horizontal aparecem repetidas e as continuações de mescla vertical
+    apontam para a célula de origem, exatamente como o python-docx faz.
+    """
+
+    __slots__ = ('tabela', 'indice_tabela', 'indice_linha', 'tr', 'tcs', 'texto_item', 'item')
+
+    def __init__(self, tabela, indice_tabela, indice_linha, tr, tcs, texto_item, item):
+        self.tabela = tabela
+        self.indice_tabela = indice_tabela
+        self.indice_linha = indice_linha
+        self.tr = tr
+        self.tcs = tcs
+        self.texto_item = texto_item
+        self.item = item
+
+    def celula(self, posicao) -> _Cell:
+        """
+        Cell do python-docx para a coluna da grade indicada (equivale a row.cells[posicao]).
+        """
+        return _Cell(self.tcs[posicao], self.tabela)
+
+    def __len__(self) -> int:
+        return len(self.tcs)
+
+
+def tcs_da_grade(tr, grade_anterior):
+    """
+    Resolve as células de uma linha por coluna da grade, usando a linha anterior para as continuações
+    de mescla vertical (w:vMerge sem w:val="restart").
+
+    Returns:
+        tuple: (lista de tcs na ordem de row.cells, dict coluna da grade -> tc de origem)
+    """
+    coluna = _valor_inteiro(tr.find(_W_TRPR), _W_GRIDBEFORE, 0)
+    tcs = []
+    grade = {}
+    for tc in tr.iterchildren(_W_TC):
+        tc_pr = tc.find(_W_TCPR)
+        vezes = _valor_inteiro(tc_pr, _W_GRIDSPAN, 1)
+        v_merge = tc_pr.find(_W_VMERGE) if tc_pr is not None else None
+        continuacao = v_merge is not None and v_merge.get(_W_VAL, "continue") == "continue"
+        origem = grade_anterior.get(coluna, tc) if continuacao else tc
+        for _ in range(vezes):
+            tcs.append(origem)
+            grade[coluna] = origem
+            coluna += 1
+    return tcs, grade
+
+
+# ==============================================================================
+# 3. ÍNDICE
+# ==============================================================================
+
+class IndiceLinhasWord:
+    """
+    Índice número do item -> linhas das tabelas do Word, montado numa única varredura do XML.
+
+    Substitui os laços 'for tabela in doc.tables: for linha in tabela.rows' com linha.cells[0]
+    e linha.cells[2], que fazem o python-docx reconstruir a grade da linha a cada acesso.
+    """
+
+    def __init__(self, linhas, linhas_por_tabela):
+        self.todas = linhas # Todas as linhas, na ordem do documento
+        self.linhas_por_tabela = linhas_por_tabela # Quantidade de w:tr de cada tabela
+        self._por_item = defaultdict(list)
+        for linha in linhas:
+            if linha.item is not None:
+                self._por_item[linha.item].append(linha)
+
+    @classmethod
+    def de_documento(cls, documento, chave=item_por_digitos, coluna_item=0):
+        """
+        Varre as tabelas do corpo do documento (as mesmas de doc.tables).
+
+        Args:
+            documento: Document do python-docx.
+            chave (callable): Recebe o texto da célula do item e retorna o número do item ou None.
+            coluna_item (int): Coluna da grade com o número do item.
+        """
+        linhas = []
+        linhas_por_tabela = []
+        for indice_tabela, tabela in enumerate(documento.tables):
+            grade = {}
+            indice_linha = -1
+            for indice_linha, tr in enumerate(tabela._tbl.iterchildren(_W_TR)):
+                tcs, grade = tcs_da_grade(tr, grade)
+                texto_item = texto_tc(tcs[coluna_item]) if len(tcs) > coluna_item else ""
+                item = chave(texto_item) if texto_item else None
+                linhas.append(LinhaWord(tabela, indice_tabela, indice_linha, tr, tcs, texto_item, item))
+            linhas_por_tabela.append(indice_linha + 1)
+        indice = cls(linhas, linhas_por_tabela)
+        logging.info(f"Índice de linhas do Word: {len(linhas)} linhas, {len(indice._por_item)} itens.")
+        return indice
+
+    def linhas(self, item) -> list:
+        """
+        Linhas cuja célula de item corresponde ao número informado (lista vazia se não houver).
+        """
+        return self._por_item.get(item, [])
+
+    def itens(self) -> list:
+        return sorted(self._por_item)
+
+    def __contains__(self, item) -> bool:
+        return item in self._por_item
+
+    def __len__(self) -> int:
+        return len(self._por_item)
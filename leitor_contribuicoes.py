@@ -0,0 +1,145 @@
+import logging
+from collections import defaultdict
+
+from openpyxl import load_workbook
+
+from indice_itens import extrair_itens
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+# Colunas lidas da planilha de contribuições (nomes já sem espaços nas pontas).
+COLUNAS_CONTRIBUICAO = [
+    'Item CP alterado',
+    'Numero',
+    'Titulo da Contribuição',
+    'Texto',
+    'Justificativa',
+    'Nome',
+]
+
+# Chave do registro normalizado -> (coluna do Excel, valor padrão quando vazia)
+CAMPOS_REGISTRO = {
+    'numero': ('Numero', "[sem número]"),
+    'Titulo da Contribuição': ('Titulo da Contribuição', "[sem Titulo da Contribuição]"),
+    'texto': ('Texto', "[sem texto]"),
+    'justificativa': ('Justificativa', ""),
+    'nome': ('Nome', "[autor desconhecido]"),
+}
+
+# ==============================================================================
+# 2. FUNÇÕES AUXILIARES
+# ==============================================================================
+
+def texto_da_celula(valor):
+    """
+    Converte o valor bruto de uma célula em texto, como o pd.read_excel(dtype=str) faria.
+    Retorna None para células vazias.
+    """
+    if valor is None:
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    texto = str(valor).replace('_x000D_', '\n')
+    return texto if texto.strip() else None
+
+
+def _localizar_colunas(cabecalho, colunas, opcionais=()):
+    """
+    Mapeia cada coluna pedida para sua posição no cabeçalho (comparando sem espaços nas pontas).
+    As colunas opcionais ausentes do cabeçalho ficam de fora do resultado.
+    """
+    posicoes = {}
+    for idx, nome in enumerate(cabecalho):
+        if nome is not None:
+            posicoes.setdefault(str(nome).strip(), idx)
+    faltantes = [col for col in colunas if col not in posicoes]
+    if faltantes:
+        raise KeyError(", ".join(faltantes))
+    return {col: posicoes[col] for col in [*colunas, *opcionais] if col in posicoes}
+
+
+# ==============================================================================
+# 3. LEITURA EM FLUXO
+# ==============================================================================
+
+def ler_contribuicoes(caminho_excel, filtro_item=None, colunas=None, sheet_name=None, opcionais=()):
+    """
+    Lê a planilha de contribuições linha a linha e produz registros já normalizados.
+
+    A planilha é aberta em modo somente leitura (read_only=True) e nenhuma linha é mantida em
+    memória depois de entregue; o filtro de item e a projeção de colunas são aplicados durante
+    a leitura, então as colunas longas (Texto, Justificativa) de itens descartados nunca viram
+    objetos Python.
+
+    Args:
+        caminho_excel (str | Path): Caminho da planilha .xlsx.
+        filtro_item (callable, opcional): Função que recebe um número de item (int) e retorna
+                                          True para mantê-lo; contribuições sem nenhum item
+                                          mantido são descartadas.
+        colunas (list, opcional): Colunas a ler. Padrão: COLUNAS_CONTRIBUICAO.
+        sheet_name (str | int, opcional): Nome ou posição da aba. Padrão: a primeira aba.
+        opcionais (iterable): Colunas lidas só se existirem na planilha (as de 'colunas' são obrigatórias).
+
+    Yields:
+        dict: Registro com as chaves 'itens' (lista de int), 'numero', 'Titulo da Contribuição', 'texto',
+              'justificativa' e 'nome' (no mesmo formato usado por formatar_celula_com_contribuicoes).
+    """
+    colunas = colunas or COLUNAS_CONTRIBUICAO
+    wb = load_workbook(caminho_excel, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if isinstance(sheet_name, str) else wb.worksheets[sheet_name or 0]
+        linhas = ws.iter_rows(values_only=True)
+
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            logging.warning(f"Planilha vazia: {caminho_excel}")
+            return
+        posicoes = _localizar_colunas(cabecalho, colunas, opcionais)
+        pos_item = posicoes['Item CP alterado']
+        campos = [
+            (chave, posicoes[coluna], padrao)
+            for chave, (coluna, padrao) in CAMPOS_REGISTRO.items()
+            if coluna in posicoes
+        ]
+
+        lidas = mantidas = 0
+        for linha in linhas:
+            lidas += 1
+            itens = extrair_itens(linha[pos_item] if pos_item < len(linha) else None)
+            if filtro_item is not None:
+                itens = [item for item in itens if filtro_item(item)]
+            if not itens:
+                continue
+
+            registro = {'itens': itens}
+            for chave, pos, padrao in campos:
+                valor = texto_da_celula(linha[pos]) if pos < len(linha) else None
+                registro[chave] = valor if valor is not None else padrao
+            mantidas += 1
+            yield registro
+
+        logging.info(f"Leitura em fluxo concluída: {lidas} linhas lidas, {mantidas} contribuições mantidas.")
+    finally:
+        wb.close()
+
+
+def agrupar_por_item(registros) -> dict:
+    """
+    Agrupa registros de ler_contribuicoes por item, ordenados por número da contribuição.
+    Uma contribuição que altera vários itens aparece na lista de cada um deles.
+
+    Para planilhas grandes, prefira ArmazemContribuicoes.de_registros, que não guarda um dict por
+    contribuição.
+
+    Returns:
+        defaultdict(list): item -> lista de contribuições (o 'contrib_por_item' dos preenchedores).
+    """
+    contrib_por_item = defaultdict(list)
+    for registro in registros:
+        for item in registro['itens']:
+            contrib_por_item[item].append(registro)
+    for contribuicoes in contrib_por_item.values():
+        contribuicoes.sort(key=lambda c: c['numero'])
+    return contrib_por_item
@@ -0,0 +1,212 @@
+import logging
+import unicodedata
+import zipfile
+
+import pandas as pd
+from docx.oxml.ns import nsmap, qn
+from lxml import etree
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+PARTE_DOCUMENTO = "word/document.xml"
+
+# Cabeçalho da tabela de análise: trecho esperado em cada coluna da primeira linha, comparado
+# em maiúsculas e sem acentos ('Visões das contribuições', 'VISOES DAS CONTRIBUICOES' etc.).
+# Cada posição aceita uma ou mais alternativas.
+CABECALHOS_DECRETO = (
+    ("ITEM",),
+    ("MINUTA DE DECRETO",),
+    ("VISOES DAS CONTRIBUICOES", "VISAO DAS CONTRIBUICOES"),
+)
+COLUNAS_DECRETO = ["Item", "Minuta de Decreto", "Visões das contribuições"]
+
+_W_BODY = qn('w:body')
+_W_TBL = qn('w:tbl')
+_W_TR = qn('w:tr')
+_W_TC = qn('w:tc')
+_W_P = qn('w:p')
+_W_T = qn('w:t')
+_W_VAL = qn('w:val')
+_W_TCPR = qn('w:tcPr')
+_W_TRPR = qn('w:trPr')
+_W_GRIDSPAN = qn('w:gridSpan')
+_W_VMERGE = qn('w:vMerge')
+_W_GRIDBEFORE = qn('w:gridBefore')
+
+# Conteúdo dos runs de um parágrafo (o mesmo conjunto que o CT_P.text do python-docx percorre).
+_CONTEUDO_RUNS = etree.XPath(
+    './w:r/*[not(self::w:rPr)] | ./w:hyperlink/w:r/*[not(self::w:rPr)]', namespaces={'w': nsmap['w']}
+)
+# Equivalente em texto dos demais elementos de um run, como no CT_R.text do python-docx.
+_TEXTO_ELEMENTOS_RUN = {
+    qn('w:tab'): "\t", qn('w:ptab'): "\t",
+    qn('w:cr'): "\n", qn('w:noBreakHyphen'): "-",
+}
+_W_BR = qn('w:br')
+
+
+# ==============================================================================
+# 2. TEXTO DAS CÉLULAS
+# ==============================================================================
+
+def _texto_paragrafo(p) -> str:
+    partes = []
+    for filho in _CONTEUDO_RUNS(p):
+        if filho.tag == _W_T:
+            partes.append(filho.text or "")
+        elif filho.tag == _W_BR:
+            if filho.get(qn('w:type'), "textWrapping") == "textWrapping":
+                partes.append("\n")
+        else:
+            partes.append(_TEXTO_ELEMENTOS_RUN.get(filho.tag, ""))
+    return "".join(partes)
+
+
+def texto_tc(tc) -> str:
+    """
+    Texto de uma célula (w:tc), igual ao cell.text do python-docx, sem depender das classes oxml.
+
+    Funciona com os elementos "crus" do iterparse (tabelas aninhadas ficam de fora, como no cell.text).
+    """
+    return "\n".join(_texto_paragrafo(p) for p in tc.iterchildren(_W_P))
+
+
+def _valor_inteiro(pai, tag, padrao) -> int:
+    filho = pai.find(tag) if pai is not None else None
+    if filho is None:
+        return padrao
+    return int(filho.get(_W_VAL, padrao))
+
+
+def textos_da_grade(tr, grade_anterior):
+    """
+    Textos de uma linha por coluna da grade, na ordem de row.cells do python-docx.
+
+    Células mescladas na horizontal (w:gridSpan) repetem o texto em cada coluna; continuações de
+    mescla vertical (w:vMerge sem w:val="restart") recebem o texto da célula de origem, guardado
+    da linha anterior, já que as linhas anteriores são descartadas durante a leitura.
+
+    Returns:
+        tuple: (tupla de textos, dict coluna da grade -> texto da célula de origem)
+    """
+    coluna = _valor_inteiro(tr.find(_W_TRPR), _W_GRIDBEFORE, 0)
+    textos = []
+    grade = {}
+    for tc in tr.iterchildren(_W_TC):
+        tc_pr = tc.find(_W_TCPR)
+        vezes = _valor_inteiro(tc_pr, _W_GRIDSPAN, 1)
+        v_merge = tc_pr.find(_W_VMERGE) if tc_pr is not None else None
+        continuacao = v_merge is not None and v_merge.get(_W_VAL, "continue") == "continue"
+        texto = grade_anterior[coluna] if continuacao and coluna in grade_anterior else texto_tc(tc)
+        for _ in range(vezes):
+            textos.append(texto)
+            grade[coluna] = texto
+            coluna += 1
+    return tuple(textos), grade
+
+
+# ==============================================================================
+# 3. LEITURA EM STREAMING
+# ==============================================================================
+
+def _descartar(elemento) -> None:
+    # Libera o elemento já lido e os irmãos anteriores que o iterparse ainda mantém.
+    elemento.clear(keep_tail=True)
+    pai = elemento.getparent()
+    if pai is not None:
+        while elemento.getprevious() is not None:
+            del pai[0]
+
+
+def linhas_tabelas(caminho_docx):
+    """
+    Percorre as linhas das tabelas do corpo do documento sem montar a árvore inteira na memória.
+
+    O word/document.xml é lido direto do zip com iterparse; cada linha é convertida em textos
+    assim que termina e descartada em seguida. Tabelas aninhadas em células não geram linhas
+    próprias (e não entram no texto da célula, como no python-docx).
+
+    Args:
+        caminho_docx (str | Path): Arquivo .docx.
+
+    Yields:
+        tuple: (índice da tabela no corpo, índice da linha na tabela, tupla com o texto de cada coluna da grade)
+    """
+    with zipfile.ZipFile(caminho_docx) as pacote, pacote.open(PARTE_DOCUMENTO) as origem:
+        indice_tabela = -1
+        indice_linha = 0
+        grade = {}
+        for evento, elemento in etree.iterparse(origem, events=("start", "end"), tag=(_W_TBL, _W_TR)):
+            pai = elemento.getparent()
+            if pai is None or (elemento.tag == _W_TBL and pai.tag != _W_BODY):
+                continue
+            if elemento.tag == _W_TBL:
+                if evento == "start":
+                    indice_tabela += 1
+                    indice_linha = 0
+                    grade = {}
+                else:
+                    _descartar(elemento) # Também libera os parágrafos do corpo entre as tabelas
+                continue
+            if evento == "end" and pai.tag == _W_TBL and pai.getparent() is not None \
+                    and pai.getparent().tag == _W_BODY:
+                textos, grade = textos_da_grade(elemento, grade)
+                yield indice_tabela, indice_linha, textos
+                indice_linha += 1
+                _descartar(elemento)
+
+
+def _sem_acentos(texto) -> str:
+    decomposto = unicodedata.normalize('NFKD', texto.upper())
+    return " ".join("".join(c for c in decomposto if not unicodedata.combining(c)).split())
+
+
+def cabecalho_confere(textos, cabecalhos) -> bool:
+    """
+    Verifica se a linha contém, coluna a coluna, algum dos trechos esperados (ver CABECALHOS_DECRETO).
+    """
+    if len(textos) < len(cabecalhos):
+        return False
+    return all(
+        any(trecho in _sem_acentos(texto) for trecho in alternativas)
+        for texto, alternativas in zip(textos, cabecalhos)
+    )
+
+
+def linhas_por_cabecalho(caminho_docx, cabecalhos=CABECALHOS_DECRETO, todas=False):
+    """
+    Linhas (sem o cabeçalho) da tabela cuja primeira linha confere com 'cabecalhos'.
+
+    Args:
+        caminho_docx (str | Path): Arquivo .docx.
+        cabecalhos (tuple): Alternativas de trecho por coluna (ver CABECALHOS_DECRETO).
+        todas (bool): Lê todas as tabelas com esse cabeçalho; por padrão para na primeira.
+
+    Yields:
+        tuple: Texto de cada coluna da grade.
+    """
+    tabela_aceita = None
+    for indice_tabela, indice_linha, textos in linhas_tabelas(caminho_docx):
+        if indice_linha == 0:
+            if tabela_aceita is not None and not todas:
+                return
+            if cabecalho_confere(textos, cabecalhos):
+                logging.info(f"Tabela {indice_tabela} identificada pelo cabeçalho: {textos[:len(cabecalhos)]}")
+                tabela_aceita = indice_tabela
+        elif indice_tabela == tabela_aceita:
+            yield textos
+
+
+def importar_tabela_decreto(caminho_docx, cabecalhos=CABECALHOS_DECRETO, colunas=COLUNAS_DECRETO) -> pd.DataFrame:
+    """
+    Lê de volta a tabela de análise do Word (com as edições dos analistas) para um DataFrame.
+
+    Returns:
+        pd.DataFrame: Uma linha por linha da tabela, com as colunas 'colunas' (as demais são ignoradas).
+    """
+    n = len(colunas)
+    linhas = [textos[:n] for textos in linhas_por_cabecalho(caminho_docx, cabecalhos, todas=True) if len(textos) >= n]
+    logging.info(f"{len(linhas)} linhas lidas da tabela de análise em {caminho_docx}")
+    return pd.DataFrame(linhas, columns=colunas)
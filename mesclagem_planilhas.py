@@ -0,0 +1,137 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+COLUNA_ORIGEM = "ABA DE ORIGEM"
+
+# Mesmo estilo de cabeçalho que o DataFrame.to_excel aplica.
+_LADO_FINO = Side(style="thin")
+ESTILO_CABECALHO = {
+    "font": Font(bold=True),
+    "border": Border(left=_LADO_FINO, right=_LADO_FINO, top=_LADO_FINO, bottom=_LADO_FINO),
+    "alignment": Alignment(horizontal="center", vertical="top"),
+}
+
+
+# ==============================================================================
+# 2. LEITURA DAS ABAS
+# ==============================================================================
+
+def abas_com_colunas(caminho_excel, colunas) -> list:
+    """
+    Lista as abas cujo cabeçalho contém todas as colunas pedidas, lendo só a linha do cabeçalho.
+
+    A planilha é aberta em modo somente leitura e, em cada aba, só a primeira linha é lida: é
+    ela que o pd.read_excel usa como cabeçalho, mesmo em branco. Uma aba com a primeira linha
+    vazia e o cabeçalho mais abaixo é ignorada, como antes.
+    """
+    wb = load_workbook(caminho_excel, read_only=True)
+    try:
+        encontradas = []
+        for ws in wb.worksheets:
+            cabecalho = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+            nomes = {str(v) for v in cabecalho if v is not None}
+            if all(c in nomes for c in colunas):
+                encontradas.append(ws.title)
+            else:
+                logging.debug(f"Aba '{ws.title}' ignorada: colunas {colunas} não encontradas no cabeçalho.")
+        return encontradas
+    finally:
+        wb.close()
+
+
+def ler_aba(caminho_excel, nome_aba, colunas) -> pd.DataFrame:
+    """
+    Lê apenas as colunas pedidas de uma aba, já sem as linhas vazias e com a aba de origem.
+    """
+    df = pd.read_excel(caminho_excel, sheet_name=nome_aba, usecols=list(colunas))
+    df = df[list(colunas)].dropna(how='all')
+    df[COLUNA_ORIGEM] = nome_aba
+    return df
+
+
+# ==============================================================================
+# 3. GRAVAÇÃO EM FLUXO
+# ==============================================================================
+
+def _valor_celula(valor):
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return valor.to_pydatetime()
+    return valor
+
+
+def _gravar_cabecalho(ws, colunas) -> None:
+    celulas = []
+    for nome in colunas:
+        celula = WriteOnlyCell(ws, value=nome)
+        celula.font = ESTILO_CABECALHO["font"]
+        celula.border = ESTILO_CABECALHO["border"]
+        celula.alignment = ESTILO_CABECALHO["alignment"]
+        celulas.append(celula)
+    ws.append(celulas)
+
+
+# ==============================================================================
+# 4. FUNÇÃO PRINCIPAL
+# ==============================================================================
+
+def mesclar_abas(caminho_excel, colunas, caminho_saida=None, max_processos=None):
+    """
+    Junta numa única planilha as colunas pedidas de todas as abas que as possuem.
+
+    As abas são filtradas pelo cabeçalho antes de qualquer leitura completa; as que servem são
+    lidas em paralelo (um processo por aba, só com as colunas pedidas) e gravadas, na ordem
+    original das abas, numa planilha em modo somente escrita.
+
+    Args:
+        caminho_excel (str): Planilha .xlsx com as abas a mesclar.
+        colunas (list): Colunas exigidas em cada aba (e copiadas para a saída).
+        caminho_saida (str, opcional): Padrão: '<planilha>_mesclado.xlsx'.
+        max_processos (int, opcional): Limite de processos. Padrão: número de CPUs.
+
+    Returns:
+        tuple: (caminho da planilha gerada ou None se nenhuma aba servir, total de linhas gravadas)
+    """
+    abas = abas_com_colunas(caminho_excel, colunas)
+    logging.info(f"{len(abas)} abas com as colunas {colunas} em '{caminho_excel}'.")
+    if not abas:
+        return None, 0
+
+    caminho_saida = caminho_saida or os.path.splitext(caminho_excel)[0] + "_mesclado.xlsx"
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    _gravar_cabecalho(ws, list(colunas) + [COLUNA_ORIGEM])
+
+    total = 0
+    processos = min(len(abas), max_processos or os.cpu_count() or 1)
+    if processos > 1:
+        executor = ProcessPoolExecutor(max_workers=processos)
+        resultados = executor.map(ler_aba, [caminho_excel] * len(abas), abas, [colunas] * len(abas))
+    else:
+        executor = None
+        resultados = (ler_aba(caminho_excel, aba, colunas) for aba in abas)
+
+    try:
+        # map() devolve na ordem das abas: cada uma é gravada assim que ela e as anteriores ficam prontas.
+        for df in resultados:
+            for linha in df.itertuples(index=False, name=None):
+                ws.append([_valor_celula(v) for v in linha])
+            total += len(df)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    wb.save(caminho_saida)
+    logging.info(f"Mesclagem concluída: {total} linhas de {len(abas)} abas -> {caminho_saida}")
+    return caminho_saida, total
@@ -0,0 +1,137 @@
+import copy
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from docx.opc.part import XmlPart
+from docx.package import Package
+
+# ==============================================================================
+# 1. MODELO INTERPRETADO UMA VEZ
+# ==============================================================================
+
+class ModeloEmMemoria:
+    """
+    Modelo .docx lido e interpretado uma única vez, do qual saem várias variantes independentes.
+
+    Toda parte XML (corpo, estilos, numeração, cabeçalhos, rodapés, propriedades do documento
+    etc.) é recriada em cada variante com a mesma classe do python-docx que o PartFactory usou
+    ao abrir o modelo, sobre uma cópia (deepcopy) da árvore já interpretada, sem novo parse.
+    Só as partes binárias (imagens, fontes, tema) são compartilhadas entre as variantes: as
+    rotinas de preenchimento não as alteram, e uma imagem nova entra como parte própria da variante.
+    """
+
+    def __init__(self, caminho_modelo):
+        self.caminho_modelo = caminho_modelo
+        with open(caminho_modelo, "rb") as arquivo:
+            self._pacote = Package.open(io.BytesIO(arquivo.read()))
+
+        partes = self._pacote.parts
+        copiadas = {parte for parte in partes if isinstance(parte, XmlPart)}
+        # Uma parte binária que aponta para uma parte copiada também precisa ser copiada em cada variante.
+        mudou = True
+        while mudou:
+            mudou = False
+            for parte in partes:
+                if parte not in copiadas and any(
+                    not rel.is_external and rel.target_part in copiadas for rel in parte.rels.values()
+                ):
+                    copiadas.add(parte)
+                    mudou = True
+        self._copiadas = [parte for parte in partes if parte in copiadas]
+        self._compartilhadas = [parte for parte in partes if parte not in copiadas]
+
+        logging.info(
+            f"Modelo '{caminho_modelo}' carregado: {len(self._copiadas)} partes copiadas por variante, "
+            f"{len(self._compartilhadas)} compartilhadas."
+        )
+
+    def variante(self):
+        """
+        Novo Document (python-docx) independente, com cópias das partes XML do modelo.
+        """
+        pacote = Package()
+        mapa = {parte: parte for parte in self._compartilhadas}
+        for original in self._copiadas:
+            if isinstance(original, XmlPart):
+                mapa[original] = type(original)(
+                    original.partname, original.content_type, copy.deepcopy(original._element), pacote
+                )
+            else:
+                mapa[original] = type(original)(original.partname, original.content_type, original.blob, pacote)
+
+        def ligar(origem, destino):
+            for rel in origem.rels.values():
+                alvo = rel.target_ref if rel.is_external else mapa[rel.target_part]
+                destino.rels.add_relationship(rel.reltype, alvo, rel.rId, rel.is_external)
+
+        ligar(self._pacote, pacote)
+        for original in self._copiadas:
+            ligar(original, mapa[original])
+        pacote.after_unmarshal() # Registra as imagens, para que uma imagem nova não repita o nome de uma existente
+        return pacote.main_document_part.document
+
+
+# ==============================================================================
+# 2. GERAÇÃO DE VARIANTES
+# ==============================================================================
+
+def gerar_variantes(modelo, variantes, max_threads=None) -> dict:
+    """
+    Preenche e grava várias variantes do mesmo modelo, em paralelo.
+
+    As cópias são feitas na thread principal; o preenchimento e a gravação (serialização do
+    XML e compressão do .docx, que liberam o GIL em boa parte) rodam em threads.
+
+    Args:
+        modelo (ModeloEmMemoria | str | Path): Modelo já carregado ou caminho do .docx.
+        variantes (dict): Caminho de saída -> função que recebe o Document e o preenche.
+        max_threads (int, opcional): Limite de threads. Padrão: uma por variante.
+
+    Returns:
+        dict: Caminho de saída -> valor retornado pela função de preenchimento.
+    """
+    if isinstance(modelo, (str, Path)):
+        modelo = ModeloEmMemoria(modelo)
+    documentos = {caminho: modelo.variante() for caminho in variantes}
+
+    def gerar(caminho):
+        resultado = variantes[caminho](documentos[caminho])
+        documentos[caminho].save(caminho)
+        logging.info(f"Variante gravada: {caminho}")
+        return resultado
+
+    with ThreadPoolExecutor(max_workers=max_threads or len(variantes) or 1) as executor:
+        return dict(zip(variantes, executor.map(gerar, variantes)))
+
+
+# ==============================================================================
+# 3. EXECUÇÃO
+# ==============================================================================
+
+if __name__ == "__main__":
+    from functools import partial
+
+    from armazem_contribuicoes import ArmazemContribuicoes
+    from cache_planilha import carregar_planilha
+    from preenchedor_faixas import ARQUIVO_EXCEL, ARQUIVO_WORD_ENTRADA, BASE_DIR, preencher_faixas
+
+    # Saídas dos antigos scripts, geradas a partir de uma única leitura do modelo e do Excel.
+    VARIANTES = {
+        BASE_DIR / "saida_0.docx": [("0", 'verifica_cp')],
+        BASE_DIR / "saida_4-26.docx": [("4-26", 'importa')],
+        BASE_DIR / "saida_0_e_52.docx": [("0, >52", 'importa')],
+        BASE_DIR / "saida_ajustada.docx": [(">=52", 'ajusta_visoes')],
+        BASE_DIR / "saida_título.docx": [("0", 'ajusta_visoes_titulo')],
+    }
+
+    df = carregar_planilha(ARQUIVO_EXCEL, usecols=['Item CP alterado', 'Numero', 'Titulo da Contribuição ', 'Texto', 'Nome'])
+    contrib_por_item = ArmazemContribuicoes.de_dataframe(df)
+    resultados = gerar_variantes(
+        ARQUIVO_WORD_ENTRADA,
+        {caminho: partial(preencher_faixas, contrib_por_item=contrib_por_item, faixas=faixas)
+         for caminho, faixas in VARIANTES.items()},
+    )
+    for caminho, preenchidas in resultados.items():
+        logging.info(f"{caminho}: {sum(preenchidas.values())} células preenchidas.")
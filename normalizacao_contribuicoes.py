@@ -0,0 +1,134 @@
+import logging
+
+import pandas as pd
+
+from leitor_contribuicoes import CAMPOS_REGISTRO
+
+try:
+    import pyarrow  # noqa: F401  (permite usar os kernels de texto do Arrow)
+    TIPO_TEXTO = "string[pyarrow]"
+except ImportError:
+    TIPO_TEXTO = "string"
+
+# Captura cada número de item em valores como "12", "12, 13" ou "Itens 12 e 13".
+PADRAO_ITEM = r'(\d+)'
+
+
+# ==============================================================================
+# 1. NORMALIZAÇÃO COLUNAR
+# ==============================================================================
+
+def preparar_planilha(df) -> pd.DataFrame:
+    """
+    Remove os espaços dos nomes das colunas e renumera as linhas de 0 a n-1.
+    """
+    df = df.rename(columns=lambda col: str(col).strip()).reset_index(drop=True)
+    if 'Item CP alterado' not in df.columns:
+        raise KeyError('Item CP alterado')
+    return df
+
+
+def extrair_pares_item(df, filtro_item=None) -> pd.DataFrame:
+    """
+    Extrai os números de item de 'Item CP alterado', com uma linha por par contribuição/item.
+
+    Valores com um único número (a grande maioria) são convertidos direto com str.fullmatch;
+    o str.extractall, mais caro, só é usado nos que citam vários itens ("12, 13").
+
+    Args:
+        df (pd.DataFrame): Planilha já passada por preparar_planilha.
+        filtro_item (callable, opcional): Recebe um número de item (int) e retorna True para mantê-lo.
+
+    Returns:
+        pd.DataFrame: Colunas 'linha' (posição da contribuição em df) e 'item' (int).
+    """
+    valores_item = df['Item CP alterado'].astype(TIPO_TEXTO).str.strip()
+    simples = valores_item.str.fullmatch(PADRAO_ITEM).fillna(False).astype(bool)
+    compostos = valores_item[~simples].dropna().str.extractall(PADRAO_ITEM)[0]
+    pares = pd.concat([
+        pd.DataFrame({
+            'linha': valores_item.index[simples],
+            'item': valores_item[simples].astype(int).to_numpy(),
+        }),
+        pd.DataFrame({
+            'linha': compostos.index.get_level_values(0),
+            'item': compostos.astype(int).to_numpy(),
+        }),
+    ], ignore_index=True).drop_duplicates()
+
+    if filtro_item is not None:
+        # O filtro é avaliado uma vez por item distinto, não por linha.
+        itens_mantidos = [item for item in pares['item'].unique() if filtro_item(int(item))]
+        pares = pares[pares['item'].isin(itens_mantidos)]
+    return pares
+
+
+def normalizar_textos(df, linhas, limpar_texto=False) -> pd.DataFrame:
+    """
+    Trata as colunas de texto das contribuições indicadas, uma única vez por contribuição.
+
+    Returns:
+        pd.DataFrame: Indexado pela linha da planilha, com as colunas renomeadas para as chaves
+                      de CAMPOS_REGISTRO ('numero', 'texto', 'nome'...) e os valores padrão aplicados.
+    """
+    renomear = {coluna: chave for chave, (coluna, _) in CAMPOS_REGISTRO.items() if coluna in df.columns}
+    textos = df.loc[linhas, list(renomear)]
+    for coluna, chave in renomear.items():
+        serie = textos[coluna].astype(TIPO_TEXTO).str.replace('_x000D_', '\n', regex=False)
+        if limpar_texto:
+            serie = serie.str.strip().str.normalize('NFKC')
+        textos[coluna] = serie.mask(serie.str.fullmatch(r'\s*')).fillna(CAMPOS_REGISTRO[chave][1])
+    return textos.rename(columns=renomear)
+
+
+def normalizar_contribuicoes(df, filtro_item=None, limpar_texto=False) -> pd.DataFrame:
+    """
+    Normaliza a planilha de contribuições numa única etapa vetorizada.
+
+    Substitui o pré-processamento coluna a coluna, o df.apply(validar_item) e o laço iterrows()
+    dos preenchedores: os textos são tratados com operações de string do pandas/Arrow, os
+    números de item são extraídos com str.fullmatch/str.extractall (uma linha por par
+    contribuição/item) e os valores vazios recebem os mesmos padrões de antes
+    ('[sem número]', '[autor desconhecido]'...).
+
+    Args:
+        df (pd.DataFrame): Planilha lida do Excel (uma contribuição por linha).
+        filtro_item (callable, opcional): Recebe um número de item (int) e retorna True para mantê-lo.
+        limpar_texto (bool): Se True, também remove espaços nas pontas e aplica a normalização
+                             Unicode NFKC (equivalente à função limpar_texto do atualizador_gui).
+
+    Returns:
+        pd.DataFrame: Colunas 'item' (int) e as chaves de CAMPOS_REGISTRO presentes na planilha
+                      ('numero', 'Titulo da Contribuição', 'texto', 'justificativa', 'nome'),
+                      ordenado por item e número da contribuição.
+    """
+    df = preparar_planilha(df)
+    pares = extrair_pares_item(df, filtro_item)
+    textos = normalizar_textos(df, pares['linha'].unique(), limpar_texto)
+
+    saida = textos.loc[pares['linha'].to_numpy()].reset_index(drop=True)
+    saida.insert(0, 'item', pares['item'].to_numpy())
+    ordem = ['item', 'numero'] if 'numero' in saida.columns else ['item']
+    saida = saida.sort_values(ordem, kind='stable').reset_index(drop=True)
+
+    logging.info(f"Normalização concluída: {len(df)} linhas da planilha -> {len(saida)} pares contribuição/item.")
+    return saida
+
+
+# ==============================================================================
+# 2. AGRUPAMENTO POR ITEM
+# ==============================================================================
+
+def contribuicoes_por_item(df_normalizado) -> dict:
+    """
+    Monta o dicionário item -> lista de contribuições com um único groupby.
+
+    Como o DataFrame normalizado já vem ordenado por item, cada grupo é uma fatia contígua
+    da lista de registros, sem cópias por linha.
+
+    Returns:
+        dict: item (int) -> lista de dicts com as chaves usadas por formatar_celula_com_contribuicoes.
+    """
+    registros = df_normalizado.drop(columns='item').to_dict('records')
+    grupos = df_normalizado.groupby('item', sort=True).indices
+    return {int(item): registros[pos[0]:pos[-1] + 1] for item, pos in grupos.items()}
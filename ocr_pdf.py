@@ -0,0 +1,270 @@
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+import unicodedata
+
+import pymupdf
+
+try:
+    import pytesseract
+    from PIL import Image
+    TESSERACT_DISPONIVEL = True
+except ImportError:
+    TESSERACT_DISPONIVEL = False
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+DPI = 300
+IDIOMA = "por"
+CONFIG_TESSERACT = "--psm 6"
+
+# Uma página só é aproveitada sem OCR se tiver fontes, ao menos MIN_CARACTERES caracteres
+# visíveis (ou nenhuma imagem) e, entre eles, ao menos MIN_PROPORCAO_IMPRIMIVEIS de caracteres "reais"
+# (fontes sem mapa Unicode produzem U+FFFD, caracteres de controle ou de uso privado).
+MIN_CARACTERES = 40
+MIN_PROPORCAO_IMPRIMIVEIS = 0.9
+
+# Pipeline de OCR: execuções simultâneas do Tesseract (None: uma por núcleo) e páginas por
+# execução. Cada página A4 em tons de cinza a 300 dpi ocupa cerca de 9 MB enquanto espera na fila.
+TRABALHADORES_OCR = None
+PAGINAS_POR_LOTE = 4
+
+# Categorias Unicode que não vêm de texto legível: controle, formatação, uso privado, não atribuídos.
+_CATEGORIAS_ILEGIVEIS = {'Cc', 'Cf', 'Co', 'Cn', 'Cs'}
+
+
+# ==============================================================================
+# 2. AVALIAÇÃO DA CAMADA DE TEXTO
+# ==============================================================================
+
+def proporcao_imprimiveis(texto) -> float:
+    """
+    Proporção dos caracteres visíveis (sem espaços) que são texto legível.
+    """
+    visiveis = [c for c in texto if not c.isspace()]
+    if not visiveis:
+        return 0.0
+    legiveis = sum(1 for c in visiveis if c != "\ufffd" and unicodedata.category(c) not in _CATEGORIAS_ILEGIVEIS)
+    return legiveis / len(visiveis)
+
+
+def avaliar_pagina(pagina):
+    """
+    Lê a camada de texto de uma página e decide se ela dispensa o OCR.
+
+    Args:
+        pagina (pymupdf.Page): Página aberta.
+
+    Returns:
+        tuple: (texto extraído, motivo para fazer OCR ou None se o texto é utilizável)
+    """
+    if not pagina.get_fonts():
+        return "", "sem fontes (página digitalizada)"
+    texto = pagina.get_text("text")
+    caracteres = sum(1 for c in texto if not c.isspace())
+    if caracteres < MIN_CARACTERES and pagina.get_images(full=False):
+        # Pouco texto sobre uma imagem (p. ex. o nome impresso sob uma assinatura digitalizada);
+        # uma página curta sem imagens não tem nada mais a ler.
+        return texto, f"{caracteres} caracteres na camada de texto e imagens na página"
+    proporcao = proporcao_imprimiveis(texto)
+    if proporcao < MIN_PROPORCAO_IMPRIMIVEIS:
+        return texto, f"{proporcao:.0%} de caracteres legíveis"
+    return texto, None
+
+
+# ==============================================================================
+# 3. OCR
+# ==============================================================================
+
+def configuracao_ocr(seletivo=True) -> str:
+    """
+    Descreve os parâmetros que determinam o texto produzido (chave do cache_textos_pdf).
+
+    Sem o executável do Tesseract (p. ex. com a unidade J: desconectada), a versão fica como
+    'indisponível': um PDF só com páginas nativas ainda é convertido, e um com páginas a
+    reconhecer falha no OCR, sem gravar nada no cache.
+    """
+    versao = "indisponível"
+    if TESSERACT_DISPONIVEL:
+        try:
+            versao = pytesseract.get_tesseract_version()
+        except pytesseract.TesseractNotFoundError:
+            logging.warning("Executável do Tesseract não encontrado; só páginas com texto nativo poderão ser convertidas.")
+    configuracao = f"tesseract {versao} lang={IDIOMA} config={CONFIG_TESSERACT} dpi={DPI} cinza"
+    if seletivo:
+        configuracao += f" seletivo min={MIN_CARACTERES} legiveis={MIN_PROPORCAO_IMPRIMIVEIS}"
+    return configuracao
+
+
+def _verificar_tesseract() -> None:
+    if not TESSERACT_DISPONIVEL:
+        raise RuntimeError("O pytesseract (e o Pillow) não está instalado; não é possível fazer OCR das páginas digitalizadas.")
+
+
+def renderizar_pagina(pagina, numero) -> tuple:
+    """
+    Renderiza a página em tons de cinza (1 byte por pixel), sem codificar em PNG.
+
+    Returns:
+        tuple: (número da página, largura, altura, bytes por linha, amostras)
+    """
+    pix = pagina.get_pixmap(dpi=DPI, colorspace=pymupdf.csGRAY, alpha=False)
+    return numero, pix.width, pix.height, pix.stride, pix.samples
+
+
+def _imagem(renderizada):
+    # As amostras do pixmap viram a imagem do Pillow sem cópia nem decodificação.
+    _, largura, altura, stride, amostras = renderizada
+    return Image.frombuffer("L", (largura, altura), amostras, "raw", "L", stride, 1)
+
+
+def ocr_pagina(pagina) -> str:
+    """
+    Renderiza a página em DPI e aplica o Tesseract.
+
+    Raises:
+        RuntimeError: Se o pytesseract não estiver instalado.
+    """
+    _verificar_tesseract()
+    imagem = _imagem(renderizar_pagina(pagina, 0))
+    return pytesseract.image_to_string(imagem, lang=IDIOMA, config=CONFIG_TESSERACT).rstrip("\f")
+
+
+def ocr_lote(lote) -> dict:
+    """
+    Aplica o Tesseract a várias páginas numa única execução do programa.
+
+    As imagens são gravadas num TIFF de várias páginas sem compressão (o pytesseract gravaria
+    cada imagem do Pillow num PNG temporário) e o Tesseract separa o texto de cada página com
+    um '\\f'. Se a quantidade de páginas na saída não conferir, cada página é refeita sozinha.
+
+    Args:
+        lote (list): Páginas produzidas por renderizar_pagina.
+
+    Returns:
+        dict: número da página -> texto
+    """
+    _verificar_tesseract()
+    imagens = [_imagem(renderizada) for renderizada in lote]
+    with tempfile.TemporaryDirectory(prefix="ocr_") as pasta:
+        caminho = os.path.join(pasta, "lote.tif")
+        imagens[0].save(caminho, save_all=True, append_images=imagens[1:], dpi=(DPI, DPI))
+        saida = pytesseract.image_to_string(caminho, lang=IDIOMA, config=CONFIG_TESSERACT)
+    textos = saida.split("\f")
+    if len(textos) < len(lote) or any(t.strip() for t in textos[len(lote):]):
+        logging.warning(f"Saída do Tesseract com {len(textos)} partes para {len(lote)} páginas; refazendo uma a uma.")
+        textos = [pytesseract.image_to_string(imagem, lang=IDIOMA, config=CONFIG_TESSERACT).rstrip("\f")
+                  for imagem in imagens]
+    return {renderizada[0]: texto for renderizada, texto in zip(lote, textos)}
+
+
+# ==============================================================================
+# 4. PIPELINE PARALELO
+# ==============================================================================
+
+def _renderizador(caminho_pdf, seletivo, paginas_por_lote, fila, textos, paginas_ocr, erros, trabalhadores):
+    """
+    Lê o PDF (na thread que chamou converter_pdf): guarda o texto das páginas que dispensam OCR
+    e põe na fila os lotes de páginas renderizadas. Termina com um marcador None para cada trabalhador.
+
+    Returns:
+        int: Quantidade de páginas do PDF.
+    """
+    total = 0
+    try:
+        with pymupdf.open(caminho_pdf) as documento:
+            total = len(documento)
+            lote = []
+            for numero, pagina in enumerate(documento, start=1):
+                motivo = "modo não seletivo"
+                if seletivo:
+                    textos[numero], motivo = avaliar_pagina(pagina)
+                if motivo is None:
+                    continue
+                logging.info(f"Página {numero} de {total}: OCR ({motivo}).")
+                paginas_ocr.append(numero)
+                lote.append(renderizar_pagina(pagina, numero))
+                if len(lote) == paginas_por_lote:
+                    fila.put(lote) # Bloqueia se os trabalhadores estiverem atrasados (limita a memória)
+                    lote = []
+            if lote:
+                fila.put(lote)
+    except Exception as e:
+        erros.append(e)
+    finally:
+        for _ in range(trabalhadores):
+            fila.put(None)
+    return total
+
+
+def _trabalhador(fila, textos, erros):
+    """
+    Thread de OCR de vida longa: processa lotes até receber None. O trabalho pesado é do
+    executável do Tesseract, num processo próprio, de modo que as threads ocupam núcleos
+    diferentes sem disputar o GIL e as páginas não precisam ser copiadas entre processos.
+    """
+    while True:
+        lote = fila.get()
+        if lote is None:
+            return
+        if erros:
+            continue # Após um erro, apenas esvazia a fila para o renderizador terminar
+        try:
+            textos.update(ocr_lote(lote))
+        except Exception as e:
+            erros.append(e)
+
+
+def converter_pdf(caminho_pdf, seletivo=True, trabalhadores=TRABALHADORES_OCR, paginas_por_lote=PAGINAS_POR_LOTE):
+    """
+    Converte um PDF em texto, com um separador '--- Página N ---' antes de cada página.
+
+    No modo seletivo, cada página com camada de texto utilizável (ver avaliar_pagina) é lida
+    diretamente e só as demais são renderizadas e passadas ao Tesseract; um PDF misto leva
+    apenas o tempo do OCR das suas páginas digitalizadas. Sem o modo seletivo, todas as páginas
+    passam pelo OCR, como no convertepdf.py original.
+
+    A thread atual renderiza as páginas em tons de cinza enquanto 'trabalhadores' threads fazem
+    o OCR dos lotes já prontos, cada lote numa única execução do Tesseract (ver ocr_lote).
+
+    Args:
+        caminho_pdf (str | Path): Arquivo PDF.
+        seletivo (bool): Faz OCR apenas das páginas sem texto utilizável.
+        trabalhadores (int, opcional): Execuções simultâneas do Tesseract. Padrão: uma por núcleo.
+        paginas_por_lote (int): Páginas por execução do Tesseract.
+
+    Returns:
+        tuple: (texto, quantidade de páginas, lista com os números das páginas que passaram pelo OCR)
+
+    Raises:
+        RuntimeError: Se houver páginas para OCR e o pytesseract não estiver instalado.
+    """
+    trabalhadores = max(1, trabalhadores or os.cpu_count() or 1)
+    fila = queue.Queue(maxsize=trabalhadores)
+    textos = {}
+    paginas_ocr = []
+    erros = []
+
+    inicio = time.perf_counter()
+    threads = [threading.Thread(target=_trabalhador, args=(fila, textos, erros), daemon=True)
+               for _ in range(trabalhadores)]
+    for thread in threads:
+        thread.start()
+    total = _renderizador(caminho_pdf, seletivo, paginas_por_lote, fila, textos, paginas_ocr, erros, trabalhadores)
+    for thread in threads:
+        thread.join()
+    if erros:
+        raise erros[0]
+
+    if paginas_ocr:
+        duracao = time.perf_counter() - inicio
+        logging.info(f"OCR de {len(paginas_ocr)} páginas em {duracao:.1f} s "
+                     f"({len(paginas_ocr) / duracao:.2f} páginas/s, {trabalhadores} execuções simultâneas do Tesseract).")
+
+    partes = [f"\n--- Página {numero} ---\n{textos[numero]}\n" for numero in range(1, total + 1)]
+    return "".join(partes), total, paginas_ocr
@@ -1,71 +1,69 @@
-import pandas as pd
 import logging
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from docx import Document
-from docx.shared import Pt
 import os
 import threading
 
+from cache_planilha import carregar_planilha
+from estilos_documento import estilo_celula
+from indice_itens import ItemIndex
+from indice_linhas_word import IndiceLinhasWord, item_somente_digitos
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 def formatar_celula(celula, texto, nome_fonte='Calibri', tamanho_fonte=10, negrito=False):
     celula.text = texto
-    run = celula.paragraphs[0].runs[0]
-    run.font.name = nome_fonte
-    run.font.size = Pt(tamanho_fonte)
-    run.bold = negrito
+    # Fonte, tamanho e negrito vêm de um estilo de parágrafo registrado uma vez no documento
+    celula.paragraphs[0]._p.style = estilo_celula(celula.part, nome_fonte, tamanho_fonte, negrito)
 
 def processar(arquivo_excel, arquivo_word_entrada, arquivo_word_saida, progresso_callback=None):
     try:
-        df = pd.read_excel(arquivo_excel, engine="openpyxl")
+        df = carregar_planilha(arquivo_excel)
         df.columns = df.columns.str.strip()
         df = df[['Item CP alterado', 'Numero', 'Titulo da Contribuição', 'Texto', 'Justificativa', 'Nome']]
         df = df.replace(r'_x000D_', '"', regex=True)
-        df["Item CP alterado"] = pd.to_numeric(df["Item CP alterado"], errors="coerce")
-        df = df.dropna(subset=["Item CP alterado"])
-        df["Item CP alterado"] = df["Item CP alterado"].astype(int)
-        df = df[df["Item CP alterado"] >= 100]
-
-        df_agrupado = df.groupby("Item CP alterado").agg({
-            "Numero": lambda x: ", ".join(x.astype(str)),
-            "Texto": lambda x: "\n".join(x.astype(str)),
-            "Justificativa": lambda x: "\n".join(x.astype(str)),
-            "Nome": lambda x: ", ".join(x.astype(str))
-        }).reset_index()
+
+        # Índice item -> contribuições, montado uma vez e consultado em O(1) por linha do Word
+        indice = ItemIndex.de_dataframe(df, filtro_item=lambda item: item >= 100)
 
         doc = Document(arquivo_word_entrada)
         total_tabelas = len(doc.tables)
         itens_atualizados = 0
 
-        for t_index, table in enumerate(doc.tables):
-            for row in table.rows:
-                if len(row.cells) < 3:
-                    continue
-                item_cp_cell_text = row.cells[0].text.strip()
-                if item_cp_cell_text.isdigit():
-                    item_cp_word = int(item_cp_cell_text)
-                    matching_row = df_agrupado[df_agrupado["Item CP alterado"] == item_cp_word]
-                    if not matching_row.empty:
-                        item_val = str(matching_row["Item CP alterado"].values[0])
-                        numero_val = str(matching_row["Numero"].values[0])
-                        texto_val = str(matching_row['Texto'].values[0])
-                        justificativa_val = str(matching_row['Justificativa'].values[0])
-                        nome_val = str(matching_row['Nome'].values[0])
-                        texto_completo_com_numero = (
-                            f"Contribuição(ões) N.º: {numero_val}\n\n"
-                            f"{texto_val}\n"
-                            f"{justificativa_val}\n"
-                            f"({nome_val})"
-                        )
-                        formatar_celula(row.cells[0], texto=item_val, tamanho_fonte=10, negrito=True)
-                        formatar_celula(row.cells[1], texto="") 
-                        formatar_celula(row.cells[2], texto=texto_completo_com_numero, tamanho_fonte=8)
-                        itens_atualizados += 1
-
-            # Atualiza progresso
-            if progresso_callback:
-                progresso_callback((t_index + 1) / total_tabelas * 100)
+        # Linhas das tabelas indexadas numa única varredura do XML
+        indice_linhas = IndiceLinhasWord.de_documento(doc, chave=item_somente_digitos)
+        t_anterior = 0
+
+        for row in indice_linhas.todas:
+            # Atualiza progresso ao passar para a próxima tabela
+            if progresso_callback and row.indice_tabela != t_anterior:
+                progresso_callback(row.indice_tabela / total_tabelas * 100)
+                t_anterior = row.indice_tabela
+            if len(row) < 3:
+                continue
+            if row.item is not None:
+                item_cp_word = row.item
+                contribuicoes = indice.contribuicoes(item_cp_word)
+                if contribuicoes:
+                    item_val = str(item_cp_word)
+                    numero_val = ", ".join(str(c["Numero"]) for c in contribuicoes)
+                    texto_val = "\n".join(str(c['Texto']) for c in contribuicoes)
+                    justificativa_val = "\n".join(str(c['Justificativa']) for c in contribuicoes)
+                    nome_val = ", ".join(str(c['Nome']) for c in contribuicoes)
+                    texto_completo_com_numero = (
+                        f"Contribuição(ões) N.º: {numero_val}\n\n"
+                        f"{texto_val}\n"
+                        f"{justificativa_val}\n"
+                        f"({nome_val})"
+                    )
+                    formatar_celula(row.celula(0), texto=item_val, tamanho_fonte=10, negrito=True)
+                    formatar_celula(row.celula(1), texto="") 
+                    formatar_celula(row.celula(2), texto=texto_completo_com_numero, tamanho_fonte=8)
+                    itens_atualizados += 1
+
+        if progresso_callback:
+            progresso_callback(100)
 
         doc.save(arquivo_word_saida)
         return f"Processamento concluído: {itens_atualizados} itens atualizados."
@@ -0,0 +1,73 @@
+import json
+import logging
+from xml.sax.saxutils import escape, unescape
+
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import PackURI
+from docx.opc.part import Part
+
+# ==============================================================================
+# PARTES XML PERSONALIZADAS (/customXml) COM CONTEÚDO JSON
+# ==============================================================================
+# Dados auxiliares das rotinas de preenchimento (p. ex. os hashes das células)
+# ficam dentro do próprio .docx, numa parte /customXml por namespace. O Word preserva essas
+# partes ao editar o arquivo e não as exibe.
+
+
+def parte_personalizada(documento, namespace):
+    """
+    Parte /customXml do documento com o namespace indicado, ou None se não houver.
+    """
+    marca = namespace.encode("utf-8")
+    for rel in documento.part.rels.values():
+        if rel.reltype == RT.CUSTOM_XML and not rel.is_external:
+            parte = rel.target_part
+            if marca in parte.blob[:200]:
+                return parte
+    return None
+
+
+def ler_parte_json(documento, namespace, raiz, versao):
+    """
+    Lê o JSON gravado por gravar_parte_json.
+
+    Returns:
+        dict: O conteúdo, ou None se a parte não existir, estiver corrompida ou for de outra versão.
+    """
+    parte = parte_personalizada(documento, namespace)
+    if parte is None:
+        return None
+    try:
+        texto = parte.blob.decode("utf-8")
+        inicio = texto.index(">", texto.index(f"<{raiz}")) + 1
+        conteudo = json.loads(unescape(texto[inicio:texto.rindex(f"</{raiz}>")]))
+    except ValueError:
+        return None
+    if not isinstance(conteudo, dict) or conteudo.get("versao") != versao:
+        return None
+    return conteudo
+
+
+def gravar_parte_json(documento, namespace, raiz, conteudo) -> None:
+    """
+    Grava (ou substitui) o conteúdo JSON da parte /customXml do namespace indicado.
+
+    Args:
+        documento: Document do python-docx.
+        namespace (str): Namespace do elemento raiz, que identifica a parte.
+        raiz (str): Nome do elemento raiz.
+        conteudo (dict): Dados serializáveis em JSON (incluindo a 'versao').
+    """
+    texto = escape(json.dumps(conteudo, ensure_ascii=False, separators=(",", ":")))
+    blob = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<{raiz} xmlns="{namespace}">{texto}</{raiz}>').encode("utf-8")
+
+    parte = parte_personalizada(documento, namespace)
+    if parte is not None:
+        parte._blob = blob
+        return
+    pacote = documento.part.package
+    nome = pacote.next_partname("/customXml/item%d.xml")
+    parte = Part(PackURI(nome), "application/xml", blob, pacote)
+    documento.part.relate_to(parte, RT.CUSTOM_XML)
+    logging.debug(f"Parte {nome} ({raiz}) gravada no documento.")
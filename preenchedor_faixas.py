@@ -0,0 +1,238 @@
+import logging
+import re
+from pathlib import Path
+
+from docx import Document
+from docx.oxml.ns import qn
+
+from armazem_contribuicoes import ArmazemContribuicoes
+from cache_planilha import carregar_planilha
+from anexo_transbordo import MAX_CARACTERES, MAX_CONTRIBUICOES, AnexoTransbordo
+from indice_linhas_word import IndiceLinhasWord, item_por_digitos
+from renderizador_celulas import limpar_tc, renderizador_do_documento
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO INICIAL
+# ==============================================================================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[
+        logging.FileHandler("processamento.log", encoding="utf-8"),
+        logging.StreamHandler()
+    ]
+)
+
+BASE_DIR = Path(__file__).parent
+ARQUIVO_EXCEL = BASE_DIR / "Consideracoes-sobre-a-Consulta_Publica_Decreto_7217.2010.xlsx"
+ARQUIVO_WORD_ENTRADA = BASE_DIR / "saida.docx"
+ARQUIVO_WORD_SAIDA = BASE_DIR / "saida_final.docx"
+
+# Perfis de formatação: o que cada um dos antigos scripts fazia com a célula de "Visões das contribuições".
+# 'limpeza' define o que é retirado da célula antes de acrescentar as contribuições:
+# - 'celula': parágrafos e tabelas aninhadas, deixando um parágrafo vazio (clear_cell dos scripts 'importa');
+# - 'paragrafos': só os parágrafos (limpar_celula de 'ajusta visões.py');
+# - 'ate_51': esvazia os runs e mantém no máximo 51 parágrafos ('ajusta visões com título.py');
+# - 'nenhuma': acrescenta ao conteúdo existente ('verifica cp.py').
+PERFIS = {
+    'importa': {'fonte': 'Calibri', 'tamanho': 8, 'cor': 'auto', 'limpeza': 'celula'},
+    'ajusta_visoes': {'fonte': 'Calibri', 'tamanho': 8, 'cor': 'auto', 'limpeza': 'paragrafos'},
+    'ajusta_visoes_titulo': {'fonte': 'Calibri', 'tamanho': 8, 'cor': 'auto', 'limpeza': 'ate_51'},
+    'verifica_cp': {'fonte': 'Calibri', 'tamanho': 8, 'cor': 'auto', 'limpeza': 'nenhuma'},
+}
+
+# Faixas de itens e o perfil de cada uma, aplicadas numa única passagem (a primeira faixa que contém o item vale).
+# Expressões aceitas: '0', '4-26', '>52', '>=100', '<10', '*' (todos) e combinações separadas por vírgula ('0, >52').
+FAIXAS = [
+    ("0", 'verifica_cp'),
+    ("4-26", 'importa'),
+    (">=52", 'ajusta_visoes'),
+]
+
+COLUNA_CONTRIBUICOES = 2 # Terceira coluna: "Visões das contribuições"
+
+# Células acima destes limites recebem só um resumo com hiperlink, e a íntegra vai para um anexo
+# ao final do documento (ou para 'caminho_anexo', se informado). None desativa o transbordo.
+TRANSBORDO = {
+    'max_contribuicoes': MAX_CONTRIBUICOES,
+    'max_caracteres': MAX_CARACTERES,
+    'caminho_anexo': None, # ex.: BASE_DIR / "anexo_contribuicoes.docx"
+}
+
+
+# ==============================================================================
+# 2. FAIXAS DE ITENS
+# ==============================================================================
+
+RE_TERMO = re.compile(r'^\s*(?:(\*)|(\d+)\s*-\s*(\d+)|(>=|<=|==|>|<)?\s*(\d+))\s*$')
+
+
+def interpretar_faixa(expressao):
+    """
+    Converte uma expressão de faixa de itens numa função item -> bool.
+
+    Args:
+        expressao (str): Termos separados por vírgula: '*', 'N', 'A-B' (inclusivo), '>N', '>=N', '<N', '<=N', '==N'.
+
+    Returns:
+        callable: Verdadeiro para os itens que pertencem a algum dos termos.
+
+    Raises:
+        ValueError: Se algum termo não seguir o formato.
+    """
+    testes = []
+    for termo in str(expressao).split(","):
+        encontrado = RE_TERMO.match(termo)
+        if not encontrado:
+            raise ValueError(f"Faixa de itens inválida: '{termo.strip()}' em '{expressao}'.")
+        todos, inicio, fim, operador, valor = encontrado.groups()
+        if todos:
+            testes.append(lambda item: True)
+        elif inicio is not None:
+            testes.append(lambda item, a=int(inicio), b=int(fim): a <= item <= b)
+        else:
+            n = int(valor)
+            testes.append({
+                None: lambda item, n=n: item == n, '==': lambda item, n=n: item == n,
+                '>': lambda item, n=n: item > n, '>=': lambda item, n=n: item >= n,
+                '<': lambda item, n=n: item < n, '<=': lambda item, n=n: item <= n,
+            }[operador])
+    return lambda item: any(teste(item) for teste in testes)
+
+
+# ==============================================================================
+# 3. LIMPEZA E PREENCHIMENTO DAS CÉLULAS
+# ==============================================================================
+
+def _limpar_ate_51(celula) -> None:
+    # Equivale a 'run.text = ""' em cada run (só o w:rPr fica) seguido da remoção dos parágrafos além do 51º.
+    tc = celula._tc
+    paragrafos = tc.findall(qn('w:p'))
+    for p in paragrafos:
+        for r in p.iterchildren(qn('w:r')):
+            r[:] = [filho for filho in r if filho.tag == qn('w:rPr')]
+    for p in paragrafos[:max(0, len(paragrafos) - 51)]:
+        tc.remove(p)
+
+
+LIMPEZAS = {
+    'celula': lambda celula: limpar_tc(celula, remover_tabelas=True, paragrafo_vazio=True),
+    'paragrafos': limpar_tc,
+    'ate_51': _limpar_ate_51,
+    'nenhuma': lambda celula: None,
+}
+
+
+def preencher_faixas(documento, contrib_por_item, faixas, perfis=PERFIS, coluna=COLUNA_CONTRIBUICOES,
+                     chave=item_por_digitos, transbordo=None) -> dict:
+    """
+    Preenche, numa única passagem pelas linhas do documento, as células de todas as faixas de itens.
+
+    Args:
+        documento: Document do python-docx, já aberto.
+        contrib_por_item: Item -> contribuições (ArmazemContribuicoes ou dict de listas).
+        faixas (list): Pares (expressão da faixa, nome do perfil), na ordem de prioridade.
+        perfis (dict): Nome -> configuração ('fonte', 'tamanho', 'cor' e 'limpeza').
+        coluna (int): Coluna da grade com as contribuições.
+        chave (callable): Recebe o texto da célula do item e retorna o número do item ou None.
+        transbordo (AnexoTransbordo, opcional): Desvia para o anexo os itens acima dos limites;
+            o anexo é gravado (AnexoTransbordo.finalizar) ao fim do preenchimento.
+
+    Returns:
+        dict: Expressão da faixa -> quantidade de células preenchidas.
+    """
+    regras = []
+    for expressao, nome_perfil in faixas:
+        perfil = perfis[nome_perfil]
+        regras.append((expressao, interpretar_faixa(expressao), perfil, LIMPEZAS[perfil.get('limpeza', 'celula')]))
+
+    preenchidas = dict.fromkeys((expressao for expressao, *_ in regras), 0)
+    indice_linhas = IndiceLinhasWord.de_documento(documento, chave=chave)
+    for linha in indice_linhas.todas:
+        item = linha.item
+        if len(linha) <= coluna or item is None or item not in contrib_por_item:
+            continue
+        for expressao, pertence, perfil, limpar in regras:
+            if pertence(item):
+                celula = linha.celula(coluna)
+                limpar(celula)
+                if transbordo is None or not transbordo.preencher(celula, item, contrib_por_item[item]):
+                    renderizador = renderizador_do_documento(
+                        celula, perfil.get('fonte', 'Calibri'), perfil.get('tamanho', 8), perfil.get('cor', 'auto')
+                    )
+                    renderizador.preencher(celula, contrib_por_item[item])
+                preenchidas[expressao] += 1
+                break
+    if transbordo is not None:
+        transbordo.finalizar()
+    return preenchidas
+
+
+# ==============================================================================
+# 4. FUNÇÃO PRINCIPAL DE EXECUÇÃO
+# ==============================================================================
+
+def main() -> None:
+    """
+    Lê o Excel e o Word uma única vez, aplica todas as FAIXAS e grava um único documento.
+
+    Substitui a sequência 'ajusta visões.py', 'ajusta visões com título.py', 'importa 0 e maior
+    que 52.py', 'importa entre 4 e 26.py' e 'verifica cp.py', que abriam, preenchiam e salvavam
+    o documento cada um com o seu filtro.
+    """
+    try:
+        pertence = [interpretar_faixa(expressao) for expressao, _ in FAIXAS]
+        faltando = [nome for _, nome in FAIXAS if nome not in PERFIS]
+        if faltando:
+            raise ValueError(f"Perfis não definidos em PERFIS: {faltando}")
+    except ValueError as e:
+        logging.error(f"Configuração de FAIXAS inválida: {e}")
+        return
+
+    logging.info(f"Iniciando leitura do Excel: {ARQUIVO_EXCEL}")
+    try:
+        df = carregar_planilha(
+            ARQUIVO_EXCEL,
+            usecols=['Item CP alterado', 'Numero', 'Titulo da Contribuição ', 'Texto', 'Nome']
+        )
+    except Exception as e:
+        logging.exception(f"Falha na leitura do Excel: {e}")
+        return
+
+    # Um único armazém com os itens de todas as faixas
+    contrib_por_item = ArmazemContribuicoes.de_dataframe(
+        df, filtro_item=lambda item: any(teste(item) for teste in pertence)
+    )
+    if len(contrib_por_item) == 0:
+        logging.warning("Nenhum dado válido encontrado para as faixas configuradas!")
+        return
+    logging.info(f"Contribuições agrupadas para {len(contrib_por_item)} itens das faixas {[f for f, _ in FAIXAS]}.")
+
+    try:
+        doc = Document(ARQUIVO_WORD_ENTRADA)
+    except Exception as e:
+        logging.exception(f"Falha ao abrir documento Word: {e}")
+        return
+
+    transbordo = AnexoTransbordo(doc, **TRANSBORDO) if TRANSBORDO else None
+    preenchidas = preencher_faixas(doc, contrib_por_item, FAIXAS, transbordo=transbordo)
+    for expressao, nome_perfil in FAIXAS:
+        logging.info(f"Faixa '{expressao}' (perfil '{nome_perfil}'): {preenchidas[expressao]} células preenchidas.")
+    if transbordo is not None and transbordo.itens:
+        logging.info(f"{len(transbordo.itens)} itens extensos resumidos na tabela, com a íntegra no anexo.")
+
+    try:
+        doc.save(ARQUIVO_WORD_SAIDA)
+        logging.info(f"Documento salvo com sucesso: {ARQUIVO_WORD_SAIDA}")
+        logging.info(f"Total de itens atualizados: {sum(preenchidas.values())}")
+    except Exception as e:
+        logging.exception(f"Erro ao salvar documento: {e}")
+
+
+# ==============================================================================
+# 5. EXECUÇÃO
+# ==============================================================================
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+import hashlib
+import json
+import logging
+import os
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from cache_planilha import caminhos_cache
+from leitor_contribuicoes import COLUNAS_CONTRIBUICAO, ler_contribuicoes
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+# Incrementar sempre que o formato do estado mudar, para forçar uma ingestão completa.
+VERSAO_ESTADO = 2
+
+# Campos que entram na impressão digital do conteúdo (os itens são comparados à parte,
+# para distinguir uma contribuição editada de uma que só mudou de item).
+CAMPOS_IMPRESSAO = ('Titulo da Contribuição', 'texto', 'justificativa', 'nome')
+
+# Só a coluna de itens é obrigatória; as demais entram na impressão digital quando existem.
+COLUNAS_OBRIGATORIAS = ['Item CP alterado']
+COLUNAS_OPCIONAIS = [coluna for coluna in COLUNAS_CONTRIBUICAO if coluna not in COLUNAS_OBRIGATORIAS]
+
+
+# ==============================================================================
+# 2. IMPRESSÕES DIGITAIS
+# ==============================================================================
+
+def impressao_digital(registro) -> str:
+    """
+    Calcula o SHA-256 dos campos de texto de uma contribuição já normalizada.
+    """
+    conteudo = json.dumps([registro.get(campo, "") for campo in CAMPOS_IMPRESSAO], ensure_ascii=False)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+def resumir_contribuicao(registro) -> dict:
+    """
+    Resume um registro de ler_contribuicoes pelo seu número, itens, autor e impressão digital.
+    """
+    return {
+        'numero': registro.get('numero', "[sem número]"),
+        'itens': sorted(set(registro['itens'])),
+        'nome': registro.get('nome', "[autor desconhecido]"),
+        'impressao': impressao_digital(registro),
+    }
+
+
+def indexar_por_numero(resumos) -> dict:
+    """
+    Indexa os resumos das contribuições pelo número, sem depender da ordem das linhas.
+
+    Um número que aparece uma única vez é a própria chave. Os repetidos recebem como sufixo o
+    início do hash do conteúdo e dos itens ('CP-930603#1f2e3d4c5b6a'): reordenar a planilha não
+    troca as chaves entre as linhas repetidas. Só cópias idênticas ganham ainda um contador,
+    e a ordem entre elas não importa, já que são indistinguíveis.
+
+    Returns:
+        dict: chave -> {'itens': lista ordenada de int, 'nome': str, 'impressao': str}
+    """
+    ocorrencias = Counter(resumo['numero'] for resumo in resumos)
+    contribuicoes = {}
+    for resumo in resumos:
+        numero = resumo['numero']
+        chave = numero
+        if ocorrencias[numero] > 1:
+            conteudo = json.dumps([resumo['impressao'], resumo['itens']])
+            chave = base = f"{numero}#{hashlib.sha256(conteudo.encode('utf-8')).hexdigest()[:12]}"
+            copia = 2
+            while chave in contribuicoes:
+                chave = f"{base}#{copia}"
+                copia += 1
+        contribuicoes[chave] = {campo: valor for campo, valor in resumo.items() if campo != 'numero'}
+
+    repetidos = sum(n for n in ocorrencias.values() if n > 1)
+    if repetidos:
+        logging.warning(f"{repetidos} contribuições com número repetido na planilha; diferenciadas pelo conteúdo ('#...').")
+    return contribuicoes
+
+
+def contribuicoes_da_planilha(caminho_excel, sheet_name=0) -> dict:
+    """
+    Lê a planilha em fluxo e resume cada contribuição que cita algum item (ver indexar_por_numero).
+    """
+    registros = ler_contribuicoes(
+        caminho_excel, colunas=COLUNAS_OBRIGATORIAS, sheet_name=sheet_name, opcionais=COLUNAS_OPCIONAIS
+    )
+    return indexar_por_numero([resumir_contribuicao(registro) for registro in registros])
+
+
+class ColetorContribuicoes:
+    """
+    Resume as contribuições enquanto os registros seguem para outra etapa (por exemplo, o
+    ArmazemContribuicoes dos scripts 'importa'), para que a planilha seja lida uma única vez.
+    """
+
+    def __init__(self):
+        self._resumos = []
+
+    def acompanhar(self, registros, filtro_item=None, campos=None):
+        """
+        Entrega os registros, resumindo cada um antes de aplicar o filtro de item.
+
+        Args:
+            registros (iterable): Registros de ler_contribuicoes, lidos sem filtro e com as colunas
+                de COLUNAS_OPCIONAIS presentes, para que o resumo seja o de contribuicoes_da_planilha.
+            filtro_item (callable, opcional): Aplicado só aos itens dos registros entregues.
+            campos (iterable, opcional): Chaves mantidas nos registros entregues, além de 'itens'.
+
+        Yields:
+            dict: Registro com os itens filtrados; os que ficam sem nenhum item são omitidos.
+        """
+        for registro in registros:
+            self._resumos.append(resumir_contribuicao(registro))
+            itens = [item for item in registro['itens'] if filtro_item is None or filtro_item(item)]
+            if not itens:
+                continue
+            entregue = {chave: valor for chave, valor in registro.items() if campos is None or chave in campos}
+            entregue['itens'] = itens
+            yield entregue
+
+    def contribuicoes(self) -> dict:
+        return indexar_por_numero(self._resumos)
+
+
+def identificador_ingestao(contribuicoes):
+    """
+    SHA-256 das contribuições resumidas (chaves, itens, autores e impressões digitais).
+
+    Returns:
+        str | None: None se não houver contribuições (nenhuma ingestão anterior).
+    """
+    if not contribuicoes:
+        return None
+    conteudo = json.dumps(contribuicoes, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+# ==============================================================================
+# 3. CONJUNTO DE MUDANÇAS E AGREGADOS POR ITEM
+# ==============================================================================
+
+class Mudancas:
+    """
+    Diferença entre duas ingestões da planilha, por número de contribuição.
+
+    Uma contribuição pode estar ao mesmo tempo em 'modificadas' (texto, título, justificativa
+    ou autor alterados) e em 'movidas' (conjunto de itens alterado). 'ingestao_anterior' e
+    'ingestao_atual' identificam os dois estados comparados (ver identificador_ingestao): os
+    itens sujos só valem para quem processou exatamente a ingestão anterior.
+    """
+
+    def __init__(self, ingestao_anterior=None, ingestao_atual=None):
+        self.ingestao_anterior = ingestao_anterior
+        self.ingestao_atual = ingestao_atual
+        self.adicionadas = []
+        self.removidas = []
+        self.modificadas = []
+        self.movidas = {} # numero -> (itens antes, itens depois)
+        self.itens_sujos = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.adicionadas or self.removidas or self.modificadas or self.movidas)
+
+    def resumo(self) -> str:
+        return (f"{len(self.adicionadas)} adicionadas, {len(self.removidas)} removidas, "
+                f"{len(self.modificadas)} modificadas, {len(self.movidas)} movidas entre itens; "
+                f"{len(self.itens_sujos)} itens a reprocessar")
+
+
+def calcular_mudancas(anteriores, atuais) -> Mudancas:
+    """
+    Compara as contribuições da ingestão anterior com as atuais (ver contribuicoes_da_planilha).
+
+    Um item fica sujo quando ganha, perde ou tem alterada qualquer uma de suas contribuições;
+    numa contribuição movida, tanto os itens de origem quanto os de destino ficam sujos.
+    """
+    mudancas = Mudancas(identificador_ingestao(anteriores), identificador_ingestao(atuais))
+    for numero, atual in atuais.items():
+        anterior = anteriores.get(numero)
+        if anterior is None:
+            mudancas.adicionadas.append(numero)
+            mudancas.itens_sujos.update(atual['itens'])
+            continue
+        if anterior['impressao'] != atual['impressao']:
+            mudancas.modificadas.append(numero)
+            mudancas.itens_sujos.update(atual['itens'])
+        if anterior['itens'] != atual['itens']:
+            mudancas.movidas[numero] = (anterior['itens'], atual['itens'])
+            mudancas.itens_sujos.update(anterior['itens'])
+            mudancas.itens_sujos.update(atual['itens'])
+
+    for numero, anterior in anteriores.items():
+        if numero not in atuais:
+            mudancas.removidas.append(numero)
+            mudancas.itens_sujos.update(anterior['itens'])
+    return mudancas
+
+
+def atualizar_agregados(agregados, anteriores, atuais, mudancas, momento) -> dict:
+    """
+    Atualiza, só para as contribuições alteradas, os totais de cada item.
+
+    Args:
+        agregados (dict): item (int) -> {'quantidade', 'autores' (nome -> contagem), 'ultima_alteracao'}.
+                          É modificado no lugar.
+        anteriores (dict) / atuais (dict): Contribuições antes e depois (ver contribuicoes_da_planilha).
+        mudancas (Mudancas): Resultado de calcular_mudancas.
+        momento (str): Data/hora da ingestão, gravada em 'ultima_alteracao' dos itens sujos.
+
+    Returns:
+        dict: Os próprios agregados, atualizados.
+    """
+    alteradas = set(mudancas.adicionadas) | set(mudancas.removidas) | set(mudancas.modificadas) | set(mudancas.movidas)
+
+    for numero in alteradas:
+        anterior = anteriores.get(numero)
+        if anterior is not None:
+            for item in anterior['itens']:
+                agregado = agregados[item]
+                agregado['quantidade'] -= 1
+                agregado['autores'][anterior['nome']] -= 1
+
+    for numero in alteradas:
+        atual = atuais.get(numero)
+        if atual is not None:
+            for item in atual['itens']:
+                agregado = agregados.setdefault(item, {'quantidade': 0, 'autores': Counter(), 'ultima_alteracao': momento})
+                agregado['quantidade'] += 1
+                agregado['autores'][atual['nome']] += 1
+
+    for item in mudancas.itens_sujos:
+        agregado = agregados.get(item)
+        if agregado is None:
+            continue
+        if agregado['quantidade'] <= 0:
+            del agregados[item]
+            continue
+        agregado['autores'] = Counter({nome: n for nome, n in agregado['autores'].items() if n > 0})
+        agregado['ultima_alteracao'] = momento
+    return agregados
+
+
+# ==============================================================================
+# 4. ESTADO PERSISTIDO
+# ==============================================================================
+
+def caminho_estado(caminho_excel, sheet_name=0, pasta_cache=None) -> Path:
+    """
+    Arquivo .json com o estado da última ingestão, na mesma pasta do cache da planilha.
+    """
+    caminho_parquet, _ = caminhos_cache(caminho_excel, sheet_name, pasta_cache)
+    return caminho_parquet.with_name(f"{caminho_parquet.stem}__estado.json")
+
+
+def carregar_estado(caminho) -> dict:
+    """
+    Lê o estado salvo; retorna um estado vazio se não existir ou for de outra versão.
+    """
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            estado = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        estado = None
+    if not estado or estado.get("versao") != VERSAO_ESTADO:
+        return {"versao": VERSAO_ESTADO, "contribuicoes": {}, "agregados": {}}
+    # O JSON guarda as chaves como texto; os itens voltam a ser int e os autores, Counter.
+    estado["agregados"] = {
+        int(item): {**agregado, 'autores': Counter(agregado['autores'])}
+        for item, agregado in estado["agregados"].items()
+    }
+    return estado
+
+
+def salvar_estado(caminho, estado) -> None:
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_suffix(".json.tmp")
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+# ==============================================================================
+# 5. FUNÇÃO PRINCIPAL
+# ==============================================================================
+
+def reingerir_planilha(caminho_excel, sheet_name=0, pasta_cache=None, contribuicoes=None):
+    """
+    Compara a planilha com a ingestão anterior e atualiza o estado salvo.
+
+    Na primeira execução todas as contribuições aparecem como adicionadas. Nas seguintes, só
+    os itens em mudancas.itens_sujos precisam ser reprocessados pelas etapas seguintes.
+
+    Args:
+        caminho_excel (str | Path): Caminho da planilha .xlsx.
+        sheet_name (int | str): Aba a ser lida, como no pd.read_excel.
+        pasta_cache (str | Path, opcional): Pasta do cache e do estado. Padrão: ao lado da planilha.
+        contribuicoes (dict, opcional): Contribuições já resumidas durante outra leitura da mesma
+            planilha (ver ColetorContribuicoes). Se omitido, a planilha é lida em fluxo.
+
+    Returns:
+        tuple: (Mudancas, agregados por item)
+    """
+    atuais = contribuicoes if contribuicoes is not None else contribuicoes_da_planilha(caminho_excel, sheet_name)
+
+    arquivo_estado = caminho_estado(caminho_excel, sheet_name, pasta_cache)
+    estado = carregar_estado(arquivo_estado)
+    anteriores = estado["contribuicoes"]
+
+    mudancas = calcular_mudancas(anteriores, atuais)
+    agregados = estado["agregados"]
+    if mudancas:
+        momento = datetime.now().isoformat(timespec="seconds")
+        atualizar_agregados(agregados, anteriores, atuais, mudancas, momento)
+        salvar_estado(arquivo_estado, {"versao": VERSAO_ESTADO, "contribuicoes": atuais, "agregados": agregados})
+
+    logging.info(f"Reingestão de '{Path(caminho_excel).name}': {mudancas.resumo()}.")
+    return mudancas, agregados
@@ -0,0 +1,194 @@
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from docx.oxml.ns import qn
+
+from indice_linhas_word import item_por_digitos, texto_tc
+from renderizador_celulas import RenderizadorCelula, inserir_xml, renderizador_do_documento
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+# Abaixo desta quantidade de células, abrir processos custa mais do que renderizar em série.
+MINIMO_CELULAS_PARALELO = 40
+
+# Fatias por processo na divisão automática: fatias menores equilibram melhor a carga.
+FATIAS_POR_PROCESSO = 4
+
+RE_TITULO = re.compile(r'^\s*(TÍTULO\s+[IVXLCDM]+)\b', re.IGNORECASE)
+
+
+# ==============================================================================
+# 2. DIVISÃO DOS ITENS EM FATIAS
+# ==============================================================================
+
+def fatias_equilibradas(itens, pesos, quantidade) -> list:
+    """
+    Divide os itens, na ordem do documento, em até 'quantidade' fatias contíguas de peso parecido.
+
+    Args:
+        itens (list): Itens na ordem em que aparecem no documento.
+        pesos (dict): Item -> peso (por exemplo, a quantidade de contribuições).
+        quantidade (int): Número desejado de fatias.
+    """
+    total = sum(pesos[item] for item in itens)
+    alvo = total / max(quantidade, 1)
+    fatias, atual, acumulado = [], [], 0
+    for item in itens:
+        atual.append(item)
+        acumulado += pesos[item]
+        if acumulado >= alvo * (len(fatias) + 1) and len(fatias) < quantidade - 1:
+            fatias.append(atual)
+            atual = []
+    if atual:
+        fatias.append(atual)
+    return fatias
+
+
+def fatias_por_faixas(itens, faixas) -> list:
+    """
+    Uma fatia por faixa de itens (ex.: [range(0, 1), range(4, 27), range(53, 1000)], como os filtros
+    dos scripts 'importa'). Os itens fora de todas as faixas formam uma última fatia.
+    """
+    fatias = [[] for _ in faixas]
+    restantes = []
+    for item in itens:
+        for fatia, faixa in zip(fatias, faixas):
+            if item in faixa:
+                fatia.append(item)
+                break
+        else:
+            restantes.append(item)
+    return [fatia for fatia in fatias + [restantes] if fatia]
+
+
+def titulos_por_item(documento, chave=item_por_digitos, coluna_item=0) -> dict:
+    """
+    Associa cada item ao TÍTULO do decreto em que ele está na tabela do Word.
+
+    As linhas são percorridas na ordem do documento; uma célula que começa com 'TÍTULO <romano>'
+    abre um novo título, que vale para a própria linha e para as seguintes.
+    """
+    titulos = {}
+    titulo_atual = ""
+    for tr in documento.element.body.iter(qn('w:tr')):
+        textos = [texto_tc(tc) for tc in tr.iterchildren(qn('w:tc'))]
+        for texto in textos:
+            encontrado = RE_TITULO.match(texto)
+            if encontrado:
+                titulo_atual = encontrado.group(1).upper()
+                break
+        if len(textos) > coluna_item and textos[coluna_item]:
+            item = chave(textos[coluna_item])
+            if item is not None:
+                titulos.setdefault(item, titulo_atual)
+    return titulos
+
+
+def fatias_por_titulo(itens, titulos) -> list:
+    """
+    Uma fatia por TÍTULO (ver titulos_por_item), na ordem em que os títulos aparecem.
+    """
+    por_titulo = {}
+    for item in itens:
+        por_titulo.setdefault(titulos.get(item, ""), []).append(item)
+    return list(por_titulo.values())
+
+
+# ==============================================================================
+# 3. RENDERIZAÇÃO NOS PROCESSOS
+# ==============================================================================
+
+@lru_cache(maxsize=None)
+def _renderizador_do_processo(fonte, tamanho, estilos) -> RenderizadorCelula:
+    return RenderizadorCelula(fonte, tamanho, estilos=dict(estilos) if estilos else None)
+
+
+def renderizar_fatia(fonte, tamanho, estilos, contribuicoes_por_item) -> list:
+    """
+    Gera o XML das células de uma fatia (executada num processo separado).
+
+    Args:
+        fonte (str) / tamanho (float): Configuração do renderizador.
+        estilos (tuple): Pares (chave, styleId) já registrados no documento pelo processo principal.
+        contribuicoes_por_item (list): Pares (item, lista de dicts de contribuição).
+
+    Returns:
+        list: Pares (item, XML dos parágrafos), na mesma ordem recebida.
+    """
+    renderizador = _renderizador_do_processo(fonte, tamanho, estilos)
+    return [(item, renderizador.xml_contribuicoes(contribuicoes)) for item, contribuicoes in contribuicoes_por_item]
+
+
+# ==============================================================================
+# 4. PREENCHIMENTO EM PARALELO
+# ==============================================================================
+
+def preencher_em_paralelo(documento, linhas, contrib_por_item, coluna=2, fonte='Calibri', tamanho=8, cor='auto',
+                          fatias=None, max_processos=None, limpar=None) -> int:
+    """
+    Preenche a coluna das contribuições renderizando o XML das células em vários processos.
+
+    Os estilos são registrados no documento pelo processo principal (como no caminho em série);
+    cada processo recebe uma fatia dos itens e devolve só o texto XML das células. A junção é
+    feita no processo principal, na ordem das linhas, com o mesmo inserir_xml do caminho em
+    série, de modo que o documento gravado é idêntico byte a byte ao da execução em série.
+
+    Nos scripts 'importa', o modo é opcional (PROCESSOS_RENDERIZACAO, padrão 1, em série): o ganho
+    com 2 e 4 processos ainda precisa ser medido numa máquina com vários núcleos.
+
+    Args:
+        documento: Document do python-docx.
+        linhas (iterable): LinhaWord na ordem do documento (ex.: IndiceLinhasWord.todas).
+        contrib_por_item: Item -> contribuições (ArmazemContribuicoes ou dict de listas).
+        coluna (int): Coluna da grade a preencher.
+        fonte (str) / tamanho (float) / cor (str): Configuração dos estilos (ex.: ESTILOS_CONTRIBUICAO).
+        fatias: None para a divisão automática por volume de contribuições, 'titulo' para uma fatia
+            por TÍTULO do decreto, ou uma lista de faixas de itens (ex.: [range(4, 27), range(53, 1000)]).
+        max_processos (int, opcional): Limite de processos. Padrão: número de CPUs.
+        limpar (callable, opcional): Aplicado a cada célula antes da inserção (ex.: clear_cell).
+
+    Returns:
+        int: Quantidade de células preenchidas.
+    """
+    alvos = [linha for linha in linhas
+             if len(linha) > coluna and linha.item is not None and linha.item in contrib_por_item]
+    if not alvos:
+        return 0
+
+    itens = list(dict.fromkeys(linha.item for linha in alvos)) # Ordem do documento, sem repetição
+    renderizador = renderizador_do_documento(documento, fonte, tamanho, cor)
+    estilos = tuple(renderizador.estilos.items()) if renderizador.estilos else None
+
+    processos = max_processos or os.cpu_count() or 1
+    if processos > 1 and len(alvos) >= MINIMO_CELULAS_PARALELO:
+        pesos = {item: len(contrib_por_item[item]) for item in itens}
+        if fatias is None:
+            divisao = fatias_equilibradas(itens, pesos, processos * FATIAS_POR_PROCESSO)
+        elif fatias == 'titulo':
+            divisao = fatias_por_titulo(itens, titulos_por_item(documento))
+        else:
+            divisao = fatias_por_faixas(itens, fatias)
+        processos = min(processos, len(divisao))
+        logging.info(f"Renderizando {len(itens)} itens em {len(divisao)} fatias com {processos} processos.")
+
+        tarefas = [[(item, list(contrib_por_item[item])) for item in fatia] for fatia in divisao]
+        xml_por_item = {}
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            for resultado in executor.map(renderizar_fatia, [fonte] * len(tarefas), [tamanho] * len(tarefas),
+                                          [estilos] * len(tarefas), tarefas):
+                xml_por_item.update(resultado)
+    else:
+        xml_por_item = {item: renderizador.xml_contribuicoes(contrib_por_item[item]) for item in itens}
+
+    for linha in alvos:
+        celula = linha.celula(coluna)
+        if limpar is not None:
+            limpar(celula)
+        inserir_xml(celula, xml_por_item[linha.item])
+    logging.info(f"{len(alvos)} células preenchidas com as contribuições de {len(itens)} itens.")
+    return len(alvos)
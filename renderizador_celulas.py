@@ -0,0 +1,229 @@
+import logging
+import weakref
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import nsdecls, qn
+from docx.shared import Pt, RGBColor
+from docx.text.font import Font
+from lxml import etree
+
+from estilos_documento import registrar_estilos_visoes
+
+# Cor dos hiperlinks (a mesma do estilo 'Hyperlink' do Word).
+COR_LINK = RGBColor(0x05, 0x63, 0xC1)
+
+# Renderizadores com estilos já registrados, por documento (DocumentPart) e configuração.
+_RENDERIZADORES_DOCUMENTO = weakref.WeakKeyDictionary()
+
+# ==============================================================================
+# 1. LIMPEZA DA CÉLULA
+# ==============================================================================
+
+def limpar_tc(celula, remover_tabelas=False, paragrafo_vazio=False) -> None:
+    """
+    Remove os parágrafos de uma célula (w:tc) numa única operação sobre os filhos do XML.
+
+    Args:
+        celula: Cell do python-docx ou o próprio elemento w:tc.
+        remover_tabelas (bool): Remove também as tabelas aninhadas (como o clear_cell dos importadores).
+        paragrafo_vazio (bool): Deixa um parágrafo vazio no final, como o cell.add_paragraph() do clear_cell.
+    """
+    tc = getattr(celula, '_tc', celula)
+    removidos = {qn('w:p'), qn('w:tbl')} if remover_tabelas else {qn('w:p')}
+    tc[:] = [filho for filho in tc if filho.tag not in removidos]
+    if paragrafo_vazio:
+        tc.append(OxmlElement('w:p'))
+
+
+# ==============================================================================
+# 2. RENDERIZADOR
+# ==============================================================================
+
+class RenderizadorCelula:
+    """
+    Monta o conteúdo da coluna "Visões das contribuições" direto em XML.
+
+    Os modelos de cada parágrafo (número em negrito, título, texto, autor em itálico e a linha
+    separadora) são gerados uma única vez e guardados como texto. Para cada célula, os
+    parágrafos de todas as contribuições são concatenados e convertidos em elementos com um
+    único parse_xml, em vez de quatro ou cinco add_paragraph/add_run por contribuição.
+
+    Com 'estilos' (ver renderizador_do_documento), cada parágrafo só referencia um estilo
+    registrado no documento (<w:pStyle>) e os runs ficam sem propriedades. Sem 'estilos', a
+    fonte e o tamanho vão em cada run, com XML idêntico ao do antigo caminho python-docx.
+    """
+
+    def __init__(self, fonte='Calibri', tamanho=8, estilos=None):
+        self.fonte = fonte
+        self.tamanho = tamanho
+        self.estilos = estilos
+        self._rpr_link = None # Gerado só se algum parágrafo com hiperlink for pedido
+        if estilos:
+            self._rpr_normal = self._rpr_negrito = self._rpr_italico = ''
+            self._ppr = {chave: f'<w:pPr><w:pStyle w:val="{id_estilo}"/></w:pPr>'
+                         for chave, id_estilo in estilos.items()}
+            self._separador = f"<w:p>{self._ppr['separador']}</w:p>"
+        else:
+            self._rpr_normal = self._modelo_rpr()
+            self._rpr_negrito = self._modelo_rpr(bold=True)
+            self._rpr_italico = self._modelo_rpr(italic=True)
+            self._ppr = dict.fromkeys(('numero', 'titulo', 'texto', 'autor'), '')
+            self._separador = self._modelo_separador()
+
+    # --- Modelos (gerados uma vez) ---
+
+    def _modelo_rpr(self, bold=None, italic=None, link=False) -> str:
+        r = OxmlElement('w:r')
+        font = Font(r)
+        if not (link and self.estilos): # Com estilos, o run do link só leva a cor e o sublinhado
+            font.name = self.fonte
+            font.size = Pt(self.tamanho)
+        if bold:
+            font.bold = True
+        if italic:
+            font.italic = True
+        if link:
+            font.color.rgb = COR_LINK
+            font.underline = True
+        return self._serializar(r.rPr)
+
+    @staticmethod
+    def _modelo_separador() -> str:
+        p = OxmlElement('w:p')
+        p_bdr = OxmlElement('w:pBdr')
+        p.get_or_add_pPr().append(p_bdr)
+        bottom_border = OxmlElement('w:bottom')
+        bottom_border.set(qn('w:val'), 'single')
+        bottom_border.set(qn('w:sz'), '6')
+        bottom_border.set(qn('w:space'), '1')
+        bottom_border.set(qn('w:color'), 'auto')
+        p_bdr.append(bottom_border)
+        return RenderizadorCelula._serializar(p)
+
+    @staticmethod
+    def _serializar(elemento) -> str:
+        # Sem as declarações de namespace: o fragmento é embrulhado num único elemento que as declara.
+        xml = etree.tostring(elemento, encoding='unicode')
+        return xml.replace(f' {nsdecls("w")}', '', 1)
+
+    # --- Conteúdo dos runs (mesmas regras do run.text do python-docx) ---
+
+    @staticmethod
+    def _conteudo_run(texto) -> str:
+        partes = []
+        buffer = []
+
+        def descarregar():
+            if buffer:
+                trecho = "".join(buffer)
+                espaco = ' xml:space="preserve"' if len(trecho.strip()) < len(trecho) else ''
+                partes.append(f'<w:t{espaco}>{escape(trecho)}</w:t>')
+                buffer.clear()
+
+        for caractere in texto:
+            if caractere == '\t':
+                descarregar()
+                partes.append('<w:tab/>')
+            elif caractere in '\r\n':
+                descarregar()
+                partes.append('<w:br/>')
+            else:
+                buffer.append(caractere)
+        descarregar()
+        return "".join(partes)
+
+    def _paragrafo(self, chave, rpr, texto) -> str:
+        if self.estilos and not texto:
+            return f'<w:p>{self._ppr[chave]}</w:p>'
+        return f'<w:p>{self._ppr[chave]}<w:r>{rpr}{self._conteudo_run(texto) if texto else ""}</w:r></w:p>'
+
+    def xml_paragrafo(self, chave, texto, ancora=None, r_id=None) -> str:
+        """
+        XML de um parágrafo avulso com a formatação de uma das partes da contribuição.
+
+        Args:
+            chave (str): 'numero' (negrito), 'titulo', 'texto' ou 'autor' (itálico).
+            texto (str): Conteúdo do parágrafo.
+            ancora (str, opcional): Nome de um indicador (bookmark); o texto vira um hiperlink para ele.
+            r_id (str, opcional): Relação externa do hiperlink, quando o indicador está em outro documento.
+        """
+        if ancora is None:
+            rpr = {'numero': self._rpr_negrito, 'autor': self._rpr_italico}.get(chave, self._rpr_normal)
+            return self._paragrafo(chave, rpr, texto)
+        if self._rpr_link is None:
+            self._rpr_link = self._modelo_rpr(link=True)
+        destino = f' r:id="{r_id}"' if r_id else ''
+        return (f'<w:p>{self._ppr[chave]}<w:hyperlink{destino} w:anchor="{escape(ancora)}" w:history="1">'
+                f'<w:r>{self._rpr_link}{self._conteudo_run(texto)}</w:r></w:hyperlink></w:p>')
+
+    # --- API ---
+
+    def xml_contribuicoes(self, contribuicoes) -> str:
+        """
+        Retorna o XML (sem declarações de namespace) dos parágrafos de todas as contribuições.
+        """
+        partes = []
+        ultimo = len(contribuicoes) - 1
+        for idx, contrib in enumerate(contribuicoes):
+            partes.append(self._paragrafo('numero', self._rpr_negrito, contrib['numero']))
+            partes.append(self._paragrafo('titulo', self._rpr_normal, contrib['Titulo da Contribuição']))
+            # cell.add_paragraph(texto) não cria run quando o texto é vazio
+            texto = contrib['texto']
+            partes.append(self._paragrafo('texto', self._rpr_normal, texto) if texto else f"<w:p>{self._ppr['texto']}</w:p>")
+            partes.append(self._paragrafo('autor', self._rpr_italico, f"({contrib['nome']})"))
+            if idx < ultimo:
+                partes.append(self._separador)
+        return "".join(partes)
+
+    def preencher(self, celula, contribuicoes) -> None:
+        """
+        Acrescenta ao final da célula os parágrafos das contribuições (sem limpar o conteúdo atual).
+
+        Args:
+            celula: Cell do python-docx ou o próprio elemento w:tc.
+            contribuicoes (list): Dicts com 'numero', 'Titulo da Contribuição', 'texto' e 'nome'.
+        """
+        if not len(contribuicoes):
+            return
+        inserir_xml(celula, self.xml_contribuicoes(contribuicoes))
+        logging.debug(f"Célula preenchida com {len(contribuicoes)} contribuições.")
+
+
+def inserir_xml(celula, xml) -> None:
+    """
+    Acrescenta ao final da célula os parágrafos de um XML gerado por xml_contribuicoes.
+
+    Args:
+        celula: Cell do python-docx ou o próprio elemento w:tc.
+        xml (str): Fragmento sem declarações de namespace (pode vir de outro processo).
+    """
+    tc = getattr(celula, '_tc', celula)
+    fragmento = parse_xml(f'<w:tc {nsdecls("w", "r")}>{xml}</w:tc>')
+    tc.extend(list(fragmento))
+
+
+@lru_cache(maxsize=None)
+def obter_renderizador(fonte='Calibri', tamanho=8) -> RenderizadorCelula:
+    """
+    Renderizador com os modelos já montados para a fonte e o tamanho pedidos (formatação em cada run).
+    """
+    return RenderizadorCelula(fonte, tamanho)
+
+
+def renderizador_do_documento(documento, fonte='Calibri', tamanho=8, cor='auto') -> RenderizadorCelula:
+    """
+    Renderizador que usa estilos de parágrafo registrados uma vez no documento.
+
+    Args:
+        documento: Document do python-docx, a DocumentPart ou uma célula (usa celula.part).
+        fonte (str) / tamanho (float) / cor (str): Configuração dos estilos (ex.: ESTILOS_CONTRIBUICAO).
+    """
+    parte = documento.part
+    por_configuracao = _RENDERIZADORES_DOCUMENTO.setdefault(parte, {})
+    chave = (fonte, tamanho, cor)
+    if chave not in por_configuracao:
+        estilos = registrar_estilos_visoes(parte, fonte, tamanho, cor)
+        por_configuracao[chave] = RenderizadorCelula(fonte, tamanho, estilos=estilos)
+    return por_configuracao[chave]
@@ -0,0 +1,338 @@
+import json
+import logging
+import re
+from collections import Counter
+from datetime import datetime
+from difflib import SequenceMatcher
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import pandas as pd
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+from cartas_resposta import texto_para_xml
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+
+BASE_DIR = Path(__file__).parent
+ARQUIVO_DECRETO = BASE_DIR / "decreto.json"
+ARQUIVO_PROPOSTAS = BASE_DIR / "contribuicoes_formatadas.xlsx" # Gerado por 'CP-organiza.py'
+ARQUIVO_SAIDA = BASE_DIR / "propostas_com_revisoes.docx"
+
+AUTOR_REVISAO = "Análise da Consulta Pública"
+
+# Marcador de item em decreto.json: "<número do item> <quantidade de contribuições>" numa linha própria.
+RE_MARCADOR_ITEM = re.compile(r'^(\d+)\s+(\d+)\s*$')
+
+# Tokens de palavra: cada palavra (ou sinal de pontuação) leva junto os espaços que a seguem, de modo
+# que a concatenação dos tokens devolve o texto original e os espaços não viram âncoras do diff.
+RE_TOKEN = re.compile(r'\s+|\w+\s*|[^\w\s]\s*')
+
+# Dispositivo ('Art. 2º, inciso I', '§ 1º do art. 5º', 'alínea "a"') e início do texto de cada item.
+RE_ARTIGO = re.compile(r'\bArt(?:igo|\.)?\s*(\d+)', re.IGNORECASE)
+RE_PARAGRAFO = re.compile(r'§\s*(\d+)|par[áa]grafo\s+[úu]nico', re.IGNORECASE)
+RE_INCISO = re.compile(r'\binciso\s+([IVXLCDM]+)\b', re.IGNORECASE)
+RE_ALINEA = re.compile(r'\bal[íi]nea\s*["“\']?([a-z])\b', re.IGNORECASE)
+RE_INICIO_INCISO = re.compile(r'^([IVXLCDM]+)\s*[-–.]')
+RE_INICIO_ALINEA = re.compile(r'^([a-z])\)')
+
+
+# ==============================================================================
+# 2. ITENS DO DECRETO
+# ==============================================================================
+
+def _chave_paragrafo(encontrado):
+    return encontrado.group(1) if encontrado.group(1) else "único"
+
+
+def itens_do_decreto(texto_decreto) -> dict:
+    """
+    Separa o texto de decreto.json em itens, com a posição de cada um na estrutura do decreto.
+
+    Returns:
+        dict: Número do item -> {'texto': str, 'dispositivo': (artigo, parágrafo, inciso, alínea)}.
+            Partes ausentes do dispositivo ficam como None.
+    """
+    itens = {}
+    item_atual, linhas_item = None, []
+    artigo = paragrafo = inciso = alinea = None
+
+    def fechar_item():
+        nonlocal artigo, paragrafo, inciso, alinea
+        texto = " ".join(linhas_item).strip()
+        if item_atual is None or not texto:
+            return
+        if (encontrado := RE_ARTIGO.match(texto)):
+            artigo, paragrafo, inciso, alinea = encontrado.group(1), None, None, None
+        elif (encontrado := RE_PARAGRAFO.match(texto)):
+            paragrafo, inciso, alinea = _chave_paragrafo(encontrado), None, None
+        elif (encontrado := RE_INICIO_INCISO.match(texto)):
+            inciso, alinea = encontrado.group(1).upper(), None
+        elif (encontrado := RE_INICIO_ALINEA.match(texto)):
+            alinea = encontrado.group(1).lower()
+        itens[item_atual] = {'texto': texto, 'dispositivo': (artigo, paragrafo, inciso, alinea)}
+
+    for linha in texto_decreto.split("\n"):
+        linha = linha.strip()
+        marcador = RE_MARCADOR_ITEM.match(linha)
+        if marcador:
+            fechar_item()
+            item_atual, linhas_item = int(marcador.group(1)), []
+        elif not linha:
+            fechar_item()
+            item_atual, linhas_item = None, [] # O item termina no primeiro parágrafo em branco
+        elif item_atual is not None:
+            linhas_item.append(linha)
+    fechar_item()
+    return itens
+
+
+def dispositivo_da_referencia(referencia):
+    """
+    'Art. 2º, inciso I' -> ('2', None, 'I', None). Partes não citadas ficam como None.
+    """
+    referencia = str(referencia or "")
+    artigo = RE_ARTIGO.search(referencia)
+    paragrafo = RE_PARAGRAFO.search(referencia)
+    inciso = RE_INCISO.search(referencia)
+    alinea = RE_ALINEA.search(referencia)
+    return (
+        artigo.group(1) if artigo else None,
+        _chave_paragrafo(paragrafo) if paragrafo else None,
+        inciso.group(1).upper() if inciso else None,
+        alinea.group(1).lower() if alinea else None,
+    )
+
+
+# ==============================================================================
+# 3. TOKENS E DIFERENÇAS
+# ==============================================================================
+
+class CacheTokens:
+    """
+    Tokenização com cache: cada texto é quebrado uma única vez, e cada token distinto vira um inteiro.
+
+    O diff compara tuplas de inteiros (hash e comparação baratos) e as diferenças de um par
+    (original, proposta) também ficam guardadas, para pares repetidos entre contribuições.
+    """
+
+    def __init__(self):
+        self.termos = [] # Id -> token
+        self._ids = {} # Token -> id
+        self._por_texto = {} # Texto -> tupla de ids
+        self._diferencas = {}
+
+    def tokens(self, texto) -> tuple:
+        ids = self._por_texto.get(texto)
+        if ids is None:
+            ids = []
+            for termo in RE_TOKEN.findall(texto):
+                id_termo = self._ids.get(termo)
+                if id_termo is None:
+                    id_termo = self._ids[termo] = len(self.termos)
+                    self.termos.append(termo)
+                ids.append(id_termo)
+            ids = self._por_texto[texto] = tuple(ids)
+        return ids
+
+    def _texto(self, ids) -> str:
+        return "".join(self.termos[i] for i in ids)
+
+    def diferencas(self, original, proposta) -> list:
+        """
+        Diferenças palavra a palavra entre dois textos.
+
+        O prefixo e o sufixo comuns (a maior parte de um artigo longo com uma alteração pontual)
+        são retirados antes do SequenceMatcher, que só compara o trecho do meio.
+
+        Returns:
+            list: Trechos (operação, texto), com operação 'igual', 'removido' ou 'inserido'.
+        """
+        chave = (original, proposta)
+        if chave in self._diferencas:
+            return self._diferencas[chave]
+        a, b = self.tokens(original), self.tokens(proposta)
+
+        inicio = 0
+        limite = min(len(a), len(b))
+        while inicio < limite and a[inicio] == b[inicio]:
+            inicio += 1
+        fim = 0
+        while fim < limite - inicio and a[-1 - fim] == b[-1 - fim]:
+            fim += 1
+        meio_a, meio_b = a[inicio:len(a) - fim], b[inicio:len(b) - fim]
+
+        trechos = []
+        if inicio:
+            trechos.append(('igual', a[:inicio]))
+        for operacao, i1, i2, j1, j2 in SequenceMatcher(None, meio_a, meio_b, autojunk=False).get_opcodes():
+            if operacao == 'equal':
+                trechos.append(('igual', meio_a[i1:i2]))
+                continue
+            if i2 > i1:
+                trechos.append(('removido', meio_a[i1:i2]))
+            if j2 > j1:
+                trechos.append(('inserido', meio_b[j1:j2]))
+        if fim:
+            trechos.append(('igual', a[len(a) - fim:]))
+
+        resultado = self._diferencas[chave] = [(operacao, self._texto(ids)) for operacao, ids in trechos]
+        return resultado
+
+    def item_mais_parecido(self, texto, candidatos) -> int:
+        """
+        Item cujo texto tem mais tokens em comum com 'texto' (usado quando o dispositivo não é reconhecido).
+
+        Args:
+            candidatos (dict): Número do item -> texto.
+        """
+        alvo = Counter(self.tokens(texto))
+        return max(candidatos, key=lambda item: sum((alvo & Counter(self.tokens(candidatos[item]))).values()))
+
+
+# ==============================================================================
+# 4. REVISÕES (w:ins / w:del)
+# ==============================================================================
+
+def _conteudo_run(texto, tag) -> str:
+    return '<w:br/>'.join(f'<{tag} xml:space="preserve">{escape(parte)}</{tag}>' for parte in texto.split("\n"))
+
+
+class RenderizadorRevisoes:
+    """
+    Gera parágrafos com revisões controladas de verdade: o Word mostra a proposta como alterações
+    (aceitar/rejeitar) sobre a redação original.
+
+    Os w:id das revisões são únicos no documento inteiro, como o Word exige.
+    """
+
+    def __init__(self, autor=AUTOR_REVISAO, data=None):
+        self.autor = escape(autor, {'"': "&quot;"})
+        self.data = (data or datetime.now()).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self._proximo_id = 1
+
+    def _atributos(self) -> str:
+        atributos = f'w:id="{self._proximo_id}" w:author="{self.autor}" w:date="{self.data}"'
+        self._proximo_id += 1
+        return atributos
+
+    def xml_paragrafo(self, trechos) -> str:
+        partes = []
+        for operacao, texto in trechos:
+            if operacao == 'igual':
+                partes.append(f'<w:r>{_conteudo_run(texto, "w:t")}</w:r>')
+            elif operacao == 'removido':
+                partes.append(f'<w:del {self._atributos()}><w:r>{_conteudo_run(texto, "w:delText")}</w:r></w:del>')
+            else:
+                partes.append(f'<w:ins {self._atributos()}><w:r>{_conteudo_run(texto, "w:t")}</w:r></w:ins>')
+        return f'<w:p>{"".join(partes)}</w:p>'
+
+
+def _preencher_celula(celula, xml_paragrafos) -> None:
+    tc = celula._tc
+    for p in tc.findall(qn('w:p')):
+        tc.remove(p)
+    tc.extend(list(parse_xml(f'<w:tc {nsdecls("w")}>{xml_paragrafos}</w:tc>')))
+
+
+# ==============================================================================
+# 5. PROCESSAMENTO EM LOTE
+# ==============================================================================
+
+def comparar_propostas(itens, propostas, cache=None) -> list:
+    """
+    Associa cada proposta ao item original e calcula as diferenças de todas de uma vez.
+
+    Args:
+        itens (dict): Saída de itens_do_decreto.
+        propostas (pd.DataFrame): Colunas 'Número da Contribuição', 'Dispositivo' e 'Proposta de Redação Acolhida'
+            (e, opcionalmente, 'Item', que dispensa a busca pelo dispositivo).
+        cache (CacheTokens, opcional): Cache compartilhado entre chamadas.
+
+    Returns:
+        list: Dicts com 'numero', 'dispositivo', 'item', 'diferencas' e 'alterados' (tokens removidos + inseridos).
+    """
+    cache = cache or CacheTokens()
+    por_dispositivo = {}
+    for item, dados in itens.items():
+        por_dispositivo.setdefault(dados['dispositivo'], item) # O primeiro item de cada dispositivo (o caput)
+
+    resultados = []
+    for _, linha in propostas.iterrows():
+        # Quebras de linha/página do Word coladas no Excel viram '\n' e os demais caracteres proibidos
+        # em XML saem antes da tokenização, para que o diff e o documento vejam o mesmo texto.
+        proposta = texto_para_xml(linha.get('Proposta de Redação Acolhida') or "").strip()
+        if not proposta or proposta.lower() == "nan":
+            continue
+        dispositivo = texto_para_xml(linha.get('Dispositivo') or "")
+
+        item = None
+        if str(linha.get('Item', "")).strip().isdigit():
+            item = int(str(linha['Item']).strip())
+        if item not in itens:
+            chave = dispositivo_da_referencia(dispositivo)
+            item = por_dispositivo.get(chave)
+            if item is None:
+                # Dispositivo não reconhecido: o item mais parecido, dentro do artigo citado quando houver.
+                candidatos = {i: d['texto'] for i, d in itens.items() if chave[0] is None or d['dispositivo'][0] == chave[0]}
+                item = cache.item_mais_parecido(proposta, candidatos or {i: d['texto'] for i, d in itens.items()})
+                logging.warning(f"{linha.get('Número da Contribuição')}: dispositivo '{dispositivo}' não localizado; "
+                                f"usando o item {item}, o de texto mais parecido.")
+
+        diferencas = cache.diferencas(texto_para_xml(itens[item]['texto']), proposta)
+        resultados.append({
+            'numero': texto_para_xml(linha.get('Número da Contribuição') or ""),
+            'dispositivo': dispositivo,
+            'item': item,
+            'diferencas': diferencas,
+            'alterados': sum(len(cache.tokens(texto)) for operacao, texto in diferencas if operacao != 'igual'),
+        })
+    return resultados
+
+
+def gravar_documento_revisoes(resultados, caminho_saida, autor=AUTOR_REVISAO) -> None:
+    """
+    Grava uma tabela (contribuição, dispositivo, item, redação com as revisões) no .docx de saída.
+    """
+    renderizador = RenderizadorRevisoes(autor)
+    doc = Document()
+    doc.add_heading("Propostas de redação acolhidas – alterações sobre a minuta", level=1)
+    tabela = doc.add_table(rows=1, cols=4)
+    tabela.style = 'Table Grid'
+    for celula, titulo in zip(tabela.rows[0].cells, ["Contribuição", "Dispositivo", "Item", "Redação proposta (revisões)"]):
+        celula.paragraphs[0].add_run(titulo).bold = True
+    for resultado in resultados:
+        celulas = tabela.add_row().cells
+        celulas[0].text = resultado['numero']
+        celulas[1].text = resultado['dispositivo']
+        celulas[2].text = str(resultado['item'])
+        _preencher_celula(celulas[3], renderizador.xml_paragrafo(resultado['diferencas']))
+    doc.save(caminho_saida)
+
+
+# ==============================================================================
+# 6. EXECUÇÃO
+# ==============================================================================
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    try:
+        with open(ARQUIVO_DECRETO, encoding="utf-8") as f:
+            itens = itens_do_decreto(json.load(f)["conteudo_decreto"])
+        propostas = pd.read_excel(ARQUIVO_PROPOSTAS, dtype=str)
+    except Exception as e:
+        logging.exception(f"Falha ao ler os dados de entrada: {e}")
+        return
+    logging.info(f"{len(itens)} itens no decreto e {len(propostas)} propostas em {ARQUIVO_PROPOSTAS.name}.")
+
+    resultados = comparar_propostas(itens, propostas)
+    gravar_documento_revisoes(resultados, ARQUIVO_SAIDA)
+    logging.info(f"{len(resultados)} propostas gravadas com revisões em {ARQUIVO_SAIDA}")
+
+
+if __name__ == "__main__":
+    main()
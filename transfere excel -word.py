@@ -1,8 +1,11 @@
 import pandas as pd
 from docx import Document
-from docx.shared import Pt
 from docx.shared import RGBColor
 
+from estilos_documento import estilo_celula
+from indice_itens import ItemIndex
+from indice_linhas_word import IndiceLinhasWord, item_somente_digitos
+
 # Definir caminhos dos arquivos
 arquivo_excel = r"W:\MINISTÉRIO DAS CIDADES\Consulta 7217\python\Consideracoes-sobre-a-Consulta_Publica_Decreto_7217.2010.xlsx"
 arquivo_word_saida = r"W:\MINISTÉRIO DAS CIDADES\Consulta 7217\python\saida.docx"
@@ -34,58 +37,40 @@ if df.empty:
 # Substituir _x000D_ por aspas "
 df = df.replace(r'_x000D_', '"', regex=True)
 
-# Converter "Item CP alterado" para números e filtrar a partir do item 100
-df["Item CP alterado"] = pd.to_numeric(df["Item CP alterado"], errors="coerce")
-df = df.dropna(subset=["Item CP alterado"])
-df["Item CP alterado"] = df["Item CP alterado"].astype(int)
-df = df[df["Item CP alterado"] >= 100]
-
-# Agrupar contribuições corretamente
-df_contribuicoes_agrupado = df.groupby("Item CP alterado").agg({
-    "Numero": lambda x: ", ".join(x.astype(str)),
-    "Texto": lambda x: "\n".join(x),
-    "Justificativa": lambda x: "\n".join(x),
-    "Nome": lambda x: ", ".join(x)
-}).reset_index()
+# Indexar as contribuições por item (a partir do item 100); "12, 13" conta para os dois itens
+indice = ItemIndex.de_dataframe(df, filtro_item=lambda item: item >= 100)
 
 # Abrir o documento Word
 doc = Document(arquivo_word_saida)
 
-# Iterar pelas tabelas do documento para encontrar o local correto
-for table in doc.tables:
-    for row in table.rows:
-        item_cp_cell = row.cells[0].text.strip()  # Coluna "Item" no Word
-
-        # Verificar se "Item" do Word corresponde ao "Item CP alterado"
-        if item_cp_cell.isdigit():
-            item_cp = int(item_cp_cell)
-
-            # Encontrar as contribuições associadas
-            matching_row = df_contribuicoes_agrupado[df_contribuicoes_agrupado["Item CP alterado"] == item_cp]
-
-            if not matching_row.empty:
-                # Adicionar "Item CP alterado"
-                row.cells[0].text = str(matching_row["Item CP alterado"].values[0])
-                p_item = row.cells[0].paragraphs[0].runs[0]
-                p_item.bold = True
-                p_item.font.name = "Calibri"
-                p_item.font.size = Pt(10)
-
-                # Adicionar "Numero" com negrito e tamanho 8
-                row.cells[1].text = str(matching_row["Numero"].values[0])
-                p_numero = row.cells[1].paragraphs[0].runs[0]
-                p_numero.bold = True
-                p_numero.font.name = "Calibri"
-                p_numero.font.size = Pt(8)
-
-                # Adicionar "Visões das contribuições" com Texto, Justificativa e Nome corretamente formatados
-                texto_completo = f"{matching_row['Texto'].values[0]}\n{matching_row['Justificativa'].values[0]}\n{matching_row['Nome'].values[0]}"
-                row.cells[2].text = texto_completo
-
-                # Formatar fonte da coluna "Visões das contribuições" corretamente
-                p_visoes = row.cells[2].paragraphs[0].runs[0]
-                p_visoes.font.name = "Calibri"
-                p_visoes.font.size = Pt(8)
+# Iterar pelas linhas das tabelas, indexadas numa única varredura do XML, para encontrar o local correto
+indice_linhas = IndiceLinhasWord.de_documento(doc, chave=item_somente_digitos)  # Coluna "Item" no Word
+for row in indice_linhas.todas:
+    # Verificar se "Item" do Word corresponde ao "Item CP alterado"
+    if row.item is not None:
+        item_cp = row.item
+
+        # Encontrar as contribuições associadas (consulta O(1) no índice)
+        contribuicoes = indice.contribuicoes(item_cp)
+
+        if contribuicoes:
+            # Adicionar "Item CP alterado"
+            row.celula(0).text = str(item_cp)
+            row.celula(0).paragraphs[0]._p.style = estilo_celula(doc, "Calibri", 10, negrito=True)
+
+            # Adicionar "Numero" com negrito e tamanho 8
+            row.celula(1).text = ", ".join(str(c["Numero"]) for c in contribuicoes)
+            row.celula(1).paragraphs[0]._p.style = estilo_celula(doc, "Calibri", 8, negrito=True)
+
+            # Adicionar "Visões das contribuições" com Texto, Justificativa e Nome corretamente formatados
+            texto_val = "\n".join(c['Texto'] for c in contribuicoes)
+            justificativa_val = "\n".join(c['Justificativa'] for c in contribuicoes)
+            nome_val = ", ".join(c['Nome'] for c in contribuicoes)
+            texto_completo = f"{texto_val}\n{justificativa_val}\n{nome_val}"
+            row.celula(2).text = texto_completo
+
+            # Formatar fonte da coluna "Visões das contribuições" (estilo registrado uma vez no documento)
+            row.celula(2).paragraphs[0]._p.style = estilo_celula(doc, "Calibri", 8)
 
 # Salvar o arquivo ajustado
 arquivo_word_ajustado = r"W:\MINISTÉRIO DAS CIDADES\Consulta 7217\python\saida_ajustada.docx"
@@ -1,7 +1,10 @@
-import pandas as pd
 import logging
 from docx import Document
-from docx.shared import Pt
+
+from cache_planilha import carregar_planilha
+from estilos_documento import estilo_celula
+from indice_itens import ItemIndex
+from indice_linhas_word import IndiceLinhasWord, item_somente_digitos
 
 # ==============================================================================
 # 1. CONFIGURAÇÃO INICIAL
@@ -35,10 +38,8 @@ def formatar_celula(celula, texto, nome_fonte='Calibri', tamanho_fonte=10, negri
         negrito (bool): Se o texto deve ou não estar em negrito.
     """
     celula.text = texto
-    run = celula.paragraphs[0].runs[0]
-    run.font.name = nome_fonte
-    run.font.size = Pt(tamanho_fonte)
-    run.bold = negrito
+    # Fonte, tamanho e negrito vêm de um estilo de parágrafo registrado uma vez no documento
+    celula.paragraphs[0]._p.style = estilo_celula(celula.part, nome_fonte, tamanho_fonte, negrito)
 
 
 # ==============================================================================
@@ -52,7 +53,7 @@ def main():
     # --- Leitura e Validação do Excel ---
     logging.info(f"Iniciando a leitura do arquivo Excel: {ARQUIVO_EXCEL}")
     try:
-        df = pd.read_excel(ARQUIVO_EXCEL, engine="openpyxl")
+        df = carregar_planilha(ARQUIVO_EXCEL)
     except FileNotFoundError:
         logging.error(f"O arquivo '{ARQUIVO_EXCEL}' não foi encontrado. O programa será encerrado.")
         raise
@@ -76,71 +77,61 @@ def main():
 
     df = df.replace(r'_x000D_', '"', regex=True)
 
-    # --- Transformação e Filtragem dos Dados ---
-    df["Item CP alterado"] = pd.to_numeric(df["Item CP alterado"], errors="coerce")
-    df = df.dropna(subset=["Item CP alterado"])
-    df["Item CP alterado"] = df["Item CP alterado"].astype(int)
-    df = df[df["Item CP alterado"] >= 100]
-    
-    logging.info("Dados limpos, transformados e filtrados.")
+    logging.info("Dados limpos e transformados.")
 
-    # --- Agrupamento das Contribuições ---
-    df_agrupado = df.groupby("Item CP alterado").agg({
-        "Numero": lambda x: ", ".join(x.astype(str)),
-        "Texto": lambda x: "\n".join(x.astype(str)),
-        "Justificativa": lambda x: "\n".join(x.astype(str)),
-        "Nome": lambda x: ", ".join(x.astype(str))
-    }).reset_index()
+    # --- Indexação das Contribuições por Item ---
+    # Montado uma única vez: cada linha do Word consulta o índice em O(1), e valores como
+    # "12, 13" contam para os dois itens. Mantém apenas os itens a partir do 100.
+    indice = ItemIndex.de_dataframe(df, filtro_item=lambda item: item >= 100)
 
-    logging.info("Contribuições agrupadas por item com sucesso.")
+    logging.info("Contribuições indexadas por item com sucesso.")
 
     # --- Atualização do Documento Word ---
     logging.info(f"Abrindo o documento Word: {ARQUIVO_WORD_ENTRADA}")
     doc = Document(ARQUIVO_WORD_ENTRADA)
 
     itens_atualizados = 0
-    for table in doc.tables:
-        for row in table.rows:
-            item_cp_cell_text = row.cells[0].text.strip()
-
-            if item_cp_cell_text.isdigit():
-                item_cp_word = int(item_cp_cell_text)
+    # Linhas das tabelas indexadas numa única varredura do XML
+    indice_linhas = IndiceLinhasWord.de_documento(doc, chave=item_somente_digitos)
+    for row in indice_linhas.todas:
+        if row.item is not None:
+            item_cp_word = row.item
+            
+            contribuicoes = indice.contribuicoes(item_cp_word)
+
+            if contribuicoes:
+                logging.info(f"Encontrada correspondência para o item '{item_cp_word}'. Atualizando a tabela...")
+                
+                # --- INÍCIO DA ALTERAÇÃO ---
+                
+                # 1. Extrair todos os valores das contribuições do item
+                item_val = str(item_cp_word)
+                numero_val = ", ".join(str(c["Numero"]) for c in contribuicoes)
+                texto_val = "\n".join(str(c['Texto']) for c in contribuicoes)
+                justificativa_val = "\n".join(str(c['Justificativa']) for c in contribuicoes)
+                nome_val = ", ".join(str(c['Nome']) for c in contribuicoes)
+
+                # 2. Construir a nova string para a coluna "Visões", incluindo o Número
+                texto_completo_com_numero = (
+                    f"Contribuição(ões) N.º: {numero_val}\n\n"
+                    f"{texto_val}\n"
+                    f"{justificativa_val}\n"
+                    f"({nome_val})"
+                )
+
+                # 3. Utiliza a função auxiliar para formatar cada célula
+                # Célula 0: Item (permanece igual)
+                formatar_celula(row.celula(0), texto=item_val, tamanho_fonte=10, negrito=True)
+                
+                # Célula 1: Número (agora fica em branco, pois o valor foi movido)
+                formatar_celula(row.celula(1), texto="") 
+                
+                # Célula 2: Visões (agora inclui o número no seu conteúdo)
+                formatar_celula(row.celula(2), texto=texto_completo_com_numero, tamanho_fonte=8)
+                
+                # --- FIM DA ALTERAÇÃO ---
                 
-                matching_row = df_agrupado[df_agrupado["Item CP alterado"] == item_cp_word]
-
-                if not matching_row.empty:
-                    logging.info(f"Encontrada correspondência para o item '{item_cp_word}'. Atualizando a tabela...")
-                    
-                    # --- INÍCIO DA ALTERAÇÃO ---
-                    
-                    # 1. Extrair todos os valores da linha correspondente
-                    item_val = str(matching_row["Item CP alterado"].values[0])
-                    numero_val = str(matching_row["Numero"].values[0])
-                    texto_val = str(matching_row['Texto'].values[0])
-                    justificativa_val = str(matching_row['Justificativa'].values[0])
-                    nome_val = str(matching_row['Nome'].values[0])
-
-                    # 2. Construir a nova string para a coluna "Visões", incluindo o Número
-                    texto_completo_com_numero = (
-                        f"Contribuição(ões) N.º: {numero_val}\n\n"
-                        f"{texto_val}\n"
-                        f"{justificativa_val}\n"
-                        f"({nome_val})"
-                    )
-
-                    # 3. Utiliza a função auxiliar para formatar cada célula
-                    # Célula 0: Item (permanece igual)
-                    formatar_celula(row.cells[0], texto=item_val, tamanho_fonte=10, negrito=True)
-                    
-                    # Célula 1: Número (agora fica em branco, pois o valor foi movido)
-                    formatar_celula(row.cells[1], texto="") 
-                    
-                    # Célula 2: Visões (agora inclui o número no seu conteúdo)
-                    formatar_celula(row.cells[2], texto=texto_completo_com_numero, tamanho_fonte=8)
-                    
-                    # --- FIM DA ALTERAÇÃO ---
-                    
-                    itens_atualizados += 1
+                itens_atualizados += 1
 
     logging.info(f"Processamento do Word concluído. {itens_atualizados} itens foram atualizados na tabela.")
 
@@ -1,14 +1,14 @@
-import pandas as pd
 import logging
 from docx import Document
-from docx.shared import Pt
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
 from pathlib import Path
-from collections import defaultdict
 import re
 
+from armazem_contribuicoes import ArmazemContribuicoes
+from leitor_contribuicoes import ler_contribuicoes
+from renderizador_celulas import renderizador_do_documento
+from indice_linhas_word import IndiceLinhasWord
+
 # ==============================================================================
 # 1. CONFIGURAÇÃO INICIAL
 # ==============================================================================
@@ -34,28 +34,15 @@ ARQUIVO_WORD_SAIDA = BASE_DIR / "saida_0.docx" # Caminho para o documento Word d
 # ==============================================================================
 
 
-def adicionar_linha_separadora(paragraph):
-    """
-    Adiciona uma borda inferior a um parágrafo no documento Word, criando uma linha separadora visual.
-    """
-    p_pr = paragraph._p.get_or_add_pPr() # Obtém ou adiciona propriedades de parágrafo
-    p_bdr = OxmlElement('w:pBdr') # Cria um elemento XML para bordas de parágrafo
-    p_pr.append(p_bdr) # Adiciona o elemento de borda às propriedades do parágrafo
-    
-    bottom_border = OxmlElement('w:bottom') # Cria um elemento XML para a borda inferior
-    bottom_border.set(qn('w:val'), 'single') # Estilo da linha: 'single' (linha única)
-    bottom_border.set(qn('w:sz'), '6') # Tamanho da linha (em oitavos de ponto, 6 = 0.75pt)
-    bottom_border.set(qn('w:space'), '1') # Espaço entre a linha e o texto
-    bottom_border.set(qn('w:color'), 'auto') # Cor da linha (automática)
-    
-    p_bdr.append(bottom_border) # Adiciona a borda inferior ao elemento de bordas do parágrafo
-    logging.debug("Linha separadora adicionada.")
-
 def formatar_celula_com_contribuicoes(celula, contribuicoes: list, fonte: str = 'Calibri', tamanho: int = 8):
     """
     Preenche uma célula do documento Word com uma lista de contribuições, formatando cada uma
     e adicionando linhas separadoras entre elas.
 
+    Os parágrafos (número em negrito, título, texto, autor em itálico e separador) são montados
+    direto em XML, com um único parse por célula, e só referenciam estilos de parágrafo
+    registrados uma vez no documento (ver estilos_documento), sem formatação run a run.
+
     Args:
         celula: O objeto Cell do python-docx a ser preenchido.
         contribuicoes (list): Lista de dicionários, onde cada dicionário representa uma contribuição
@@ -63,43 +50,7 @@ def formatar_celula_com_contribuicoes(celula, contribuicoes: list, fonte: str =
         fonte (str): Nome da fonte a ser usada para o texto.
         tamanho (int): Tamanho da fonte em pontos.
     """
-    
-    for idx, contrib in enumerate(contribuicoes):
-        # Adicionar número da contribuição
-        p_num = celula.add_paragraph() # Cria um novo parágrafo na célula
-        run_num = p_num.add_run(contrib['numero']) # Adiciona o número da contribuição
-        run_num.font.name = fonte
-        run_num.font.size = Pt(tamanho)
-        run_num.bold = True # Número em negrito
-        logging.debug(f"  Adicionado número da contribuição: {contrib['numero']}")
-        
-        # Adicionar Titulo da Contribuição 
-        p_titulo = celula.add_paragraph()
-        run_titulo = p_titulo.add_run(contrib['Titulo da Contribuição'])
-        run_titulo.font.name = fonte
-        run_titulo.font.size = Pt(tamanho)
-        logging.debug(f"  Adicionado título da contribuição: {contrib['Titulo da Contribuição']}")
-        
-        # Adicionar texto da contribuição
-        p_texto = celula.add_paragraph(contrib['texto'])
-        for run in p_texto.runs: # Itera sobre os runs do parágrafo para aplicar a formatação
-            run.font.name = fonte
-            run.font.size = Pt(tamanho)
-        logging.debug(f"  Adicionado texto da contribuição (início): {contrib['texto'][:50]}...")
-        
-        # Adicionar nome do autor
-        p_autor = celula.add_paragraph()
-        run_autor = p_autor.add_run(f"({contrib['nome']})")
-        run_autor.font.name = fonte
-        run_autor.font.size = Pt(tamanho)
-        run_autor.italic = True # Nome do autor em itálico
-        logging.debug(f"  Adicionado nome do autor: {contrib['nome']}")
-        
-        # Adicionar linha separadora (exceto após a última contribuição)
-        if idx < len(contribuicoes) - 1:
-            p_separador = celula.add_paragraph()
-            adicionar_linha_separadora(p_separador)
-            logging.debug("  Adicionada linha separadora entre contribuições.")
+    renderizador_do_documento(celula, fonte, tamanho).preencher(celula, contribuicoes)
     logging.debug("Célula formatada com todas as contribuições.")
 
 def validar_item(item: str) -> int:
@@ -131,17 +82,20 @@ def main() -> None:
     """
     logging.info(f"Iniciando processamento. Caminho do Excel: {ARQUIVO_EXCEL}")
     
-    # --- Leitura e preparação dos dados do Excel ---
+    # --- Leitura, filtragem e agrupamento ---
+    # A planilha é lida em fluxo (openpyxl read_only), só com as colunas usadas, e cada contribuição
+    # passa direto para o armazém compacto, sem montar um DataFrame com a planilha inteira.
+    # "12, 13" conta para os dois itens e campos vazios recebem os valores padrão.
+    # --- FILTRAGEM ESPECÍFICA PARA O ITEM 0 ---
+    # Para processar TODOS os itens numéricos válidos, troque o filtro_item por None.
+    # As contribuições de outros itens são descartadas durante a leitura.
     try:
-        # Lê o arquivo Excel, especificando o motor, tipo de dados e colunas a serem usadas
-        df = pd.read_excel(
+        contrib_por_item = ArmazemContribuicoes.de_registros(ler_contribuicoes(
             ARQUIVO_EXCEL,
-            engine="openpyxl",
-            dtype=str, # Lê todas as colunas como string para evitar problemas de tipo
-            usecols=['Item CP alterado', 'Numero', 'Titulo da Contribuição ', 'Texto', 'Nome']
-        )
-        logging.info(f"Excel lido com sucesso. Colunas: {df.columns.tolist()}")
-        logging.debug(f"DataFrame lido (primeiras 5 linhas):\n{df.head().to_string()}") # to_string() para melhor formatação no log
+            filtro_item=lambda item: item == 0,
+            colunas=['Item CP alterado', 'Numero', 'Titulo da Contribuição', 'Texto', 'Nome'],
+        ))
+        logging.info("Excel lido com sucesso.")
     except FileNotFoundError:
         logging.error(f"Erro: Arquivo Excel não encontrado em '{ARQUIVO_EXCEL}'. Verifique o caminho.")
         return
@@ -152,59 +106,12 @@ def main() -> None:
         logging.exception(f"Falha inesperada na leitura do Excel: {e}")
         return
 
-    # --- Pré-processamento de dados do DataFrame ---
-    # Limpa caracteres '_x000D_' (representação de quebra de linha do Excel) e espaços nos nomes das colunas
-    for col in df.columns:
-        if df[col].dtype == 'object': # Aplica apenas a colunas de texto
-            df[col] = df[col].astype(str).str.replace('_x000D_', '\n', regex=False)
-    df.columns = df.columns.str.strip() # Remove espaços em branco do início/fim dos nomes das colunas
-    logging.info("Pré-processamento de colunas e dados do Excel concluído.")
-    logging.debug(f"DataFrame após pré-processamento (primeiras 5 linhas):\n{df.head().to_string()}")
-    
-    # --- Filtragem e validação de itens ---
-    # Aplica a função 'validar_item' para criar uma coluna com itens numéricos validados
-    df['Item_validado'] = df['Item CP alterado'].apply(validar_item)
-    logging.info("Coluna 'Item_validado' criada.")
-    logging.debug(f"Validação de itens (primeiras 5 linhas de 'Item CP alterado' e 'Item_validado'):\n{df[['Item CP alterado', 'Item_validado']].head().to_string()}")
-    
-    # Remove linhas onde 'Item_validado' é None (não pôde ser validado)
-    df = df.dropna(subset=['Item_validado'])
-    logging.info(f"Removidas linhas com 'Item_validado' inválido. Restam {len(df)} linhas.")
-    logging.debug(f"DataFrame após remover N/A em 'Item_validado' (primeiras 5 linhas):\n{df[['Item CP alterado', 'Item_validado']].head().to_string()}")
-
-    # Converte 'Item_validado' para tipo inteiro
-    df['Item_validado'] = df['Item_validado'].astype(int)
-    logging.info("Coluna 'Item_validado' convertida para inteiro.")
-    logging.debug(f"DataFrame após converter 'Item_validado' para int (primeiras 5 linhas):\n{df[['Item CP alterado', 'Item_validado']].head().to_string()}")
-
-    # --- FILTRAGEM ESPECÍFICA PARA O ITEM 0 ---
-    # Esta é a linha que filtra o DataFrame para conter SOMENTE as contribuições do item 0.
-    # Se você quiser processar TODOS os itens numéricos válidos, COMENTE ou REMOVA a linha abaixo.
-    df_filtered_for_zero = df[df['Item_validado'] == 0].copy()
-    logging.info(f"Filtrando DataFrame para 'Item_validado == 0'. Total de linhas para o item 0: {len(df_filtered_for_zero)}")
-    logging.debug(f"DataFrame filtrado para Item_validado == 0 (primeiras 5 linhas):\n{df_filtered_for_zero[['Item CP alterado', 'Item_validado', 'Numero']].head().to_string()}")
+    logging.info(f"Filtrando contribuições para o item 0. Total de linhas para o item 0: {contrib_por_item.total_pares}")
 
-    if df_filtered_for_zero.empty:
+    if len(contrib_por_item) == 0:
         logging.warning("Nenhum dado válido encontrado para o item '0' após a filtragem específica! Verifique o Excel ou o filtro.")
         return # Encerra a execução se não houver dados para o item 0
     
-    # A partir daqui, usaremos o DataFrame filtrado para o item 0
-    df = df_filtered_for_zero 
-
-    # --- Agrupamento de contribuições em formato estruturado ---
-    contrib_por_item = defaultdict(list) # Dicionário para agrupar contribuições por item
-    df = df.sort_values(by=["Item_validado", "Numero"]) # Garante a ordem das contribuições
-    
-    for _, row in df.iterrows():
-        item = row['Item_validado']
-        contrib = {
-            'numero': f"{row['Numero']}" if pd.notna(row['Numero']) else "[sem número]",
-            'Titulo da Contribuição': row['Titulo da Contribuição'] if pd.notna(row['Titulo da Contribuição']) else "[sem Titulo da Contribuição]",
-            'texto': row['Texto'] if pd.notna(row['Texto']) else "[sem texto]",
-            'nome': row['Nome'] if pd.notna(row['Nome']) else "[autor desconhecido]"
-        }
-        contrib_por_item[item].append(contrib) # Adiciona a contribuição à lista do item correspondente
-    
     logging.info(f"Contribuições agrupadas para {len(contrib_por_item)} itens únicos encontrados no Excel (após filtro).")
     if 0 in contrib_por_item:
         logging.info(f"Detalhes das contribuições agrupadas para o ITEM 0 (primeiras 3):\n{contrib_por_item[0][:3]}")
@@ -224,33 +131,34 @@ def main() -> None:
 
     itens_atualizados = 0
     
-    # Itera sobre todas as tabelas e linhas do documento Word
-    for idx_tabela, tabela in enumerate(doc.tables):
-        logging.info(f"Processando Tabela {idx_tabela + 1} no Word...")
-        for idx_linha, linha in enumerate(tabela.rows):
-            # Ignora linhas que não têm o número esperado de células (primeira coluna para o item, terceira para contribuições)
-            if len(linha.cells) < 3:
-                logging.debug(f"  Linha {idx_linha + 1} da Tabela {idx_tabela + 1}: Ignorada (menos de 3 células).")
-                continue
-            
-            celula_item = linha.cells[0] # Pega a primeira célula da linha (onde deve estar o item)
-            item_cp_text = celula_item.text.strip() # Obtém o texto da célula e remove espaços
-            item_cp = validar_item(item_cp_text) # Valida o texto para obter o número do item
-            
-            logging.info(f"  Linha {idx_linha + 1} da Tabela {idx_tabela + 1}: Texto da célula de item '{item_cp_text}' -> Validado como: {item_cp}")
-            
-            # Verifica se o item é válido (não None) e se existem contribuições para ele no dicionário
-            if item_cp is not None and item_cp in contrib_por_item:
-                logging.info(f"    *** Item {item_cp} encontrado no Word e com contribuições no Excel. ATUALIZANDO CÉLULA... ***")
-                # Chama a função para formatar a terceira célula da linha com as contribuições
-                formatar_celula_com_contribuicoes(
-                    linha.cells[2], # A célula a ser preenchida (terceira coluna)
-                    contrib_por_item[item_cp], # As contribuições agrupadas para este item
-                    tamanho=8 # Tamanho da fonte
-                )
-                itens_atualizados += 1 # Contador de itens atualizados
-            else:
-                logging.info(f"    Item {item_cp} (ou inválido/nulo) NÃO possui contribuições no Excel ou não foi encontrado para atualização.")
+    # Índice das linhas das tabelas, montado numa única varredura do XML, em vez de
+    # linha.cells a cada acesso.
+    indice_linhas = IndiceLinhasWord.de_documento(doc, chave=validar_item)
+
+    for linha in indice_linhas.todas:
+        idx_tabela, idx_linha = linha.indice_tabela, linha.indice_linha
+        # Ignora linhas que não têm o número esperado de células (primeira coluna para o item, terceira para contribuições)
+        if len(linha) < 3:
+            logging.debug(f"  Linha {idx_linha + 1} da Tabela {idx_tabela + 1}: Ignorada (menos de 3 células).")
+            continue
+
+        item_cp_text = linha.texto_item.strip() # Texto da célula de item (primeira coluna)
+        item_cp = linha.item # Número do item, já validado por validar_item na montagem do índice
+
+        logging.info(f"  Linha {idx_linha + 1} da Tabela {idx_tabela + 1}: Texto da célula de item '{item_cp_text}' -> Validado como: {item_cp}")
+
+        # Verifica se o item é válido (não None) e se existem contribuições para ele no dicionário
+        if item_cp is not None and item_cp in contrib_por_item:
+            logging.info(f"    *** Item {item_cp} encontrado no Word e com contribuições no Excel. ATUALIZANDO CÉLULA... ***")
+            # Chama a função para formatar a terceira célula da linha com as contribuições
+            formatar_celula_com_contribuicoes(
+                linha.celula(2), # A célula a ser preenchida (terceira coluna)
+                contrib_por_item[item_cp], # As contribuições agrupadas para este item
+                tamanho=8 # Tamanho da fonte
+            )
+            itens_atualizados += 1 # Contador de itens atualizados
+        else:
+            logging.info(f"    Item {item_cp} (ou inválido/nulo) NÃO possui contribuições no Excel ou não foi encontrado para atualização.")
 
     # --- Salvamento do documento Word ---
     try: